@@ -1,35 +1,1288 @@
-from flask import Flask, render_template, request, jsonify, session, redirect
+import time
+# Taken first so the startup report's import time includes loading Flask itself
+STARTUP_BEGAN = time.perf_counter()
+
+from flask import Flask, render_template, request, jsonify, session, redirect, send_from_directory, Response, stream_with_context, g, has_request_context, has_app_context
+import click
 import sqlite3
+import csv
+import io
 import json
+import fcntl
+import gzip
+import shutil
+import struct
+import base64
 import random
 import hashlib
 import os
-import urllib.request
-import urllib.error
-import smtplib
+import re
+import sys
+import tempfile
 import threading
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import math
 from datetime import datetime
-from functools import wraps
+from collections import defaultdict, OrderedDict
+from functools import wraps, lru_cache
+from contextlib import contextmanager
+from werkzeug.middleware.proxy_fix import ProxyFix
+from flask.sessions import SecureCookieSessionInterface
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', os.urandom(24))
 
-# Use /data for persistent storage on Render, local file otherwise
-if os.path.exists('/data'):
+# X-Forwarded-For is only trusted for PROXY_HOPS proxies in front of the app (1 on
+# Render). Without a proxy a client could pick its own address and dodge per-IP limits.
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.environ.get('PROXY_HOPS', 0)))
+
+# Use /data for persistent storage on Render, local file otherwise (DATABASE_PATH overrides both)
+if os.environ.get('DATABASE_PATH'):
+    DATABASE = os.environ['DATABASE_PATH']
+elif os.path.exists('/data'):
     DATABASE = '/data/squares.db'
 else:
     DATABASE = 'squares.db'
+
+# Additional pools (one per organization) each get their own SQLite file here
+POOLS_DIR = os.environ.get('POOLS_DIR') or os.path.join(os.path.dirname(DATABASE) or '.', 'pools')
+# e.g. ".squares.example.com" makes acme.squares.example.com serve pool "acme"
+POOL_HOST_SUFFIX = os.environ.get('POOL_HOST_SUFFIX', '').lower()
+# Pools with open handles (watch connection + board snapshots) per worker
+POOL_CACHE_SIZE = int(os.environ.get('POOL_CACHE_SIZE', 32))
+
+# A postgresql:// URL stores every pool in one PostgreSQL database (one schema per pool)
+# so several web nodes can share it; otherwise each pool is a SQLite file
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+POSTGRES_POOL_SIZE = int(os.environ.get('POSTGRES_POOL_SIZE', 10))
+
 SQUARES_PER_EMAIL_LIMIT = 5
 GMAIL_ADDRESS = os.environ.get('GMAIL_ADDRESS', '')
 GMAIL_APP_PASSWORD = os.environ.get('GMAIL_APP_PASSWORD', '')
 
+# External services; overridable so load and replay tools can point at local stand-ins
+ESPN_SCOREBOARD_URL = os.environ.get('ESPN_SCOREBOARD_URL', 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard')
+SMTP_HOST = os.environ.get('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 465))
+SMTP_USE_SSL = os.environ.get('SMTP_USE_SSL', '1') == '1'
+
+# Fingerprinted assets are written here and served with a one-year immutable cache
+ASSET_SOURCES = ['app.js', 'style.css', 'favicon.png', 'logo.png', 'superbowl-logo.png']
+ASSET_DIST_DIR = os.path.join(app.static_folder, 'dist')
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+# Files of earlier builds are deleted once the current build has been current this long,
+# so pages rendered by workers still running the previous build keep their assets
+ASSET_RETAIN_SECONDS = 24 * 60 * 60
+asset_manifest = {}
+
+# Metrics: each worker periodically writes its counters to METRICS_DIR and /metrics sums every file.
+# Scrapers authenticate with METRICS_TOKEN; without one only a logged-in admin can read /metrics.
+METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'squares-metrics')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_FLUSH_SECONDS = 1.0
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# SQLite busy handling is done in Python so lock waits can be counted
+DB_BUSY_TIMEOUT = 5.0
+
+# Under gevent workers (WORKER_CLASS=gevent) SQLite calls run on this many threads per worker
+DB_THREADS = int(os.environ.get('DB_THREADS', 4))
+
+# Opt-in SQL profiler: per-statement timings by route, plus a slow-query log with query plans
+SQL_PROFILE = os.environ.get('SQL_PROFILE', '0') == '1'
+SQL_SLOW_MS = float(os.environ.get('SQL_SLOW_MS', 50))
+
+# Live score requests share one ESPN fetch per worker for this many seconds
+ESPN_CACHE_SECONDS = 10
+
+# Optional static publishing of the public board for nginx/CDN serving (off when empty)
+PUBLISH_DIR = os.environ.get('PUBLISH_DIR', '')
+# Superseded documents stay this long for readers holding an older board.json
+PUBLISH_RETAIN_SECONDS = 120
+# How often each worker's publisher checks for writes made outside a request (CLI, background jobs)
+PUBLISH_POLL_SECONDS = 5.0
+
+# Online SQLite backups: gzipped, integrity-checked copies of every pool, the newest BACKUP_KEEP kept
+BACKUP_DIR = os.environ.get('BACKUP_DIR') or os.path.join(os.path.dirname(DATABASE) or '.', 'backups')
+BACKUP_INTERVAL_SECONDS = int(os.environ.get('BACKUP_INTERVAL_SECONDS', 30 * 60))  # 0 turns the schedule off
+BACKUP_KEEP = int(os.environ.get('BACKUP_KEEP', 24))
+# Pages copied per backup step, and the pause between steps that lets writers in
+BACKUP_PAGES_PER_STEP = 100
+BACKUP_STEP_PAUSE = 0.005
+
+# Optional continuous replication: committed WAL frames are shipped here every REPLICA_SYNC_SECONDS (off when empty)
+REPLICA_DIR = os.environ.get('REPLICA_DIR', '')
+REPLICA_SYNC_SECONDS = float(os.environ.get('REPLICA_SYNC_SECONDS', 1.0))
+# With replication on, the shipper checkpoints the WAL itself once this many frames have been shipped
+REPLICA_CHECKPOINT_FRAMES = 1000
+# A generation (snapshot + shipped frames) is replaced by a fresh snapshot after this many segments
+REPLICA_MAX_SEGMENTS = 3600
+REPLICA_KEEP_GENERATIONS = 2
+
+# Rate limiting state lives in its own small SQLite file so it is shared by all
+# workers on the host without ever touching the main database's write lock
+RATE_LIMIT_DATABASE = os.path.join(os.path.dirname(DATABASE), 'ratelimit.db') if os.path.dirname(DATABASE) else 'ratelimit.db'
+
+# endpoint -> {'ip' | 'email': (bucket capacity, refill tokens per second)}
+RATE_LIMITS = {
+    'claim': {'ip': (30, 0.5), 'email': (10, 0.2)},
+    'my_squares': {'ip': (60, 1.0), 'email': (20, 0.5)},
+    'me': {'ip': (60, 1.0), 'email': (20, 0.5)},
+}
+
+# Max rate-limited requests in flight across all workers before new ones get a fast 503
+WRITE_CONCURRENCY_LIMIT = int(os.environ.get('WRITE_CONCURRENCY_LIMIT', 8))
+INFLIGHT_STALE_SECONDS = 30
+
+# ==========================================
+# Metrics
+# ==========================================
+
+# name -> (type, help) for the Prometheus exposition
+METRIC_INFO = {
+    'squares_http_requests_total': ('counter', 'HTTP requests by route, method and status'),
+    'squares_http_request_duration_seconds': ('histogram', 'HTTP request latency by route, method and status'),
+    'squares_db_queries_total': ('counter', 'SQLite statements executed'),
+    'squares_db_query_seconds_total': ('counter', 'Time spent executing SQLite statements, including lock waits'),
+    'squares_db_busy_retries_total': ('counter', 'Retries after SQLite reported the database locked'),
+    'squares_db_lock_wait_seconds_total': ('counter', 'Time spent waiting for SQLite locks'),
+    'squares_espn_fetch_duration_seconds': ('histogram', 'ESPN scoreboard fetch latency'),
+    'squares_espn_fetch_errors_total': ('counter', 'Failed ESPN scoreboard fetches'),
+    'squares_espn_cache_requests_total': ('counter', 'ESPN scoreboard cache lookups by result'),
+    'squares_emails_total': ('counter', 'Notification emails attempted by type and status'),
+    'squares_email_queue_depth': ('gauge', 'Recipients still waiting in running email jobs'),
+    'squares_email_sends_pending': ('gauge', 'email_sends rows currently pending'),
+    'squares_backups_total': ('counter', 'Online database backups by result'),
+    'squares_backup_seconds': ('histogram', 'Time to copy, check and compress one pool backup'),
+}
+
+metrics_lock = threading.Lock()
+metrics_state = {
+    'pid': None,
+    'counters': defaultdict(float),
+    'gauges': {},
+    'histograms': {},
+    'sql': {},
+    'last_flush': 0.0,
+}
+
+def metric_key(name, labels):
+    return (name, tuple(sorted(labels.items())) if labels else ())
+
+def reset_metrics_if_forked():
+    """Start from zero in a new process so a forked worker never re-reports its parent's counts"""
+    if metrics_state['pid'] != os.getpid():
+        metrics_state['pid'] = os.getpid()
+        metrics_state['counters'] = defaultdict(float)
+        metrics_state['gauges'] = {}
+        metrics_state['histograms'] = {}
+        metrics_state['sql'] = {}
+        metrics_state['last_flush'] = 0.0
+
+def inc_counter(name, labels=None, value=1):
+    with metrics_lock:
+        reset_metrics_if_forked()
+        metrics_state['counters'][metric_key(name, labels)] += value
+    maybe_flush_metrics()
+
+def set_gauge(name, value, labels=None):
+    with metrics_lock:
+        reset_metrics_if_forked()
+        metrics_state['gauges'][metric_key(name, labels)] = value
+    maybe_flush_metrics()
+
+def add_gauge(name, delta, labels=None):
+    with metrics_lock:
+        reset_metrics_if_forked()
+        key = metric_key(name, labels)
+        metrics_state['gauges'][key] = metrics_state['gauges'].get(key, 0) + delta
+    maybe_flush_metrics()
+
+def observe(name, value, labels=None):
+    """Record a histogram observation"""
+    with metrics_lock:
+        reset_metrics_if_forked()
+        key = metric_key(name, labels)
+        hist = metrics_state['histograms'].get(key)
+        if hist is None:
+            hist = metrics_state['histograms'][key] = {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                hist['buckets'][i] += 1
+                break
+        hist['sum'] += value
+        hist['count'] += 1
+    maybe_flush_metrics()
+
+def flush_metrics():
+    """Write this worker's metrics to METRICS_DIR/<pid>.json atomically"""
+    with metrics_lock:
+        reset_metrics_if_forked()
+        snapshot = {
+            'pid': os.getpid(),
+            'counters': [[name, dict(labels), value] for (name, labels), value in metrics_state['counters'].items()],
+            'gauges': [[name, dict(labels), value] for (name, labels), value in metrics_state['gauges'].items()],
+            'histograms': [[name, dict(labels), h['buckets'], h['sum'], h['count']]
+                           for (name, labels), h in metrics_state['histograms'].items()],
+            'sql': [[route, sql] + stats for (route, sql), stats in metrics_state['sql'].items()],
+        }
+        metrics_state['last_flush'] = time.time()
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(f'{path}.tmp', path)
+    except OSError as e:
+        app.logger.warning('Could not write metrics: %s', e)
+
+def maybe_flush_metrics():
+    if time.time() - metrics_state['last_flush'] >= METRICS_FLUSH_SECONDS:
+        flush_metrics()
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+# Counters, histograms and SQL stats of exited workers are folded into this file
+EXITED_METRICS_FILE = 'exited.json'
+
+def load_metrics_file(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def merge_metrics(total, data):
+    """Add one metrics file's cumulative values into another; gauges are dropped"""
+    counters = {(name, json.dumps(labels, sort_keys=True)): [name, labels, value] for name, labels, value in total['counters']}
+    for name, labels, value in data['counters']:
+        counters.setdefault((name, json.dumps(labels, sort_keys=True)), [name, labels, 0])[2] += value
+    histograms = {(h[0], json.dumps(h[1], sort_keys=True)): h for h in total['histograms']}
+    for name, labels, buckets, hist_sum, count in data['histograms']:
+        hist = histograms.setdefault((name, json.dumps(labels, sort_keys=True)),
+                                     [name, labels, [0] * len(LATENCY_BUCKETS), 0.0, 0])
+        hist[2] = [a + b for a, b in zip(hist[2], buckets)]
+        hist[3] += hist_sum
+        hist[4] += count
+    sql = {(row[0], row[1]): row for row in total.get('sql', [])}
+    for route, statement, calls, seconds, slowest, rows in data.get('sql', []):
+        stats = sql.setdefault((route, statement), [route, statement, 0, 0.0, 0.0, 0])
+        stats[2] += calls
+        stats[3] += seconds
+        stats[4] = max(stats[4], slowest)
+        stats[5] += rows
+    return {'pid': None, 'counters': list(counters.values()), 'gauges': [],
+            'histograms': list(histograms.values()), 'sql': list(sql.values())}
+
+def retire_exited_workers(names):
+    """Fold the metrics files of exited workers into EXITED_METRICS_FILE. Returns the names left."""
+    dead = [name for name in names
+            if name != EXITED_METRICS_FILE and name[:-len('.json')].isdigit() and not pid_alive(int(name[:-len('.json')]))]
+    if not dead:
+        return names
+    exited_path = os.path.join(METRICS_DIR, EXITED_METRICS_FILE)
+    total = load_metrics_file(exited_path) or {'pid': None, 'counters': [], 'gauges': [], 'histograms': [], 'sql': []}
+    for name in dead:
+        data = load_metrics_file(os.path.join(METRICS_DIR, name))
+        if data is not None:
+            total = merge_metrics(total, data)
+    with open(f'{exited_path}.tmp', 'w') as f:
+        json.dump(total, f)
+    os.replace(f'{exited_path}.tmp', exited_path)
+    for name in dead:
+        os.remove(os.path.join(METRICS_DIR, name))
+    return [name for name in names if name not in dead] + ([EXITED_METRICS_FILE] if EXITED_METRICS_FILE not in names else [])
+
+def read_metrics_files():
+    """Return the contents of every live worker's metrics file and of EXITED_METRICS_FILE"""
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        lock_file = open(os.path.join(METRICS_DIR, '.lock'), 'w')
+    except OSError:
+        return []
+    with lock_file:
+        # Readers and the fold take turns, so a file is never counted both
+        # as its own and inside EXITED_METRICS_FILE. Keep the wait off the gevent hub.
+        run_db_call(fcntl.flock, lock_file, fcntl.LOCK_EX)
+        try:
+            names = [name for name in os.listdir(METRICS_DIR) if name.endswith('.json')]
+            names = retire_exited_workers(names)
+        except OSError as e:
+            app.logger.warning('Could not read metrics files: %s', e)
+            return []
+        files = [load_metrics_file(os.path.join(METRICS_DIR, name)) for name in names]
+    return [data for data in files if data is not None]
+
+def collect_metrics():
+    """Sum every worker's metrics file.
+
+    Counters and histograms of exited workers live on in EXITED_METRICS_FILE,
+    so the totals never go down while the server runs; gauges only come from
+    live workers.
+    """
+    counters = defaultdict(float)
+    gauges = defaultdict(float)
+    histograms = {}
+    for data in read_metrics_files():
+        for name, labels, value in data['counters']:
+            counters[metric_key(name, labels)] += value
+        for name, labels, value in data['gauges']:
+            gauges[metric_key(name, labels)] += value
+        for name, labels, buckets, total, count in data['histograms']:
+            key = metric_key(name, labels)
+            hist = histograms.setdefault(key, {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0})
+            hist['buckets'] = [a + b for a, b in zip(hist['buckets'], buckets)]
+            hist['sum'] += total
+            hist['count'] += count
+    return counters, gauges, histograms
+
+def format_labels(labels, extra=None):
+    items = list(labels) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in items) + '}'
+
+def render_metrics(counters, gauges, histograms):
+    """Render metrics in the Prometheus text exposition format"""
+    by_name = defaultdict(list)
+    for (name, labels), value in list(counters.items()) + list(gauges.items()):
+        by_name[name].append((labels, value))
+    for (name, labels), hist in histograms.items():
+        by_name[name].append((labels, hist))
+
+    lines = []
+    for name in sorted(by_name):
+        metric_type, help_text = METRIC_INFO.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+            if metric_type != 'histogram':
+                lines.append(f'{name}{format_labels(labels)} {value:g}')
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, value['buckets']):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{format_labels(labels, {"le": f"{bound:g}"})} {cumulative}')
+            lines.append(f'{name}_bucket{format_labels(labels, {"le": "+Inf"})} {value["count"]}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value["sum"]:g}')
+            lines.append(f'{name}_count{format_labels(labels)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
+
+def cooperative_mode():
+    """True when serving from gevent greenlets with the standard library monkey-patched"""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('socket')
+
+db_pool_state = {'pid': None, 'pool': None}
+
+def run_db_call(operation, *args):
+    """Run a blocking SQLite call, handing it to a thread pool so it can't stall the event loop"""
+    if not cooperative_mode():
+        return operation(*args)
+    if db_pool_state['pid'] != os.getpid():
+        from gevent.threadpool import ThreadPool
+        db_pool_state['pool'] = ThreadPool(DB_THREADS)
+        db_pool_state['pid'] = os.getpid()
+    # Errors come back as values: gevent would otherwise log every expected
+    # OperationalError (migrations, busy retries) as a crashed pool task
+    ok, value = db_pool_state['pool'].apply(capture_db_call, (operation, args))
+    if not ok:
+        raise value
+    return value
+
+def capture_db_call(operation, args):
+    try:
+        return True, operation(*args)
+    except Exception as e:
+        return False, e
+
+SQLITE_BUSY_MESSAGES = ('database is locked', 'database table is locked', 'database schema is locked')
+
+def run_with_busy_retry(operation, *args):
+    """Run a SQLite call, retrying while the database is locked for up to DB_BUSY_TIMEOUT.
+
+    Returns (result, seconds spent waiting on locks, retry count).
+    """
+    start = time.perf_counter()
+    delay = 0.001
+    retries = 0
+    while True:
+        try:
+            result = run_db_call(operation, *args)
+            break
+        except sqlite3.OperationalError as e:
+            # Match SQLite's own lock messages only; 'duplicate column name: q1_locked' is not a lock wait
+            if not str(e).startswith(SQLITE_BUSY_MESSAGES) or time.perf_counter() - start >= DB_BUSY_TIMEOUT:
+                raise
+            retries += 1
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+    waited = time.perf_counter() - start if retries else 0.0
+    return result, waited, retries
+
+def record_db_call(elapsed, waited, retries):
+    inc_counter('squares_db_queries_total')
+    inc_counter('squares_db_query_seconds_total', value=elapsed)
+    if retries:
+        inc_counter('squares_db_busy_retries_total', value=retries)
+        inc_counter('squares_db_lock_wait_seconds_total', value=waited)
+
+# ==========================================
+# SQL Profiler
+# ==========================================
+
+SQL_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+SQL_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+SQL_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+def normalize_sql(sql):
+    """Collapse literals and whitespace so the same statement with different values groups together"""
+    sql = SQL_STRING_LITERAL.sub('?', sql)
+    sql = SQL_NUMBER_LITERAL.sub('?', sql)
+    sql = SQL_PLACEHOLDER_LIST.sub('(?, ...)', sql)
+    return ' '.join(sql.split())
+
+def profile_route():
+    if has_request_context():
+        return request.url_rule.rule if request.url_rule else 'unmatched'
+    return 'background'
+
+def profile_statement(connection, sql, parameters, elapsed, rows):
+    """Record one statement against the current route; log it with its plan if it was slow.
+
+    Returns the stats entry so rows fetched later can be added to it.
+    """
+    if has_request_context():
+        g.sql_count = g.get('sql_count', 0) + 1
+        g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+
+    key = (profile_route(), normalize_sql(sql))
+    with metrics_lock:
+        reset_metrics_if_forked()
+        # [calls, total seconds, max seconds, rows]
+        stats = metrics_state['sql'].setdefault(key, [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        stats[3] += max(rows, 0)
+
+    if elapsed * 1000 >= SQL_SLOW_MS:
+        plan = explain_query_plan(connection, sql, parameters)
+        app.logger.warning('Slow SQL (%.1f ms) on %s: %s\n%s', elapsed * 1000, key[0], key[1], plan)
+    return stats
+
+def explain_query_plan(connection, sql, parameters):
+    if sql.lstrip().split(None, 1)[0].upper() not in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'):
+        return '  (no plan)'
+    if isinstance(connection, PostgresConnection):
+        try:
+            rows = connection.raw.execute(f'EXPLAIN {postgres_sql(sql)}', postgres_params(parameters)).fetchall()
+        except Exception as e:
+            return f'  (plan unavailable: {e})'
+        return '\n'.join(f'  {row[0]}' for row in rows)
+    try:
+        # A plain cursor so the EXPLAIN itself isn't profiled
+        rows = sqlite3.Cursor(connection).execute(f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()
+    except sqlite3.Error as e:
+        return f'  (plan unavailable: {e})'
+    return '\n'.join(f'  {row[3]}' for row in rows)
+
+def add_profiled_rows(stats, rows):
+    with metrics_lock:
+        stats[3] += rows
+
+def collect_sql_profile():
+    """Sum the per-worker statement stats, keyed by (route, statement)"""
+    totals = {}
+    for data in read_metrics_files():
+        for route, sql, calls, seconds, slowest, rows in data.get('sql', []):
+            stats = totals.setdefault((route, sql), [0, 0.0, 0.0, 0])
+            stats[0] += calls
+            stats[1] += seconds
+            stats[2] = max(stats[2], slowest)
+            stats[3] += rows
+    return totals
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times every statement and retries on lock contention"""
+
+    profile_stats = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        _, waited, retries = run_with_busy_retry(super().execute, sql, parameters)
+        elapsed = time.perf_counter() - start
+        record_db_call(elapsed, waited, retries)
+        if SQL_PROFILE:
+            # SELECT rows are counted as they are fetched; rowcount covers writes
+            self.profile_stats = profile_statement(self.connection, sql, parameters, elapsed, self.rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        _, waited, retries = run_with_busy_retry(super().executemany, sql, seq_of_parameters)
+        elapsed = time.perf_counter() - start
+        record_db_call(elapsed, waited, retries)
+        if SQL_PROFILE:
+            first = seq_of_parameters[0] if seq_of_parameters else ()
+            self.profile_stats = profile_statement(self.connection, sql, first, elapsed, self.rowcount)
+        return self
+
+    def fetchone(self):
+        row = run_db_call(super().fetchone)
+        if self.profile_stats is not None and row is not None:
+            add_profiled_rows(self.profile_stats, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = run_db_call(super().fetchmany, self.arraysize if size is None else size)
+        if self.profile_stats is not None:
+            add_profiled_rows(self.profile_stats, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = run_db_call(super().fetchall)
+        if self.profile_stats is not None:
+            add_profiled_rows(self.profile_stats, len(rows))
+        return rows
+
+    def __next__(self):
+        row = run_db_call(super().__next__)
+        if self.profile_stats is not None:
+            add_profiled_rows(self.profile_stats, 1)
+        return row
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are instrumented"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        _, waited, retries = run_with_busy_retry(super().commit)
+        if retries:
+            inc_counter('squares_db_busy_retries_total', value=retries)
+            inc_counter('squares_db_lock_wait_seconds_total', value=waited)
+
+# ==========================================
+# Pools
+# ==========================================
+
+# Each pool (one organization's fundraiser) is its own SQLite file, so pools
+# never contend on a write lock. A request picks its pool with a /p/<pool>
+# URL prefix or, when POOL_HOST_SUFFIX is set, a <pool><suffix> host name.
+# Everything else is the default pool, backed by DATABASE.
+POOL_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]{0,62}$')
+POOL_PATH_PATTERN = re.compile(r'^/p/([^/]+)(/.*)?$')
+
+class PoolMiddleware:
+    """Read the pool from the host or move a /p/<pool> prefix from PATH_INFO to SCRIPT_NAME"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        pool = None
+        match = POOL_PATH_PATTERN.match(environ.get('PATH_INFO', ''))
+        if match:
+            pool = match.group(1)
+            environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + f'/p/{pool}'
+            environ['PATH_INFO'] = match.group(2) or '/'
+        elif POOL_HOST_SUFFIX:
+            host = environ.get('HTTP_HOST', '').split(':', 1)[0].lower()
+            if host.endswith(POOL_HOST_SUFFIX) and len(host) > len(POOL_HOST_SUFFIX):
+                pool = host[:-len(POOL_HOST_SUFFIX)]
+        environ['squares.pool'] = pool
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = PoolMiddleware(app.wsgi_app)
+
+class PoolSessionInterface(SecureCookieSessionInterface):
+    """Give each pool its own session cookie so an admin of one pool isn't an admin of all.
+
+    Each pool's cookie is also signed with its own salt: with only the name
+    changed, one pool's cookie value would verify as another pool's session.
+    """
+
+    @property
+    def salt(self):
+        pool = current_pool()
+        return 'cookie-session' if pool is None else f'cookie-session:pool:{pool}'
+
+    def get_cookie_name(self, app):
+        pool = current_pool()
+        name = super().get_cookie_name(app)
+        return name if pool is None else f'{name}_{pool}'
+
+app.session_interface = PoolSessionInterface()
+
+def pool_database(pool):
+    return DATABASE if pool is None else os.path.join(POOLS_DIR, f'{pool}.db')
+
+def current_pool():
+    """Pool of the current request or background job; None is the default pool"""
+    if has_request_context():
+        # Read from the environ rather than g: the session is opened before any before_request hook
+        return request.environ.get('squares.pool')
+    return g.get('pool') if has_app_context() else None
+
+def pool_exists(pool):
+    return pool is None or (POOL_ID_PATTERN.match(pool) is not None and storage.pool_exists(pool))
+
+# Guards only the table of handles; each handle has its own lock for its caches
+pool_lock = threading.RLock()
+pool_state = {'pid': None, 'handles': OrderedDict(), 'initialized': set()}
+
+def get_pool_handle(pool):
+    """This process's open handle for a pool: a watch connection plus its board snapshots.
+
+    Handles are opened lazily and kept in an LRU of POOL_CACHE_SIZE, so an
+    idle pool costs no memory. Callers must hold pool_lock, and take the
+    handle's own lock (see locked_pool_handle) before touching its caches.
+    """
+    if pool_state['pid'] != os.getpid():
+        # First use in this process (or after a fork): never share the parent's connections
+        pool_state['pid'] = os.getpid()
+        pool_state['handles'] = OrderedDict()
+    handles = pool_state['handles']
+    handle = handles.get(pool)
+    if handle is not None:
+        handles.move_to_end(pool)
+        return handle
+
+    handle = handles[pool] = {
+        'pool': pool,
+        'lock': threading.RLock(),
+        'watch': storage.open_watch(pool),
+        'version': None,
+        'entries': {},
+        'config': None,
+        'config_stale': True,
+        'people': OrderedDict(),
+    }
+    while len(handles) > POOL_CACHE_SIZE:
+        _, evicted = handles.popitem(last=False)
+        # A request still using the evicted handle keeps it; its watch closes when it is collected
+        if evicted['lock'].acquire(blocking=False):
+            storage.close_watch(evicted['watch'])
+            evicted['watch'] = None
+            evicted['lock'].release()
+    return handle
+
+@app.before_request
+def select_pool():
+    pool = current_pool()
+    if not pool_exists(pool):
+        return jsonify({'error': 'Pool not found'}), 404
+    # Bring the pool's schema up to date once per process
+    if pool not in pool_state['initialized']:
+        init_db()
+
+@app.cli.command('create-pool')
+@click.argument('pool')
+def create_pool_command(pool):
+    """Create a new pool's database (flask create-pool acme)"""
+    if not POOL_ID_PATTERN.match(pool):
+        raise click.BadParameter('use lowercase letters, digits and dashes', param_hint='pool')
+    if pool_exists(pool):
+        raise click.ClickException(f'Pool {pool} already exists')
+    location = storage.create_pool(pool)
+    g.pool = pool
+    init_db()
+    click.echo(f'Created {location}; serve it at /p/{pool}/'
+               + (f' or https://{pool}{POOL_HOST_SUFFIX}/' if POOL_HOST_SUFFIX else ''))
+    publish_from_cli(pool)
+
+# ==========================================
+# Sales Counters
+# ==========================================
+
+# Squares sold per grid, per email and per supporting player, each with its
+# paid share, are kept exact by triggers on squares so that hot paths read
+# one counter row instead of counting squares. Each entry is (table, key
+# column, key type, key expression over a squares row). A counter's changes
+# column goes up on every trigger firing, so it also serves as a version of
+# that key's squares (see get_person_squares).
+COUNTER_TABLES = [
+    ('grid_counts', 'grid_id', 'INTEGER', '{row}.grid_id'),
+    ('email_counts', 'owner_email', 'TEXT', '{row}.owner_email'),
+    ('player_counts', 'player', 'TEXT', "COALESCE({row}.player_name, 'Not specified')"),
+]
+COUNTED_COLUMNS = 'grid_id, owner_name, owner_email, player_name, paid'
+
+def counter_table_sql(table, key, key_type):
+    return f'''CREATE TABLE IF NOT EXISTS {table} (
+        {key} {key_type} PRIMARY KEY,
+        squares INTEGER NOT NULL DEFAULT 0,
+        paid_squares INTEGER NOT NULL DEFAULT 0,
+        changes INTEGER NOT NULL DEFAULT 0
+    )'''
+
+def counter_add_sql(row):
+    """Trigger statements counting a squares row (NEW or OLD) into every counter"""
+    statements = []
+    for table, key, _, expression in COUNTER_TABLES:
+        expression = expression.format(row=row)
+        statements.append(f'''INSERT INTO {table} ({key}, squares, paid_squares, changes)
+            SELECT {expression}, 1, CASE WHEN {row}.paid = 1 THEN 1 ELSE 0 END, 1 WHERE {expression} IS NOT NULL
+            ON CONFLICT ({key}) DO UPDATE SET squares = {table}.squares + excluded.squares,
+                paid_squares = {table}.paid_squares + excluded.paid_squares, changes = {table}.changes + 1''')
+    return statements
+
+def counter_remove_sql(row):
+    """Trigger statements taking a squares row (NEW or OLD) back out of every counter"""
+    return [f'''UPDATE {table} SET squares = squares - 1,
+            paid_squares = paid_squares - CASE WHEN {row}.paid = 1 THEN 1 ELSE 0 END, changes = changes + 1
+            WHERE {key} = {expression.format(row=row)}'''
+            for table, key, _, expression in COUNTER_TABLES]
+
+def counter_source_sql(expression):
+    """Recount one counter from the squares themselves"""
+    expression = expression.format(row='squares')
+    return f'''SELECT {expression} AS counter_key, COUNT(*) AS squares,
+               SUM(CASE WHEN paid = 1 THEN 1 ELSE 0 END) AS paid_squares
+        FROM squares WHERE owner_name IS NOT NULL AND {expression} IS NOT NULL
+        GROUP BY {expression}'''
+
+def create_sqlite_counters(cursor):
+    # Counter tables from before the changes column get it, and their triggers are replaced
+    replace_triggers = False
+    for table, key, key_type, _ in COUNTER_TABLES:
+        cursor.execute(counter_table_sql(table, key, key_type))
+        try:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN changes INTEGER NOT NULL DEFAULT 0')
+            replace_triggers = True
+        except sqlite3.OperationalError:
+            pass
+    triggers = [
+        ('squares_count_insert', 'AFTER INSERT', 'NEW.owner_name IS NOT NULL', counter_add_sql('NEW')),
+        ('squares_count_delete', 'AFTER DELETE', 'OLD.owner_name IS NOT NULL', counter_remove_sql('OLD')),
+        # An update takes the old row out and counts the new one in
+        ('squares_count_update_old', f'AFTER UPDATE OF {COUNTED_COLUMNS}', 'OLD.owner_name IS NOT NULL', counter_remove_sql('OLD')),
+        ('squares_count_update_new', f'AFTER UPDATE OF {COUNTED_COLUMNS}', 'NEW.owner_name IS NOT NULL', counter_add_sql('NEW')),
+    ]
+    for name, event, condition, statements in triggers:
+        if replace_triggers:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        body = ''.join(f'{statement};\n' for statement in statements)
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} ON squares WHEN {condition}\nBEGIN\n{body}END')
+
+def verify_counters(cursor):
+    """Compare every counter with a recount. Returns [(table, key, (squares, paid) stored, (squares, paid) actual)]."""
+    mismatches = []
+    for table, key, _, expression in COUNTER_TABLES:
+        cursor.execute(f'SELECT {key} AS counter_key, squares, paid_squares FROM {table}')
+        stored = {row['counter_key']: (row['squares'], row['paid_squares']) for row in cursor.fetchall()}
+        cursor.execute(counter_source_sql(expression))
+        actual = {row['counter_key']: (row['squares'], row['paid_squares']) for row in cursor.fetchall()}
+        for counter_key in sorted(stored.keys() | actual.keys(), key=str):
+            if stored.get(counter_key, (0, 0)) != actual.get(counter_key, (0, 0)):
+                mismatches.append((table, counter_key, stored.get(counter_key, (0, 0)), actual.get(counter_key, (0, 0))))
+    return mismatches
+
+def rebuild_counters(cursor):
+    """Replace every counter with a recount from squares"""
+    for table, key, _, expression in COUNTER_TABLES:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(f'INSERT INTO {table} ({key}, squares, paid_squares) '
+                       f'SELECT counter_key, squares, paid_squares FROM ({counter_source_sql(expression)}) AS recount')
+
+@app.cli.command('rebuild-counters')
+@click.option('--pool', default=None, help='Pool to rebuild (default pool if omitted)')
+@click.option('--check', is_flag=True, help='Only verify the counters; exit with status 1 on a mismatch')
+def rebuild_counters_command(pool, check):
+    """Verify the sales counters against the squares and rebuild them"""
+    if not pool_exists(pool):
+        raise click.ClickException(f'Pool {pool} not found')
+    g.pool = pool
+    conn = get_db()
+    cursor = conn.cursor()
+    # Hold off writers so the recount and the counters describe the same squares
+    storage.lock_squares(cursor)
+    mismatches = verify_counters(cursor)
+    for table, counter_key, stored, actual in mismatches:
+        click.echo(f'{table} {counter_key}: {stored[0]} squares ({stored[1]} paid), '
+                   f'actually {actual[0]} ({actual[1]} paid)')
+    if check:
+        conn.close()
+        click.echo(f'{len(mismatches)} mismatched counters')
+        if mismatches:
+            raise click.exceptions.Exit(1)
+        return
+    rebuild_counters(cursor)
+    conn.commit()
+    conn.close()
+    click.echo(f'Rebuilt counters; {len(mismatches)} were wrong')
+    # Squares sold per grid are on the public board
+    publish_from_cli(pool)
+
+# ==========================================
+# Storage Backends
+# ==========================================
+
+# get_db() hands out DB-API connections from the configured backend. Handlers
+# write SQLite-flavoured SQL with ? placeholders on both: the PostgreSQL
+# backend rewrites the few SQLite-only constructs the app uses and raises
+# sqlite3 exception types, so error handling is the same everywhere. psycopg
+# waits cooperatively under gevent, so unlike SQLite it needs no thread pool.
+
+class SQLiteStorage:
+    """One SQLite file per pool (the default)"""
+
+    name = 'sqlite'
+
+    def connect(self, pool):
+        # timeout=0: lock waits are handled (and measured) by run_with_busy_retry.
+        # check_same_thread=False: in cooperative mode statements run on pool threads,
+        # though a connection is still only ever used by one request at a time.
+        conn = sqlite3.connect(pool_database(pool), timeout=0, factory=InstrumentedConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if REPLICA_DIR:
+            # The WAL shipper checkpoints once it has copied every frame (see WAL Shipping)
+            conn.execute('PRAGMA wal_autocheckpoint=0')
+        return conn
+
+    def create_schema(self, cursor):
+        create_sqlite_schema(cursor)
+
+    def open_watch(self, pool):
+        return sqlite3.connect(pool_database(pool), check_same_thread=False)
+
+    def data_version(self, watch):
+        # Changes whenever any other connection (in this worker or another) commits
+        return watch.execute('PRAGMA data_version').fetchone()[0]
+
+    def close_watch(self, watch):
+        watch.close()
+
+    def pool_exists(self, pool):
+        return os.path.exists(pool_database(pool))
+
+    def create_pool(self, pool):
+        os.makedirs(POOLS_DIR, exist_ok=True)
+        return pool_database(pool)
+
+    def lock_square(self, cursor, grid_id, row, col, email):
+        """Make a claim's availability and per-email limit checks atomic with its update"""
+        # SQLite has no row locks: take the database write lock before reading
+        cursor.execute('BEGIN IMMEDIATE')
+
+    def lock_squares(self, cursor):
+        """Block writes to squares until the transaction ends"""
+        cursor.execute('BEGIN IMMEDIATE')
+
+    def close(self):
+        pass
+
+class PostgresRow(tuple):
+    """Row addressable by position or column name, like sqlite3.Row"""
+
+    def __new__(cls, values, columns):
+        row = super().__new__(cls, values)
+        row.columns = columns
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self.columns[key])
+        return tuple.__getitem__(self, key)
+
+    def keys(self):
+        return list(self.columns)
+
+def postgres_row_factory(cursor):
+    columns = {column.name: i for i, column in enumerate(cursor.description or ())}
+    return lambda values: PostgresRow(values, columns)
+
+@lru_cache(maxsize=1024)
+def postgres_sql(sql):
+    """Rewrite a statement for PostgreSQL, or return None for SQLite-only no-ops"""
+    stripped = sql.strip()
+    if stripped.upper().startswith(('PRAGMA', 'BEGIN')):
+        # Postgres transactions start implicitly; row locks replace BEGIN IMMEDIATE
+        return None
+    sql = sql.replace('%', '%%')
+    sql = re.sub(r"json_extract\(value, '\$\[(\d+)\]'\)", r'(value::json->>\1)::integer', sql)
+    sql = sql.replace('json_each(?)', 'json_array_elements_text(?::json)')
+    # SQLite's LIKE ignores ASCII case
+    sql = re.sub(r'\bLIKE\b', 'ILIKE', sql)
+    if stripped.upper().startswith('INSERT OR IGNORE'):
+        sql = sql.replace('INSERT OR IGNORE', 'INSERT', 1).rstrip().rstrip(';') + ' ON CONFLICT DO NOTHING'
+    return sql.replace('?', '%s')
+
+def postgres_params(parameters):
+    # SQLite stores True/False as 1/0 in INTEGER columns; Postgres would reject a boolean there
+    return [int(p) if isinstance(p, bool) else p for p in parameters or ()]
+
+def raise_as_sqlite_error(e):
+    import psycopg
+    if isinstance(e, psycopg.IntegrityError):
+        raise sqlite3.IntegrityError(str(e)) from e
+    raise sqlite3.OperationalError(str(e)) from e
+
+class PostgresCursor:
+    """The subset of sqlite3.Cursor the app uses, on a psycopg cursor"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.raw = connection.raw.cursor(row_factory=postgres_row_factory)
+        self.arraysize = 1
+        self.profile_stats = None
+
+    def execute(self, sql, parameters=()):
+        statement = postgres_sql(sql)
+        if statement is None:
+            return self
+        start = time.perf_counter()
+        try:
+            self.raw.execute(statement, postgres_params(parameters))
+        except Exception as e:
+            if type(e).__module__.startswith('psycopg'):
+                raise_as_sqlite_error(e)
+            raise
+        elapsed = time.perf_counter() - start
+        record_db_call(elapsed, 0.0, 0)
+        if SQL_PROFILE:
+            self.profile_stats = profile_statement(self.connection, sql, parameters, elapsed, self.raw.rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        statement = postgres_sql(sql)
+        seq_of_parameters = [postgres_params(p) for p in seq_of_parameters]
+        start = time.perf_counter()
+        try:
+            self.raw.executemany(statement, seq_of_parameters)
+        except Exception as e:
+            if type(e).__module__.startswith('psycopg'):
+                raise_as_sqlite_error(e)
+            raise
+        record_db_call(time.perf_counter() - start, 0.0, 0)
+        return self
+
+    def fetchone(self):
+        return self.raw.fetchone()
+
+    def fetchmany(self, size=None):
+        return self.raw.fetchmany(self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self.raw.fetchall()
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    @property
+    def rowcount(self):
+        return self.raw.rowcount
+
+    @property
+    def description(self):
+        return self.raw.description
+
+    @property
+    def lastrowid(self):
+        # Every table the app inserts into and then reads back has a serial id
+        return self.connection.raw.execute('SELECT lastval()').fetchone()[0]
+
+class PostgresConnection:
+    """The subset of sqlite3.Connection the app uses, on a pooled psycopg connection"""
+
+    def __init__(self, storage, raw):
+        self.storage = storage
+        self.raw = raw
+
+    def cursor(self):
+        return PostgresCursor(self)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if self.raw is not None:
+            raw, self.raw = self.raw, None
+            self.storage.release(raw)
+
+POSTGRES_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS audit_log (
+        id SERIAL PRIMARY KEY,
+        action TEXT NOT NULL,
+        details TEXT,
+        actor_email TEXT,
+        target_email TEXT,
+        grid_id INTEGER,
+        row INTEGER,
+        col INTEGER,
+        timestamp TEXT NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS grids (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        row_numbers TEXT,
+        col_numbers TEXT,
+        numbers_locked INTEGER DEFAULT 0,
+        created_at TEXT,
+        is_active INTEGER DEFAULT 1
+    )''',
+    '''CREATE TABLE IF NOT EXISTS squares (
+        id SERIAL PRIMARY KEY,
+        grid_id INTEGER NOT NULL DEFAULT 1,
+        row INTEGER NOT NULL,
+        col INTEGER NOT NULL,
+        owner_name TEXT,
+        owner_email TEXT,
+        claimed_at TEXT,
+        paid INTEGER DEFAULT 0,
+        player_name TEXT,
+        UNIQUE (grid_id, row, col)
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_squares_owner_email ON squares(owner_email)',
+    '''CREATE TABLE IF NOT EXISTS game_config (
+        id INTEGER PRIMARY KEY,
+        team1_name TEXT DEFAULT 'Team 1',
+        team2_name TEXT DEFAULT 'Team 2',
+        price_per_square DOUBLE PRECISION DEFAULT 10.00,
+        squares_limit INTEGER DEFAULT 5,
+        prize_q1 DOUBLE PRECISION DEFAULT 10.0,
+        prize_q2 DOUBLE PRECISION DEFAULT 10.0,
+        prize_q3 DOUBLE PRECISION DEFAULT 10.0,
+        prize_q4 DOUBLE PRECISION DEFAULT 20.0,
+        q1_team1 INTEGER,
+        q1_team2 INTEGER,
+        q2_team1 INTEGER,
+        q2_team2 INTEGER,
+        q3_team1 INTEGER,
+        q3_team2 INTEGER,
+        q4_team1 INTEGER,
+        q4_team2 INTEGER,
+        team1_logo TEXT,
+        team2_logo TEXT,
+        team1_color TEXT DEFAULT '#0060aa',
+        team2_color TEXT DEFAULT '#cc0000',
+        show_winners INTEGER DEFAULT 0,
+        claim_deadline TEXT,
+        q1_locked INTEGER DEFAULT 0,
+        q2_locked INTEGER DEFAULT 0,
+        q3_locked INTEGER DEFAULT 0,
+        q4_locked INTEGER DEFAULT 0,
+        live_sync_enabled INTEGER DEFAULT 0,
+        espn_game_id TEXT,
+        emails_enabled INTEGER DEFAULT 0,
+        banner_enabled INTEGER DEFAULT 0,
+        banner_text TEXT DEFAULT '',
+        version INTEGER DEFAULT 0
+    )''',
+    'ALTER TABLE game_config ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 0',
+    '''CREATE TABLE IF NOT EXISTS admins (
+        id SERIAL PRIMARY KEY,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS email_sends (
+        id SERIAL PRIMARY KEY,
+        quarter INTEGER NOT NULL,
+        grid_id INTEGER,
+        email_type TEXT NOT NULL,
+        recipient_email TEXT NOT NULL,
+        recipient_name TEXT,
+        status TEXT DEFAULT 'pending',
+        error_message TEXT,
+        created_at TEXT NOT NULL,
+        sent_at TEXT
+    )''',
+    # Stand-in for SQLite's PRAGMA data_version: bumped by any write to a table
+    # the board snapshots read, and visible to other nodes only once committed
+    'CREATE TABLE IF NOT EXISTS data_version (id INTEGER PRIMARY KEY, version BIGINT NOT NULL)',
+    'INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT DO NOTHING',
+    # Every change to the config row bumps its version, so cached GameConfigs know when to reload
+    '''CREATE OR REPLACE FUNCTION bump_config_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := COALESCE(OLD.version, 0) + 1;
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql''',
+    '''CREATE OR REPLACE TRIGGER game_config_version BEFORE UPDATE ON game_config
+       FOR EACH ROW EXECUTE FUNCTION bump_config_version()''',
+    '''CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE data_version SET version = version + 1 WHERE id = 1;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql''',
+] + [
+    f'''CREATE OR REPLACE TRIGGER bump_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+       FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()'''
+    for table in ('grids', 'squares', 'game_config', 'email_sends')
+] + [
+    counter_table_sql(table, key, key_type) for table, key, key_type, _ in COUNTER_TABLES
+] + [
+    f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS changes INTEGER NOT NULL DEFAULT 0' for table, _, _, _ in COUNTER_TABLES
+] + [
+    '''CREATE OR REPLACE FUNCTION count_squares() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.owner_name IS NOT NULL THEN
+            %s;
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.owner_name IS NOT NULL THEN
+            %s;
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql''' % (';\n'.join(counter_remove_sql('OLD')), ';\n'.join(counter_add_sql('NEW'))),
+    f'''CREATE OR REPLACE TRIGGER count_squares AFTER INSERT OR DELETE OR UPDATE OF {COUNTED_COLUMNS} ON squares
+       FOR EACH ROW EXECUTE FUNCTION count_squares()''',
+]
+
+def configure_postgres_connection(conn):
+    from psycopg.types.numeric import NumericLoader
+
+    class SQLiteNumericLoader(NumericLoader):
+        """numeric results (e.g. SUM over bigint) as the int or float SQLite would return"""
+
+        def load(self, data):
+            value = super().load(data)
+            return int(value) if value == value.to_integral_value() else float(value)
+
+    conn.adapters.register_loader('numeric', SQLiteNumericLoader)
+    conn.commit()
+
+def pool_schema(pool):
+    return 'public' if pool is None else f'pool_{pool.replace("-", "_")}'
+
+class PostgresStorage:
+    """Every pool in one PostgreSQL database, one schema per pool, through a connection pool"""
+
+    name = 'postgres'
+
+    def __init__(self, url):
+        self.url = url
+        self.lock = threading.Lock()
+        self.pid = None
+        self.pool = None
+        self.known_pools = set()
+
+    def connection_pool(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Never share the parent's sockets after a fork
+                from psycopg_pool import ConnectionPool
+                # prepare_threshold=0: prepare every statement server-side on its first use
+                self.pool = ConnectionPool(self.url, min_size=1, max_size=POSTGRES_POOL_SIZE,
+                                           kwargs={'prepare_threshold': 0}, configure=configure_postgres_connection)
+                self.pid = os.getpid()
+            return self.pool
+
+    def connect(self, pool):
+        raw = self.connection_pool().getconn()
+        schema = pool_schema(pool)
+        # Fresh connections start on public; only switch (and commit, so a later
+        # rollback can't undo it) when the pooled connection was last used elsewhere
+        if getattr(raw, 'squares_schema', 'public') != schema:
+            raw.execute('SELECT set_config(%s, %s, false)', ('search_path', f'"{schema}"'))
+            raw.commit()
+            raw.squares_schema = schema
+        return PostgresConnection(self, raw)
+
+    def close(self):
+        """Close this process's connection pool; the next connect opens a new one"""
+        with self.lock:
+            if self.pool is not None and self.pid == os.getpid():
+                self.pool.close()
+            self.pool = None
+            self.pid = None
+
+    def release(self, raw):
+        try:
+            raw.rollback()
+        finally:
+            self.connection_pool().putconn(raw)
+
+    def create_schema(self, cursor):
+        # Workers start together; concurrent CREATE ... IF NOT EXISTS can still collide
+        cursor.raw.execute("SELECT pg_advisory_xact_lock(hashtext('squares schema'))")
+        for statement in POSTGRES_SCHEMA:
+            cursor.raw.execute(statement)
+
+    def open_watch(self, pool):
+        return pool
+
+    def data_version(self, watch):
+        conn = self.connect(watch)
+        try:
+            return conn.execute('SELECT version FROM data_version WHERE id = 1').fetchone()[0]
+        finally:
+            conn.close()
+
+    def close_watch(self, watch):
+        pass
+
+    def pool_exists(self, pool):
+        if pool not in self.known_pools:
+            conn = self.connect(None)
+            try:
+                if not conn.execute('SELECT 1 FROM pg_namespace WHERE nspname = ?', (pool_schema(pool),)).fetchone():
+                    return False
+            finally:
+                conn.close()
+            self.known_pools.add(pool)
+        return True
+
+    def create_pool(self, pool):
+        conn = self.connect(None)
+        conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{pool_schema(pool)}"')
+        conn.commit()
+        conn.close()
+        return f'schema {pool_schema(pool)}'
+
+    def lock_square(self, cursor, grid_id, row, col, email):
+        """Make a claim's availability and per-email limit checks atomic with its update"""
+        # Claims by the same email queue up for the per-email limit; two claims of one square
+        # race on the (grid_id, row, col) unique key when inserting
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(?))', (email,))
+
+    def lock_squares(self, cursor):
+        """Block writes to squares until the transaction ends"""
+        cursor.execute('LOCK TABLE squares IN SHARE MODE')
+
+if DATABASE_URL.startswith(('postgres://', 'postgresql://')):
+    storage = PostgresStorage(DATABASE_URL)
+else:
+    storage = SQLiteStorage()
+
 def get_db():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
+    conn = storage.connect(current_pool())
+    if has_app_context():
+        # Returned to the backend at teardown even if a handler bails out early
+        g.setdefault('db_connections', []).append(conn)
     return conn
 
+@app.teardown_appcontext
+def close_db_connections(exc):
+    for conn in g.pop('db_connections', []):
+        conn.close()
+
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
@@ -41,6 +1294,127 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# ==========================================
+# Rate Limiting and Admission Control
+# ==========================================
+
+# One connection per thread: the gevent thread pool and threaded servers (gthread
+# workers, the dev server) would otherwise interleave transactions on one connection
+rate_limit_local = threading.local()
+
+def get_rate_limit_db():
+    """This thread's autocommit connection to the shared rate limit store.
+
+    rate_limited() runs the limiter's transactions through run_db_call, so
+    under gevent waiting for another worker's lock blocks a pool thread,
+    not every greenlet.
+    """
+    if getattr(rate_limit_local, 'pid', None) != os.getpid():
+        conn = sqlite3.connect(RATE_LIMIT_DATABASE, timeout=0.5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS inflight (id INTEGER PRIMARY KEY AUTOINCREMENT, started REAL NOT NULL)')
+        rate_limit_local.conn = conn
+        rate_limit_local.pid = os.getpid()
+    return rate_limit_local.conn
+
+def take_token(key, capacity, rate):
+    """Take one token from a bucket. Returns (allowed, seconds until a token is available)."""
+    conn = get_rate_limit_db()
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, tokens, now))
+
+        # Occasionally drop buckets that have been full for a while
+        if random.random() < 0.01:
+            conn.execute('DELETE FROM buckets WHERE updated < ?', (now - 3600,))
+        conn.execute('COMMIT')
+    except sqlite3.Error:
+        conn.execute('ROLLBACK')
+        raise
+    return allowed, 0 if allowed else math.ceil((1 - tokens) / rate)
+
+def acquire_inflight_slot():
+    """Reserve a global in-flight slot, or return None if the server is at capacity"""
+    conn = get_rate_limit_db()
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Slots from crashed workers expire instead of leaking forever
+        conn.execute('DELETE FROM inflight WHERE started < ?', (now - INFLIGHT_STALE_SECONDS,))
+        active = conn.execute('SELECT COUNT(*) FROM inflight').fetchone()[0]
+        slot_id = None
+        if active < WRITE_CONCURRENCY_LIMIT:
+            slot_id = conn.execute('INSERT INTO inflight (started) VALUES (?)', (now,)).lastrowid
+        conn.execute('COMMIT')
+    except sqlite3.Error:
+        conn.execute('ROLLBACK')
+        raise
+    return slot_id
+
+def release_inflight_slot(slot_id):
+    get_rate_limit_db().execute('DELETE FROM inflight WHERE id = ?', (slot_id,))
+
+def rate_limited(endpoint):
+    """Apply per-IP and per-email token buckets plus the global admission gate.
+
+    Admin sessions are exempt. If the rate limit store itself is unavailable
+    the request is let through rather than failing the site.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if session.get('is_admin'):
+                return f(*args, **kwargs)
+
+            if request.method == 'GET':
+                email = request.args.get('email', '')
+            else:
+                email = (request.get_json(silent=True) or {}).get('email', '')
+            email = email.strip().lower() if isinstance(email, str) else ''
+
+            slot_id = None
+            # Buckets are per pool: traffic to one pool doesn't spend another's allowance
+            pool = current_pool()
+            scope = endpoint if pool is None else f'{pool}/{endpoint}'
+            try:
+                keys = [('ip', request.remote_addr or 'unknown')]
+                if email:
+                    keys.append(('email', email))
+                for kind, value in keys:
+                    capacity, rate = RATE_LIMITS[endpoint][kind]
+                    allowed, retry_after = run_db_call(take_token, f'{scope}:{kind}:{value}', capacity, rate)
+                    if not allowed:
+                        response = jsonify({'error': 'Too many requests. Please wait a moment and try again.'})
+                        response.headers['Retry-After'] = str(retry_after)
+                        return response, 429
+
+                slot_id = run_db_call(acquire_inflight_slot)
+                if slot_id is None:
+                    response = jsonify({'error': 'The server is busy. Please try again in a moment.'})
+                    response.headers['Retry-After'] = '1'
+                    return response, 503
+            except sqlite3.Error as e:
+                app.logger.warning('Rate limit store unavailable, allowing request: %s', e)
+
+            try:
+                return f(*args, **kwargs)
+            finally:
+                if slot_id is not None:
+                    try:
+                        run_db_call(release_inflight_slot, slot_id)
+                    except sqlite3.Error:
+                        pass
+        return decorated_function
+    return decorator
+
 def log_audit(action, details=None, actor_email=None, target_email=None, grid_id=None, row=None, col=None):
     """Log an action to the audit log"""
     conn = get_db()
@@ -52,9 +1426,25 @@ def log_audit(action, details=None, actor_email=None, target_email=None, grid_id
     conn.commit()
     conn.close()
 
-def init_db():
-    conn = get_db()
-    cursor = conn.cursor()
+def log_audit_many(cursor, entries):
+    """Write several audit rows on an open cursor; the caller owns the transaction.
+
+    Each entry is a dict of log_audit() keyword arguments.
+    """
+    now = datetime.now().isoformat()
+    cursor.executemany('''
+        INSERT INTO audit_log (action, details, actor_email, target_email, grid_id, row, col, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(e['action'], e.get('details'), e.get('actor_email'), e.get('target_email'),
+           e.get('grid_id'), e.get('row'), e.get('col'), now) for e in entries])
+
+def create_sqlite_schema(cursor):
+    # WAL lets readers (e.g. streaming exports) run alongside writers without blocking claims
+    cursor.execute('PRAGMA journal_mode=WAL')
+
+    # One process migrates at a time (init_db commits); a worker starting alongside
+    # another waits here, then finds every migration already applied
+    cursor.execute('BEGIN IMMEDIATE')
 
     # Create audit_log table
     cursor.execute('''
@@ -143,6 +1533,9 @@ def init_db():
     except sqlite3.OperationalError:
         pass
 
+    # Index squares by owner for participant lookups and per-email limits
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_squares_owner_email ON squares(owner_email)')
+
     # Migration: Add prize percentage columns if not exists
     for col in ['prize_q1', 'prize_q2', 'prize_q3', 'prize_q4']:
         try:
@@ -248,36 +1641,60 @@ def init_db():
     except sqlite3.OperationalError:
         pass
 
+    # Migration: every change to the config row bumps its version, so cached GameConfigs know when to reload
+    try:
+        cursor.execute('ALTER TABLE game_config ADD COLUMN version INTEGER DEFAULT 0')
+    except sqlite3.OperationalError:
+        pass
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS game_config_version AFTER UPDATE ON game_config
+        WHEN NEW.version IS OLD.version
+        BEGIN
+            UPDATE game_config SET version = COALESCE(OLD.version, 0) + 1 WHERE id = NEW.id;
+        END
+    ''')
+
+    create_sqlite_counters(cursor)
+
+def legacy_grid_numbers(cursor):
+    """Numbers from the single-grid schema, which kept them on game_config (SQLite only)"""
+    if storage.name != 'sqlite':
+        return None
+    try:
+        cursor.execute('SELECT row_numbers, col_numbers, numbers_locked FROM game_config WHERE id = 1')
+        return cursor.fetchone()
+    except sqlite3.OperationalError:
+        # Old columns don't exist
+        return None
+
+def init_db():
+    conn = get_db()
+    cursor = conn.cursor()
+
+    storage.create_schema(cursor)
+
     # Create default grid if none exists
     cursor.execute('SELECT COUNT(*) FROM grids')
     if cursor.fetchone()[0] == 0:
         # Check if we need to migrate from old game_config (has row_numbers column)
-        try:
-            cursor.execute('SELECT row_numbers, col_numbers, numbers_locked FROM game_config WHERE id = 1')
-            old_config = cursor.fetchone()
-            if old_config and old_config[0]:
-                cursor.execute('''
-                    INSERT INTO grids (name, row_numbers, col_numbers, numbers_locked, created_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', ('Grid 1', old_config[0], old_config[1], old_config[2], datetime.now().isoformat()))
-            else:
-                cursor.execute('''
-                    INSERT INTO grids (name, created_at) VALUES (?, ?)
-                ''', ('Grid 1', datetime.now().isoformat()))
-        except sqlite3.OperationalError:
-            # Old columns don't exist, create fresh grid
+        old_config = legacy_grid_numbers(cursor)
+        if old_config and old_config[0]:
+            cursor.execute('''
+                INSERT INTO grids (name, row_numbers, col_numbers, numbers_locked, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ('Grid 1', old_config[0], old_config[1], old_config[2], datetime.now().isoformat()))
+        else:
             cursor.execute('''
                 INSERT INTO grids (name, created_at) VALUES (?, ?)
             ''', ('Grid 1', datetime.now().isoformat()))
 
-    # Initialize all 100 squares for grid 1 if not exist
-    cursor.execute('SELECT COUNT(*) FROM squares WHERE grid_id = 1')
+    # Migration: only claimed squares are stored, so drop the empty rows older databases pre-filled
+    cursor.execute('DELETE FROM squares WHERE owner_name IS NULL')
+
+    # Counters start from a recount when first created (or while nothing has been sold)
+    cursor.execute('SELECT COUNT(*) FROM grid_counts')
     if cursor.fetchone()[0] == 0:
-        for row in range(10):
-            for col in range(10):
-                cursor.execute('''
-                    INSERT OR IGNORE INTO squares (grid_id, row, col) VALUES (?, ?, ?)
-                ''', (1, row, col))
+        rebuild_counters(cursor)
 
     # Initialize game config if not exist
     cursor.execute('SELECT COUNT(*) FROM game_config')
@@ -296,9 +1713,10 @@ def init_db():
 
     conn.commit()
     conn.close()
+    pool_state['initialized'].add(current_pool())
 
 def create_grid(name):
-    """Create a new grid and initialize its 100 squares"""
+    """Create a new grid; its squares exist only once claimed"""
     conn = get_db()
     cursor = conn.cursor()
 
@@ -307,27 +1725,256 @@ def create_grid(name):
     ''', (name, datetime.now().isoformat()))
     grid_id = cursor.lastrowid
 
-    # Initialize 100 squares for this grid
-    for row in range(10):
-        for col in range(10):
-            cursor.execute('''
-                INSERT INTO squares (grid_id, row, col) VALUES (?, ?, ?)
-            ''', (grid_id, row, col))
-
     conn.commit()
     conn.close()
     return grid_id
 
+# ==========================================
+# Static Asset Pipeline
+# ==========================================
+
+def minify_js(source):
+    """Strip indentation, blank lines and whole-line comments from JS.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly as
+    in the original file, and lines inside template literals are left as-is.
+    """
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                lines.append(stripped)
+        # Track whether the line ends inside a multi-line template literal
+        if len(re.findall(r'(?<!\\)`', line)) % 2 == 1:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+def minify_css(source):
+    """Strip comments and collapse whitespace in CSS"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};])\s*', r'\1', source)
+    return source.replace(';}', '}').strip() + '\n'
+
+
+def build_assets():
+    """Minify and fingerprint static assets into static/dist.
+
+    Each worker builds the same content-addressed files, so writes are atomic
+    renames and concurrent builds are harmless. Returns the manifest mapping
+    source names to fingerprinted names. Files of earlier builds are pruned
+    (see prune_assets).
+    """
+    manifest = {}
+    try:
+        os.makedirs(ASSET_DIST_DIR, exist_ok=True)
+        for name in ASSET_SOURCES:
+            with open(os.path.join(app.static_folder, name), 'rb') as f:
+                content = f.read()
+            if name.endswith('.js'):
+                content = minify_js(content.decode('utf-8')).encode('utf-8')
+            elif name.endswith('.css'):
+                content = minify_css(content.decode('utf-8')).encode('utf-8')
+
+            stem, ext = os.path.splitext(name)
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            fingerprinted = f'{stem}.{digest}{ext}'
+            path = os.path.join(ASSET_DIST_DIR, fingerprinted)
+            if not os.path.exists(path):
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            manifest[name] = fingerprinted
+        prune_assets(manifest)
+    except OSError as e:
+        # Fall back to the plain /static URLs if the build can't be written
+        app.logger.warning('Could not build static assets: %s', e)
+        manifest = {}
+
+    asset_manifest.clear()
+    asset_manifest.update(manifest)
+    return manifest
+
+def prune_assets(manifest):
+    """Remove files in static/dist the manifest doesn't name.
+
+    dist/manifest.json records the current build and is only rewritten when
+    the build changes, so its mtime is when this build became current. Older
+    builds' files are kept until that is ASSET_RETAIN_SECONDS ago.
+    """
+    manifest_path = os.path.join(ASSET_DIST_DIR, 'manifest.json')
+    try:
+        with open(manifest_path) as f:
+            recorded = json.load(f)
+        current_since = os.path.getmtime(manifest_path)
+    except (OSError, ValueError):
+        recorded, current_since = None, None
+    if recorded != manifest:
+        tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+        return
+    if current_since > time.time() - ASSET_RETAIN_SECONDS:
+        return
+
+    keep = set(manifest.values()) | {'manifest.json'}
+    cutoff = time.time() - ASSET_RETAIN_SECONDS
+    for entry in os.scandir(ASSET_DIST_DIR):
+        if not entry.is_file() or entry.name in keep:
+            continue
+        # A .tmp file may be another worker's write in progress
+        if not entry.name.endswith('.tmp') or entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # Another worker pruned it first
+
+def asset_url(name):
+    """URL for a static asset, fingerprinted when the build succeeded"""
+    if name in asset_manifest:
+        return f'/assets/{asset_manifest[name]}'
+    return f'/static/{name}'
+
+app.jinja_env.globals['asset_url'] = asset_url
+
+
+@app.route('/assets/<path:filename>')
+def fingerprinted_asset(filename):
+    """Serve fingerprinted assets; the content hash in the name makes them immutable"""
+    response = send_from_directory(ASSET_DIST_DIR, filename, max_age=ASSET_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Build fingerprinted static assets ahead of deploy"""
+    for name, fingerprinted in build_assets().items():
+        click.echo(f'{name} -> {fingerprinted}')
+
+# ==========================================
+# Request Metrics
+# ==========================================
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+def record_request(status):
+    if getattr(g, 'request_recorded', False) or not hasattr(g, 'request_started'):
+        return
+    g.request_recorded = True
+    labels = {
+        'route': request.url_rule.rule if request.url_rule else 'unmatched',
+        'method': request.method,
+        'status': str(status),
+    }
+    inc_counter('squares_http_requests_total', labels)
+    observe('squares_http_request_duration_seconds', time.perf_counter() - g.request_started, labels)
+
+@app.after_request
+def record_request_metrics(response):
+    record_request(response.status_code)
+    if SQL_PROFILE and g.get('sql_count'):
+        response.headers['Server-Timing'] = f'db;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_count} queries"'
+    return response
+
+@app.teardown_request
+def record_failed_request_metrics(exc):
+    # after_request doesn't run for unhandled exceptions
+    if exc is not None:
+        record_request(500)
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint, aggregated across all workers"""
+    token_ok = METRICS_TOKEN and request.headers.get('Authorization') == f'Bearer {METRICS_TOKEN}'
+    if not token_ok and not session.get('is_admin'):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    # Computed at scrape time so it is exact regardless of which worker answers
+    conn = get_db()
+    pending = conn.execute("SELECT COUNT(*) FROM email_sends WHERE status = 'pending'").fetchone()[0]
+    conn.close()
+
+    flush_metrics()
+    counters, gauges, histograms = collect_metrics()
+    # The pending count is global, not per worker, so it isn't summed across files
+    gauges[metric_key('squares_email_sends_pending', None)] = pending
+    return Response(render_metrics(counters, gauges, histograms), mimetype='text/plain; version=0.0.4')
+
+SQL_PROFILE_SORTS = {
+    'total': lambda s: s['total_ms'],
+    'calls': lambda s: s['calls'],
+    'avg': lambda s: s['avg_ms'],
+    'max': lambda s: s['max_ms'],
+    'rows': lambda s: s['rows'],
+}
+
+@app.route('/api/admin/sql-profile')
+@admin_required
+def get_sql_profile():
+    """Top statements across all workers, by total time unless ?sort= says otherwise"""
+    sort = request.args.get('sort', 'total')
+    if sort not in SQL_PROFILE_SORTS:
+        return jsonify({'error': f'sort must be one of: {", ".join(SQL_PROFILE_SORTS)}'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 25)), 1), 500)
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    route_filter = request.args.get('route')
+
+    flush_metrics()
+    counters, _, _ = collect_metrics()
+    route_requests = defaultdict(float)
+    for (name, labels), value in counters.items():
+        if name == 'squares_http_requests_total':
+            route_requests[dict(labels)['route']] += value
+
+    statements = []
+    for (route, sql), (calls, seconds, slowest, rows) in collect_sql_profile().items():
+        if route_filter and route != route_filter:
+            continue
+        requests_seen = route_requests.get(route)
+        statements.append({
+            'route': route,
+            'sql': sql,
+            'calls': calls,
+            # How many times one request runs this statement, e.g. 2.0 for a duplicated read
+            'calls_per_request': round(calls / requests_seen, 2) if requests_seen else None,
+            'total_ms': round(seconds * 1000, 2),
+            'avg_ms': round(seconds * 1000 / calls, 3),
+            'max_ms': round(slowest * 1000, 2),
+            'rows': rows,
+        })
+    statements.sort(key=SQL_PROFILE_SORTS[sort], reverse=True)
+
+    return jsonify({
+        'enabled': SQL_PROFILE,
+        'slow_ms': SQL_SLOW_MS,
+        'statements': statements[:limit],
+    })
+
 # Main page - no login required
 @app.route('/')
 def index():
-    return render_template('index.html')
+    # The board, grid list and logos are inlined so the first paint needs no API calls
+    initial_state = get_snapshot('initial_state', build_initial_state)
+    return render_template('index.html', initial_state=initial_state, is_admin=bool(session.get('is_admin')))
 
 # Admin login page
 @app.route('/admin')
 def admin_page():
     if session.get('is_admin'):
-        return redirect('/')
+        return redirect(f'{request.script_root}/')
     return render_template('admin_login.html')
 
 @app.route('/api/admin/login', methods=['POST'])
@@ -450,51 +2097,169 @@ def change_credentials():
 
     return jsonify({'success': True, 'email': updated_email})
 
-# Grid API
-@app.route('/api/grids', methods=['GET'])
-def get_grids():
-    """Get list of all grids with their square counts"""
+# ==========================================
+# Board Snapshot Cache
+# ==========================================
+
+# Public board reads are served from per-process, per-pool snapshots. Each
+# pool handle watches the storage backend's data version, which changes
+# whenever any other connection (in this worker or another) commits, and any
+# change drops that pool's snapshots so the next read rebuilds them.
+COMPACT_GRID_MIMETYPE = 'application/vnd.squares.grid-compact+json'
+# Emails whose squares each pool handle keeps for /api/me
+PERSON_CACHE_SIZE = 2000
+
+@contextmanager
+def locked_pool_handle():
+    """The current pool's handle, held under its lock, its snapshots dropped if the database changed.
+
+    A rebuild in one pool only waits out other readers of that pool.
+    """
+    with pool_lock:
+        handle = get_pool_handle(current_pool())
+    with handle['lock']:
+        if handle['watch'] is None:
+            # Evicted and closed while we waited for it
+            handle['watch'] = storage.open_watch(handle['pool'])
+        # Checked on every read, so it goes to the thread pool like any other SQL under gevent
+        version = run_db_call(storage.data_version, handle['watch'])
+        if version != handle['version']:
+            handle['entries'].clear()
+            handle['version'] = version
+            handle['config_stale'] = True
+        yield handle
+
+def get_snapshot(key, builder):
+    """Return the cached snapshot for key, rebuilding it if the database has changed"""
+    with locked_pool_handle() as handle:
+        entries = handle['entries']
+        if key not in entries:
+            entries[key] = builder()
+        return entries[key]
+
+def config_number(value, default, kind=float):
+    try:
+        return kind(value) if value is not None and value != '' else default
+    except (TypeError, ValueError):
+        return default
+
+class GameConfig:
+    """The game_config row as typed attributes, with defaults applied in one place.
+
+    One instance per pool is shared by every request in the process, so treat
+    it as read-only; as_dict() returns a copy of the raw row for API payloads.
+    """
+
+    def __init__(self, row):
+        self.row = dict(row) if row else {}
+        row = self.row
+        self.version = row.get('version') or 0
+        self.team1_name = row.get('team1_name') or 'Team 1'
+        self.team2_name = row.get('team2_name') or 'Team 2'
+        self.team1_color = row.get('team1_color') or '#0060aa'
+        self.team2_color = row.get('team2_color') or '#cc0000'
+        self.team1_logo = row.get('team1_logo')
+        self.team2_logo = row.get('team2_logo')
+        self.price_per_square = config_number(row.get('price_per_square'), 10.0)
+        self.squares_limit = config_number(row.get('squares_limit'), 5, int) or 5
+        # Prize percentages of the pot, by quarter
+        self.prizes = {q: config_number(row.get(f'prize_q{q}'), 20.0 if q == 4 else 10.0) for q in range(1, 5)}
+        # (team1, team2) score by quarter, or None until both are saved
+        self.scores = {}
+        for q in range(1, 5):
+            team1 = config_number(row.get(f'q{q}_team1'), None, int)
+            team2 = config_number(row.get(f'q{q}_team2'), None, int)
+            self.scores[q] = (team1, team2) if team1 is not None and team2 is not None else None
+        self.locked = {q: bool(row.get(f'q{q}_locked')) for q in range(1, 5)}
+        self.claim_deadline = None
+        if row.get('claim_deadline'):
+            try:
+                self.claim_deadline = datetime.fromisoformat(row['claim_deadline'])
+            except ValueError:
+                pass
+        self.show_winners = bool(row.get('show_winners'))
+        self.live_sync_enabled = bool(row.get('live_sync_enabled'))
+        self.emails_enabled = bool(row.get('emails_enabled'))
+        self.banner_enabled = bool(row.get('banner_enabled'))
+        self.banner_text = row.get('banner_text') or ''
+        self.espn_game_id = row.get('espn_game_id')
+
+    def score_fields(self):
+        """Saved scores keyed by column name (q1_team1 ... q4_team2), as stored"""
+        return {f'q{q}_team{t}': self.row.get(f'q{q}_team{t}') for q in range(1, 5) for t in (1, 2)}
+
+    def locked_quarters(self):
+        return {f'q{q}': locked for q, locked in self.locked.items()}
+
+    def as_dict(self):
+        return dict(self.row)
+
+def get_config():
+    """The current pool's GameConfig, reloaded only when game_config's version changes.
+
+    Any commit makes the version worth checking, but only a config change
+    (which bumps game_config.version) reloads the row, logos and all.
+    """
+    with locked_pool_handle() as handle:
+        if handle['config_stale']:
+            conn = get_db()
+            cursor = conn.cursor()
+            cursor.execute('SELECT version FROM game_config WHERE id = 1')
+            row = cursor.fetchone()
+            if handle['config'] is None or row is None or row['version'] != handle['config'].version:
+                cursor.execute('SELECT * FROM game_config WHERE id = 1')
+                handle['config'] = GameConfig(cursor.fetchone())
+            conn.close()
+            handle['config_stale'] = False
+        return handle['config']
+
+def build_grids_snapshot():
     conn = get_db()
     cursor = conn.cursor()
-
     cursor.execute('''
-        SELECT g.id, g.name, g.numbers_locked,
-               COUNT(CASE WHEN s.owner_name IS NOT NULL THEN 1 END) as squares_sold
+        SELECT g.id, g.name, g.numbers_locked, COALESCE(c.squares, 0) as squares_sold
         FROM grids g
-        LEFT JOIN squares s ON g.id = s.grid_id
+        LEFT JOIN grid_counts c ON g.id = c.grid_id
         WHERE g.is_active = 1
-        GROUP BY g.id
         ORDER BY g.id
     ''')
     grids = [dict(row) for row in cursor.fetchall()]
     conn.close()
-    return jsonify({'grids': grids})
-
-@app.route('/api/grid', methods=['GET'])
-def get_grid():
-    grid_id = request.args.get('grid_id', 1, type=int)
+    return grids
 
+def build_grid_snapshot(grid_id):
+    """Build the public /api/grid payload for a grid, plus a private email -> squares index"""
     conn = get_db()
     cursor = conn.cursor()
 
-    # Get squares for this grid (don't expose emails to frontend)
     cursor.execute('''
-        SELECT row, col, owner_name, claimed_at FROM squares
+        SELECT row, col, owner_name, owner_email, claimed_at FROM squares
         WHERE grid_id = ? ORDER BY row, col
     ''', (grid_id,))
-    squares = [dict(row) for row in cursor.fetchall()]
+    claimed = {(row['row'], row['col']): row for row in cursor.fetchall()}
+
+    # Only claimed squares are stored; the empty cells are filled in here
+    squares = []
+    squares_by_email = {}
+    for position in range(100):
+        square_row, square_col = divmod(position, 10)
+        row = claimed.get((square_row, square_col))
+        if row is None:
+            squares.append({'row': square_row, 'col': square_col, 'owner_name': None, 'claimed_at': None})
+            continue
+        # Don't expose emails to frontend
+        squares.append({'row': square_row, 'col': square_col, 'owner_name': row['owner_name'], 'claimed_at': row['claimed_at']})
+        if row['owner_email']:
+            squares_by_email.setdefault(row['owner_email'], []).append({'row': square_row, 'col': square_col})
 
     # Get grid-specific config (numbers)
     cursor.execute('SELECT * FROM grids WHERE id = ?', (grid_id,))
     grid_row = cursor.fetchone()
     grid_config = dict(grid_row) if grid_row else {}
+    conn.close()
 
-    # Get shared game config
-    cursor.execute('SELECT * FROM game_config WHERE id = 1')
-    config_row = cursor.fetchone()
-    config = dict(config_row) if config_row else {}
-
-    # Merge grid-specific numbers into config
+    # Merge grid-specific numbers into a copy of the shared game config
+    config = get_config().as_dict()
     if grid_config.get('row_numbers'):
         config['row_numbers'] = json.loads(grid_config['row_numbers'])
     if grid_config.get('col_numbers'):
@@ -510,8 +2275,7 @@ def get_grid():
         'q4': bool(config.get('q4_locked', 0)),
     }
 
-    conn.close()
-    return jsonify({
+    payload = {
         'squares': squares,
         'config': config,
         'grid_id': grid_id,
@@ -519,10 +2283,183 @@ def get_grid():
         'claim_deadline': config.get('claim_deadline'),
         'locked_quarters': locked_quarters,
         'live_sync_enabled': bool(config.get('live_sync_enabled', 0))
-    })
+    }
+    compact_body = json.dumps(build_compact_grid(payload), separators=(',', ':'))
+    return {'payload': payload, 'compact_body': compact_body, 'squares_by_email': squares_by_email}
+
+def claimed_epoch(claimed_at):
+    """Convert a stored claimed_at timestamp to whole epoch seconds, or None.
+
+    claimed_at is written by datetime.now() as a naive ISO string in the
+    server's local time, so it is read back in the server's current timezone.
+    Fractions of a second are dropped.
+    """
+    if not claimed_at:
+        return None
+    try:
+        return int(datetime.fromisoformat(claimed_at).timestamp())
+    except ValueError:
+        return None
+
+def build_compact_grid(payload):
+    """Compact encoding of a /api/grid payload.
+
+    Instead of 100 square dicts, owner names go in a dictionary and 'cells'
+    holds 100 row-major indexes into it (0 = unclaimed, n = owners[n - 1]).
+    Claim times are whole seconds relative to 'claimed_base', a UTC epoch
+    (see claimed_epoch), rather than the naive local ISO strings the full
+    payload carries. Team logos are left
+    out of config because the board loads them from /api/logos.
+    """
+    owners = []
+    owner_index = {}
+    cells = [0] * 100
+    epochs = [None] * 100
+    for square in payload['squares']:
+        if not square['owner_name']:
+            continue
+        position = square['row'] * 10 + square['col']
+        name = square['owner_name']
+        if name not in owner_index:
+            owners.append(name)
+            owner_index[name] = len(owners)
+        cells[position] = owner_index[name]
+        epochs[position] = claimed_epoch(square['claimed_at'])
+
+    known = [e for e in epochs if e is not None]
+    claimed_base = min(known) if known else None
+    claimed = [e - claimed_base if e is not None else None for e in epochs]
+
+    compact = {key: value for key, value in payload.items() if key not in ('squares', 'config')}
+    compact['config'] = {key: value for key, value in payload['config'].items()
+                         if key not in ('team1_logo', 'team2_logo')}
+    compact['format'] = 'compact'
+    compact['owners'] = owners
+    compact['cells'] = cells
+    compact['claimed_base'] = claimed_base
+    compact['claimed'] = claimed
+    return compact
+
+def get_grid_snapshot(grid_id):
+    """The cached board for an active grid, or None; nothing is cached for other ids"""
+    if not any(grid['id'] == grid_id for grid in get_snapshot('grids', build_grids_snapshot)):
+        return None
+    return get_snapshot(('grid', grid_id), lambda: build_grid_snapshot(grid_id))
+
+def build_email_counts_snapshot():
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('SELECT owner_email, squares FROM email_counts WHERE squares > 0')
+    counts = {row['owner_email']: row['squares'] for row in cursor.fetchall()}
+    conn.close()
+    return counts
+
+def get_person_squares(email):
+    """Every square an email owns on any grid, cached per email.
+
+    Unlike the board snapshots, an entry outlives other people's writes: after
+    a commit it is re-checked against the email's email_counts row, whose
+    changes column the counter triggers bump on each claim, clear, payment or
+    player change for that email, and only rebuilt when that row has moved.
+    """
+    with locked_pool_handle() as handle:
+        people = handle['people']
+        entry = people.get(email)
+        if entry is not None and entry['checked'] == handle['version']:
+            people.move_to_end(email)
+            return entry['squares']
+
+        conn = get_db()
+        cursor = conn.cursor()
+        stamp = None
+        if entry is not None:
+            cursor.execute('SELECT squares, paid_squares, changes FROM email_counts WHERE owner_email = ?', (email,))
+            row = cursor.fetchone()
+            stamp = tuple(row) if row else None
+        if entry is None or stamp != entry['stamp']:
+            cursor.execute('''
+                SELECT c.squares AS counted, c.paid_squares, c.changes,
+                       s.grid_id, s.row, s.col, s.owner_name, s.paid, s.player_name, s.claimed_at
+                FROM email_counts c
+                LEFT JOIN squares s ON s.owner_email = c.owner_email
+                WHERE c.owner_email = ?
+                ORDER BY s.grid_id, s.row, s.col
+            ''', (email,))
+            rows = cursor.fetchall()
+            stamp = tuple(rows[0][:3]) if rows else None
+            squares = [{
+                'grid_id': row['grid_id'],
+                'row': row['row'],
+                'col': row['col'],
+                'owner_name': row['owner_name'],
+                'paid': bool(row['paid']),
+                'player_name': row['player_name'],
+                'claimed_at': row['claimed_at'],
+            } for row in rows if row['grid_id'] is not None]
+            entry = people[email] = {'stamp': stamp, 'squares': squares}
+        conn.close()
+
+        entry['checked'] = handle['version']
+        people.move_to_end(email)
+        while len(people) > PERSON_CACHE_SIZE:
+            people.popitem(last=False)
+        return entry['squares']
+
+def html_safe_json(body):
+    """Escape a JSON text for inlining in a <script> element, as Jinja's tojson does"""
+    return (body.replace('<', '\\u003c').replace('>', '\\u003e')
+            .replace('&', '\\u0026').replace("'", '\\u0027'))
+
+def team_logo_url(config, team):
+    """Cacheable URL for a team's logo, or None; the version changes whenever the config does"""
+    if not getattr(config, f'team{team}_logo'):
+        return None
+    return f'{request.script_root}/api/logos/{team}?v={config.version}'
+
+def build_initial_state():
+    """The state index() inlines: /api/grids, compact grid 1 and the logos, as one JSON text.
+
+    The grid's config carries the alert banner. Logos are linked by URL rather
+    than as data URLs so the page stays small.
+    """
+    config = get_config()
+    grids = get_snapshot('grids', build_grids_snapshot)
+    logos = {
+        'team1_logo': team_logo_url(config, 1),
+        'team2_logo': team_logo_url(config, 2),
+        'team1_color': config.team1_color,
+        'team2_color': config.team2_color,
+    }
+    body = (f'{{"grids":{json.dumps(grids)},"grid":{get_grid_snapshot(1)["compact_body"]},'
+            f'"logos":{json.dumps(logos)}}}')
+    return html_safe_json(body)
+
+# Grid API
+@app.route('/api/grids', methods=['GET'])
+def get_grids():
+    """Get list of all grids with their square counts"""
+    return jsonify({'grids': get_snapshot('grids', build_grids_snapshot)})
+
+@app.route('/api/grid', methods=['GET'])
+def get_grid():
+    grid_id = request.args.get('grid_id', 1, type=int)
+    snapshot = get_grid_snapshot(grid_id)
+    if snapshot is None:
+        return jsonify({'error': 'Grid not found'}), 404
+
+    # Compact format via ?format=compact or Accept negotiation; the body is pre-encoded in the snapshot
+    wants_compact = (request.args.get('format') == 'compact' or
+                     request.accept_mimetypes.best_match(['application/json', COMPACT_GRID_MIMETYPE]) == COMPACT_GRID_MIMETYPE)
+    if wants_compact:
+        response = Response(snapshot['compact_body'], mimetype=COMPACT_GRID_MIMETYPE)
+    else:
+        response = jsonify(snapshot['payload'])
+    response.vary.add('Accept')
+    return response
 
 # Claim a square - no login required
 @app.route('/api/claim', methods=['POST'])
+@rate_limited('claim')
 def claim_square():
     data = request.get_json()
     grid_id = data.get('grid_id', 1)
@@ -535,6 +2472,13 @@ def claim_square():
     if row is None or col is None:
         return jsonify({'error': 'Row and column required'}), 400
 
+    try:
+        grid_id, row, col = int(grid_id), int(row), int(col)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid square'}), 400
+    if not (0 <= row < 10 and 0 <= col < 10):
+        return jsonify({'error': 'Invalid square'}), 400
+
     if not name or not email:
         return jsonify({'error': 'Name and email are required'}), 400
 
@@ -542,17 +2486,19 @@ def claim_square():
     if '@' not in email or '.' not in email:
         return jsonify({'error': 'Please enter a valid email'}), 400
 
+    # Check if claiming deadline has passed
+    config = get_config()
+    if config.claim_deadline and datetime.now() > config.claim_deadline:
+        return jsonify({'error': 'The claiming deadline has passed'}), 400
+
     conn = get_db()
     cursor = conn.cursor()
+    storage.lock_square(cursor, grid_id, row, col, email)
 
-    # Check if claiming deadline has passed
-    cursor.execute('SELECT claim_deadline FROM game_config WHERE id = 1')
-    config = cursor.fetchone()
-    if config and config['claim_deadline']:
-        deadline = datetime.fromisoformat(config['claim_deadline'])
-        if datetime.now() > deadline:
-            conn.close()
-            return jsonify({'error': 'The claiming deadline has passed'}), 400
+    cursor.execute('SELECT 1 FROM grids WHERE id = ? AND is_active = 1', (grid_id,))
+    if not cursor.fetchone():
+        conn.close()
+        return jsonify({'error': 'Grid not found'}), 404
 
     # Check if square is already claimed
     cursor.execute('SELECT owner_name FROM squares WHERE grid_id = ? AND row = ? AND col = ?', (grid_id, row, col))
@@ -562,22 +2508,24 @@ def claim_square():
         conn.close()
         return jsonify({'error': 'This square is already taken'}), 400
 
-    # Get squares limit from config
-    cursor.execute('SELECT squares_limit FROM game_config WHERE id = 1')
-    limit_row = cursor.fetchone()
-    squares_limit = limit_row['squares_limit'] if limit_row and limit_row['squares_limit'] else 5
+    squares_limit = config.squares_limit
 
     # Check email's square limit (across ALL grids)
-    cursor.execute('SELECT COUNT(*) FROM squares WHERE owner_email = ?', (email,))
-    email_square_count = cursor.fetchone()[0]
+    cursor.execute('SELECT squares FROM email_counts WHERE owner_email = ?', (email,))
+    counts = cursor.fetchone()
+    email_square_count = counts['squares'] if counts else 0
     if email_square_count >= squares_limit:
         conn.close()
         return jsonify({'error': f'This email has already claimed {squares_limit} squares (the maximum allowed)'}), 400
 
-    # Claim the square
+    # Claim the square; nothing is inserted if a concurrent claim got there first
     cursor.execute('''
-        UPDATE squares SET owner_name = ?, owner_email = ?, player_name = ?, claimed_at = ? WHERE grid_id = ? AND row = ? AND col = ?
-    ''', (name, email, player_name, datetime.now().isoformat(), grid_id, row, col))
+        INSERT OR IGNORE INTO squares (grid_id, row, col, owner_name, owner_email, player_name, claimed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (grid_id, row, col, name, email, player_name, datetime.now().isoformat()))
+    if cursor.rowcount == 0:
+        conn.close()
+        return jsonify({'error': 'This square is already taken'}), 400
 
     conn.commit()
     conn.close()
@@ -605,10 +2553,7 @@ def clear_square():
     target_email = square['owner_email'] if square else None
     owner_name = square['owner_name'] if square else None
 
-    cursor.execute('''
-        UPDATE squares SET owner_name = NULL, owner_email = NULL, player_name = NULL, claimed_at = NULL, paid = 0
-        WHERE grid_id = ? AND row = ? AND col = ?
-    ''', (grid_id, row, col))
+    cursor.execute('DELETE FROM squares WHERE grid_id = ? AND row = ? AND col = ?', (grid_id, row, col))
     conn.commit()
     conn.close()
 
@@ -756,17 +2701,51 @@ def update_scores():
     return jsonify({'success': True})
 
 
-def fetch_espn_nfl_scores():
-    """Fetch current NFL scores from ESPN API"""
-    url = 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard'
-    try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode('utf-8'))
+espn_cache_lock = threading.Lock()
+espn_fetch_lock = threading.Lock()
+espn_cache = {'data': None, 'fetched_at': 0.0}
+
+def cached_espn_scores(max_age):
+    with espn_cache_lock:
+        if espn_cache['data'] is not None and time.time() - espn_cache['fetched_at'] < max_age:
+            return espn_cache['data']
+    return None
+
+def fetch_espn_nfl_scores(max_age=ESPN_CACHE_SECONDS):
+    """Fetch current NFL scores from ESPN API, reusing a fetch younger than max_age seconds"""
+    data = cached_espn_scores(max_age)
+    if data is not None:
+        inc_counter('squares_espn_cache_requests_total', {'result': 'hit'})
+        return data
+
+    # Only one fetch at a time per worker; requests that queued behind it reuse its result
+    with espn_fetch_lock:
+        data = cached_espn_scores(max_age)
+        if data is not None:
+            inc_counter('squares_espn_cache_requests_total', {'result': 'hit'})
             return data
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError) as e:
-        print(f"Error fetching ESPN data: {e}")
-        return None
+        inc_counter('squares_espn_cache_requests_total', {'result': 'miss'})
+
+        # Imported here rather than at startup: only live score requests need it
+        import urllib.request
+        import urllib.error
+
+        start = time.perf_counter()
+        try:
+            req = urllib.request.Request(ESPN_SCOREBOARD_URL, headers={'User-Agent': 'Mozilla/5.0'})
+            with urllib.request.urlopen(req, timeout=10) as response:
+                data = json.loads(response.read().decode('utf-8'))
+        except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError) as e:
+            inc_counter('squares_espn_fetch_errors_total')
+            app.logger.warning('Error fetching ESPN data: %s', e)
+            return None
+        finally:
+            observe('squares_espn_fetch_duration_seconds', time.perf_counter() - start)
+
+        with espn_cache_lock:
+            espn_cache['data'] = data
+            espn_cache['fetched_at'] = time.time()
+        return data
 
 
 def parse_espn_game(game_data, team1_name, team2_name):
@@ -878,50 +2857,45 @@ def find_super_bowl_game(espn_data, team1_name, team2_name):
     return None
 
 
+# The game parsed out of the cached ESPN document, so polled endpoints parse
+# each fetch once rather than once per request
+live_game_lock = threading.Lock()
+live_game_cache = {'data': None, 'teams': None, 'game': None}
+
+def find_live_game(config):
+    """(espn_data, game) for the configured teams, reusing the parse of an unchanged fetch"""
+    espn_data = fetch_espn_nfl_scores()
+    if not espn_data:
+        return None, None
+    teams = (config.team1_name, config.team2_name)
+    with live_game_lock:
+        if live_game_cache['data'] is espn_data and live_game_cache['teams'] == teams:
+            return espn_data, live_game_cache['game']
+    game = find_super_bowl_game(espn_data, *teams)
+    with live_game_lock:
+        live_game_cache.update(data=espn_data, teams=teams, game=game)
+    return espn_data, game
+
+
 @app.route('/api/live-scores', methods=['GET'])
 def get_live_scores():
     """Fetch live scores from ESPN and return current game state"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Get current config including team names
-    cursor.execute('''SELECT team1_name, team2_name, espn_game_id,
-                      q1_locked, q2_locked, q3_locked, q4_locked,
-                      live_sync_enabled,
-                      q1_team1, q1_team2, q2_team1, q2_team2,
-                      q3_team1, q3_team2, q4_team1, q4_team2
-                      FROM game_config WHERE id = 1''')
-    config = cursor.fetchone()
-    conn.close()
-
-    if not config:
+    config = get_config()
+    if not config.row:
         return jsonify({'error': 'No game configuration found'}), 404
 
-    team1_name = config['team1_name']
-    team2_name = config['team2_name']
+    team1_name = config.team1_name
+    team2_name = config.team2_name
 
-    # Fetch from ESPN
-    espn_data = fetch_espn_nfl_scores()
+    # Fetch from ESPN and find the game with our teams
+    espn_data, game = find_live_game(config)
     if not espn_data:
         return jsonify({
             'error': 'Could not fetch live scores',
-            'cached_scores': {
-                'q1_team1': config['q1_team1'], 'q1_team2': config['q1_team2'],
-                'q2_team1': config['q2_team1'], 'q2_team2': config['q2_team2'],
-                'q3_team1': config['q3_team1'], 'q3_team2': config['q3_team2'],
-                'q4_team1': config['q4_team1'], 'q4_team2': config['q4_team2'],
-            },
-            'locked_quarters': {
-                'q1': bool(config['q1_locked']),
-                'q2': bool(config['q2_locked']),
-                'q3': bool(config['q3_locked']),
-                'q4': bool(config['q4_locked']),
-            }
+            'cached_scores': config.score_fields(),
+            'locked_quarters': config.locked_quarters()
         }), 503
 
-    # Find the game with our teams
-    game = find_super_bowl_game(espn_data, team1_name, team2_name)
-
     if not game:
         return jsonify({
             'error': 'Game not yet available - live scores will appear on game day',
@@ -954,20 +2928,99 @@ def get_live_scores():
             'quarter_scores': game['quarter_scores'],
             'linescores': game['linescores']
         },
-        'locked_quarters': {
-            'q1': bool(config['q1_locked']),
-            'q2': bool(config['q2_locked']),
-            'q3': bool(config['q3_locked']),
-            'q4': bool(config['q4_locked']),
-        },
-        'live_sync_enabled': bool(config['live_sync_enabled']),
-        'saved_scores': {
-            'q1_team1': config['q1_team1'], 'q1_team2': config['q1_team2'],
-            'q2_team1': config['q2_team1'], 'q2_team2': config['q2_team2'],
-            'q3_team1': config['q3_team1'], 'q3_team2': config['q3_team2'],
-            'q4_team1': config['q4_team1'], 'q4_team2': config['q4_team2'],
-        }
+        'locked_quarters': config.locked_quarters(),
+        'live_sync_enabled': config.live_sync_enabled,
+        'saved_scores': config.score_fields()
+    })
+
+
+# While a quarter is in progress, /api/live-leaders names the square on each
+# grid that would win it at the current score. Every grid's numbers become
+# digit -> row/col lookups once per data version, and the leaders for a pair
+# of last digits are computed once and cached with the board snapshots, so a
+# score change costs one pass over the grids however many viewers poll.
+
+def build_leader_maps():
+    """Per active grid with numbers: digit -> row and digit -> col lookups and each square's owner"""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, name, row_numbers, col_numbers FROM grids
+        WHERE is_active = 1 AND row_numbers IS NOT NULL AND col_numbers IS NOT NULL
+        ORDER BY id
+    ''')
+    grids = cursor.fetchall()
+    conn.close()
+
+    maps = []
+    for grid in grids:
+        row_numbers = json.loads(grid['row_numbers'])
+        col_numbers = json.loads(grid['col_numbers'])
+        if not row_numbers or not col_numbers:
+            continue
+        snapshot = get_grid_snapshot(grid['id'])
+        if snapshot is None:
+            continue  # Deactivated since the query above
+        squares = snapshot['payload']['squares']
+        maps.append({
+            'grid_id': grid['id'],
+            'grid_name': grid['name'],
+            'row_of': {digit: row for row, digit in enumerate(row_numbers)},
+            'col_of': {digit: col for col, digit in enumerate(col_numbers)},
+            'owners': [square['owner_name'] for square in squares],
+        })
+    return maps
+
+def build_live_leaders(team1_digit, team2_digit):
+    """JSON list of the square each grid puts these last digits on (team 1 picks the column)"""
+    leaders = []
+    for grid in get_snapshot('leader_maps', build_leader_maps):
+        row = grid['row_of'].get(team2_digit)
+        col = grid['col_of'].get(team1_digit)
+        if row is None or col is None:
+            continue
+        leaders.append({
+            'grid_id': grid['grid_id'],
+            'grid_name': grid['grid_name'],
+            'row': row,
+            'col': col,
+            'owner_name': grid['owners'][row * 10 + col],
+        })
+    return json.dumps(leaders)
+
+def live_quarter(game):
+    """Quarter in progress (overtime counts as Q4), or None before kickoff and after the final"""
+    if game['is_final'] or not game['period']:
+        return None
+    return min(game['period'], 4)
+
+# Public: The square leading each grid at the live score
+@app.route('/api/live-leaders', methods=['GET'])
+def get_live_leaders():
+    config = get_config()
+    espn_data, game = find_live_game(config)
+    if not espn_data:
+        return jsonify({'error': 'Could not fetch live scores'}), 503
+    if not game:
+        return jsonify({'error': 'Game not yet available - live scores will appear on game day'}), 404
+
+    quarter = live_quarter(game)
+    leaders = '[]'
+    if quarter is not None and game['team1_score'] is not None and game['team2_score'] is not None:
+        digits = (game['team1_score'] % 10, game['team2_score'] % 10)
+        leaders = get_snapshot(('live_leaders',) + digits, lambda: build_live_leaders(*digits))
+
+    summary = json.dumps({
+        'quarter': quarter,
+        'period': game['period'],
+        'clock': game['clock'],
+        'status': game['status'],
+        'is_halftime': game['is_halftime'],
+        'is_final': game['is_final'],
+        'team1_score': game['team1_score'],
+        'team2_score': game['team2_score'],
     })
+    return Response(f'{{"game":{summary},"leaders":{leaders}}}', mimetype='application/json')
 
 
 @app.route('/api/admin/sync-live-scores', methods=['POST'])
@@ -977,67 +3030,59 @@ def sync_live_scores():
     data = request.get_json() or {}
     force_quarter = data.get('force_quarter')  # Optional: force sync a specific quarter
 
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Get current config
-    cursor.execute('''SELECT team1_name, team2_name,
-                      q1_locked, q2_locked, q3_locked, q4_locked
-                      FROM game_config WHERE id = 1''')
-    config = cursor.fetchone()
-
-    if not config:
-        conn.close()
+    config = get_config()
+    if not config.row:
         return jsonify({'error': 'No game configuration found'}), 404
 
-    # Fetch from ESPN
-    espn_data = fetch_espn_nfl_scores()
+    # Fetch from ESPN, bypassing the cache so quarter locks aren't delayed
+    espn_data = fetch_espn_nfl_scores(max_age=0)
     if not espn_data:
-        conn.close()
         return jsonify({'error': 'Could not fetch live scores from ESPN'}), 503
 
-    game = find_super_bowl_game(espn_data, config['team1_name'], config['team2_name'])
+    game = find_super_bowl_game(espn_data, config.team1_name, config.team2_name)
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not yet available - live scores will appear on game day'}), 404
 
+    conn = get_db()
+    cursor = conn.cursor()
+
     # Determine which quarters to update
     updates = []
     quarter_updates = {}
 
     # Q1: Update if period > 1 or halftime or final, and not locked (unless forced)
     if (game['period'] > 1 or game['is_halftime'] or game['is_final']):
-        if not config['q1_locked'] or force_quarter == 1:
+        if not config.locked[1] or force_quarter == 1:
             quarter_updates['q1_team1'] = game['quarter_scores'].get('q1_team1')
             quarter_updates['q1_team2'] = game['quarter_scores'].get('q1_team2')
-            if not config['q1_locked']:
+            if not config.locked[1]:
                 cursor.execute('UPDATE game_config SET q1_locked = 1 WHERE id = 1')
             updates.append('Q1')
 
     # Q2: Update if period > 2 or final (halftime means Q2 is done)
     if (game['period'] > 2 or game['is_final'] or game['is_halftime']):
-        if not config['q2_locked'] or force_quarter == 2:
+        if not config.locked[2] or force_quarter == 2:
             quarter_updates['q2_team1'] = game['quarter_scores'].get('q2_team1')
             quarter_updates['q2_team2'] = game['quarter_scores'].get('q2_team2')
-            if not config['q2_locked']:
+            if not config.locked[2]:
                 cursor.execute('UPDATE game_config SET q2_locked = 1 WHERE id = 1')
             updates.append('Q2')
 
     # Q3: Update if period > 3 or final
     if (game['period'] > 3 or game['is_final']):
-        if not config['q3_locked'] or force_quarter == 3:
+        if not config.locked[3] or force_quarter == 3:
             quarter_updates['q3_team1'] = game['quarter_scores'].get('q3_team1')
             quarter_updates['q3_team2'] = game['quarter_scores'].get('q3_team2')
-            if not config['q3_locked']:
+            if not config.locked[3]:
                 cursor.execute('UPDATE game_config SET q3_locked = 1 WHERE id = 1')
             updates.append('Q3')
 
     # Q4/Final: Update if game is final
     if game['is_final']:
-        if not config['q4_locked'] or force_quarter == 4:
+        if not config.locked[4] or force_quarter == 4:
             quarter_updates['q4_team1'] = game['quarter_scores'].get('q4_team1')
             quarter_updates['q4_team2'] = game['quarter_scores'].get('q4_team2')
-            if not config['q4_locked']:
+            if not config.locked[4]:
                 cursor.execute('UPDATE game_config SET q4_locked = 1 WHERE id = 1')
             updates.append('Q4/Final')
 
@@ -1157,10 +3202,7 @@ def email_status():
     conn = get_db()
     cursor = conn.cursor()
 
-    # Get emails_enabled state
-    cursor.execute('SELECT emails_enabled FROM game_config WHERE id = 1')
-    config = cursor.fetchone()
-    emails_enabled = bool(config['emails_enabled']) if config else False
+    emails_enabled = get_config().emails_enabled
 
     # Get counts per quarter
     quarters = {}
@@ -1237,7 +3279,7 @@ def reset_game():
     cursor = conn.cursor()
 
     # Clear all squares across all grids
-    cursor.execute('UPDATE squares SET owner_name = NULL, owner_email = NULL, player_name = NULL, claimed_at = NULL, paid = 0')
+    cursor.execute('DELETE FROM squares')
 
     # Reset all grids' numbers
     cursor.execute('UPDATE grids SET row_numbers = NULL, col_numbers = NULL, numbers_locked = 0')
@@ -1322,7 +3364,6 @@ def upload_logo():
         return jsonify({'error': 'No file selected'}), 400
 
     # Read file and convert to base64
-    import base64
     file_data = file.read()
 
     # Limit file size (500KB)
@@ -1345,19 +3386,41 @@ def upload_logo():
 # Admin: Get team logos and colors
 @app.route('/api/logos', methods=['GET'])
 def get_logos():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT team1_logo, team2_logo, team1_color, team2_color FROM game_config WHERE id = 1')
-    row = cursor.fetchone()
-    conn.close()
+    config = get_config()
 
     return jsonify({
-        'team1_logo': row['team1_logo'] if row else None,
-        'team2_logo': row['team2_logo'] if row else None,
-        'team1_color': row['team1_color'] if row and row['team1_color'] else '#0060aa',
-        'team2_color': row['team2_color'] if row and row['team2_color'] else '#cc0000'
+        'team1_logo': config.team1_logo,
+        'team2_logo': config.team2_logo,
+        'team1_color': config.team1_color,
+        'team2_color': config.team2_color
     })
 
+# Public: Team logo as an image, so the page can link it instead of inlining the data URL
+@app.route('/api/logos/<int:team>', methods=['GET'])
+def get_logo_image(team):
+    config = get_config()
+    data_url = {1: config.team1_logo, 2: config.team2_logo}.get(team) or ''
+    mimetype, _, encoded = data_url.removeprefix('data:').partition(';base64,')
+    if not encoded or not mimetype.startswith('image/'):
+        return jsonify({'error': 'Logo not found'}), 404
+    try:
+        image = base64.b64decode(encoded)
+    except ValueError:
+        return jsonify({'error': 'Logo not found'}), 404
+
+    response = Response(image, mimetype=mimetype)
+    # Uploaded SVGs must not run script on this origin
+    response.headers['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if request.args.get('v') == str(config.version):
+        # A new upload changes the config version and so the URL
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
 # Admin: Update team color
 @app.route('/api/admin/team-color', methods=['POST'])
 @admin_required
@@ -1380,71 +3443,162 @@ def update_team_color():
 
     return jsonify({'success': True})
 
-# Admin: Get all participants grouped by email
+# Participant list query building blocks (grouping happens in SQL, one row per email)
+PARTICIPANTS_PAGE_SIZE = 100
+PARTICIPANTS_MAX_PAGE_SIZE = 500
+
+# Last word of the owner's name, used for the "sort by last name" order
+LAST_NAME_SQL = "LOWER(REPLACE(TRIM(owner_name), RTRIM(TRIM(owner_name), REPLACE(TRIM(owner_name), ' ', '')), ''))"
+
+PARTICIPANT_FILTERS = {
+    'all': '',
+    'paid': 'WHERE paid_squares = total_squares',
+    'unpaid': 'WHERE paid_squares < total_squares',
+    'partial': 'WHERE paid_squares > 0 AND paid_squares < total_squares',
+}
+
+# sort name -> (sort key column, direction)
+PARTICIPANT_SORTS = {
+    'name': ('last_name', 'ASC'),
+    'claimed': ('first_claimed_at', 'DESC'),
+    'email': ('email', 'ASC'),
+    'owed': ('unpaid_squares', 'DESC'),
+}
+
+def encode_cursor(values):
+    """Encode keyset pagination values as an opaque URL-safe token"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(token):
+    """Decode a pagination token, returning None if it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(values, list) or len(values) != 2:
+        return None
+    return values
+
+# Admin: Get participants grouped by email, with filtering, sorting, search and cursor pagination
 @app.route('/api/admin/participants', methods=['GET'])
 @admin_required
 def get_participants():
+    filter_name = request.args.get('filter', 'all')
+    sort_name = request.args.get('sort', 'name')
+    search = request.args.get('search', '').strip().lower()
+    cursor_token = request.args.get('cursor', '')
+    limit = request.args.get('limit', PARTICIPANTS_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, PARTICIPANTS_MAX_PAGE_SIZE))
+
+    if filter_name not in PARTICIPANT_FILTERS:
+        return jsonify({'error': 'Invalid filter'}), 400
+    if sort_name not in PARTICIPANT_SORTS:
+        return jsonify({'error': 'Invalid sort'}), 400
+
+    after = None
+    if cursor_token:
+        after = decode_cursor(cursor_token)
+        if after is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    price_per_square = get_config().price_per_square
+
     conn = get_db()
     cursor = conn.cursor()
 
-    # Get all claimed squares with owner info
+    # One row per email. The earliest claimed square supplies name/player and
+    # the window totals cover all of that email's squares.
+    grouped = f'''
+        SELECT email, name, player_name, first_claimed_at, last_name, total_squares, paid_squares, unpaid_squares
+        FROM (
+            SELECT owner_email AS email, owner_name AS name, player_name,
+                   COALESCE(claimed_at, '') AS first_claimed_at,
+                   {LAST_NAME_SQL} AS last_name,
+                   COUNT(*) OVER per_email AS total_squares,
+                   SUM(CASE WHEN paid = 1 THEN 1 ELSE 0 END) OVER per_email AS paid_squares,
+                   SUM(CASE WHEN paid = 1 THEN 0 ELSE 1 END) OVER per_email AS unpaid_squares,
+                   ROW_NUMBER() OVER (PARTITION BY owner_email ORDER BY COALESCE(claimed_at, ''), id) AS claim_rank
+            FROM squares
+            WHERE owner_email IS NOT NULL
+            WINDOW per_email AS (PARTITION BY owner_email)
+        ) AS claims
+        WHERE claim_rank = 1
+    '''
+
+    # Header stats cover every participant, independent of filter and search;
+    # the per-email sales counters have them without touching squares
     cursor.execute('''
-        SELECT s.owner_email, s.owner_name, s.player_name, s.paid, s.grid_id, s.row, s.col, s.claimed_at, g.name as grid_name
-        FROM squares s
-        JOIN grids g ON s.grid_id = g.id
-        WHERE s.owner_email IS NOT NULL
-        ORDER BY s.owner_email, s.grid_id, s.row, s.col
+        SELECT COUNT(*) AS participants,
+               SUM(CASE WHEN paid_squares < squares THEN 1 ELSE 0 END) AS unpaid,
+               COALESCE(SUM(squares - paid_squares), 0) AS unpaid_squares
+        FROM email_counts
+        WHERE squares > 0
     ''')
+    stats = cursor.fetchone()
 
+    conditions = PARTICIPANT_FILTERS[filter_name]
+    params = []
+    if search:
+        conditions += ' AND ' if conditions else 'WHERE '
+        conditions += "(LOWER(email) LIKE ? ESCAPE '\\' OR LOWER(name) LIKE ? ESCAPE '\\')"
+        # Match % and _ in the search text literally
+        pattern = '%' + re.sub(r'([\\%_])', r'\\\1', search) + '%'
+        params.extend([pattern, pattern])
+
+    # Keyset pagination on (sort key, email): a page never shifts when rows are
+    # added ahead of it and skipped rows aren't sorted out with OFFSET
+    sort_column, direction = PARTICIPANT_SORTS[sort_name]
+    page_conditions = ''
+    if after is not None:
+        op = '>' if direction == 'ASC' else '<'
+        page_conditions = f'WHERE ({sort_column} {op} ? OR ({sort_column} = ? AND email > ?))'
+        params.extend([after[0], after[0], after[1]])
+
+    order = f'{sort_column} {direction}, email ASC'
+    if sort_column == 'email':
+        order = 'email ASC'
+    # The squares are grouped once: the CTE is read twice, so both SQLite and
+    # PostgreSQL materialize it for the match count and the page. The LEFT JOIN
+    # keeps the count when the page is empty.
+    cursor.execute(f'''
+        WITH participants AS (SELECT * FROM ({grouped}) AS grouped_participants {conditions})
+        SELECT counted.matching, page.*
+        FROM (SELECT COUNT(*) AS matching FROM participants) AS counted
+        LEFT JOIN (SELECT * FROM participants {page_conditions} ORDER BY {order} LIMIT ?) AS page ON 1 = 1
+        ORDER BY {order}
+    ''', params + [limit + 1])
     rows = cursor.fetchall()
-
-    # Get price per square
-    cursor.execute('SELECT price_per_square FROM game_config WHERE id = 1')
-    config = cursor.fetchone()
-    price_per_square = config['price_per_square'] if config else 10.0
-
     conn.close()
+    matching = rows[0]['matching']
+    rows = [row for row in rows if row['email'] is not None]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[sort_column], last['email']])
 
-    # Group by email
-    participants = {}
+    participants = []
     for row in rows:
-        email = row['owner_email']
-        if email not in participants:
-            participants[email] = {
-                'email': email,
-                'name': row['owner_name'],
-                'player_name': row['player_name'],
-                'squares': [],
-                'total_squares': 0,
-                'paid_squares': 0,
-                'amount_owed': 0,
-                'first_claimed_at': row['claimed_at']
-            }
-
-        # Track earliest claimed date
-        if row['claimed_at'] and (not participants[email]['first_claimed_at'] or row['claimed_at'] < participants[email]['first_claimed_at']):
-            participants[email]['first_claimed_at'] = row['claimed_at']
-
-        participants[email]['squares'].append({
-            'grid_id': row['grid_id'],
-            'grid_name': row['grid_name'],
-            'row': row['row'],
-            'col': row['col'],
-            'paid': row['paid'],
-            'claimed_at': row['claimed_at']
+        participants.append({
+            'email': row['email'],
+            'name': row['name'],
+            'player_name': row['player_name'],
+            'total_squares': row['total_squares'],
+            'paid_squares': row['paid_squares'],
+            'amount_owed': row['unpaid_squares'] * price_per_square,
+            'all_paid': row['unpaid_squares'] == 0,
+            'first_claimed_at': row['first_claimed_at'] or None
         })
-        participants[email]['total_squares'] += 1
-        if row['paid']:
-            participants[email]['paid_squares'] += 1
-
-    # Calculate amounts
-    for p in participants.values():
-        p['amount_owed'] = (p['total_squares'] - p['paid_squares']) * price_per_square
-        p['all_paid'] = p['paid_squares'] == p['total_squares']
 
     return jsonify({
-        'participants': list(participants.values()),
-        'price_per_square': price_per_square
+        'participants': participants,
+        'price_per_square': price_per_square,
+        'next_cursor': next_cursor,
+        'matching': matching,
+        'total_participants': stats['participants'],
+        'unpaid_participants': stats['unpaid'] or 0,
+        'total_owed': stats['unpaid_squares'] * price_per_square
     })
 
 # Admin: Toggle paid status for a participant (by email)
@@ -1475,12 +3629,127 @@ def toggle_participant_paid():
 
     return jsonify({'success': True, 'affected_squares': affected})
 
+# Set-based predicates over a JSON array parameter, so one statement covers any number of targets
+EMAILS_IN_JSON = 'owner_email IN (SELECT value FROM json_each(?))'
+SQUARES_IN_JSON = '''(grid_id, row, col) IN (
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+    FROM json_each(?))'''
+
+def count_squares_by_email(cursor, emails_json):
+    """Map each of the given emails to its number of claimed squares"""
+    cursor.execute(f'SELECT owner_email, squares FROM email_counts WHERE {EMAILS_IN_JSON}', (emails_json,))
+    return {row['owner_email']: row['squares'] for row in cursor.fetchall()}
+
+def apply_mark_paid(cursor, emails, paid, details_suffix=''):
+    """Set paid status for every square owned by the given emails. Returns (affected, audit entries)."""
+    emails_json = json.dumps(emails)
+    counts = count_squares_by_email(cursor, emails_json)
+    cursor.execute(f'UPDATE squares SET paid = ? WHERE {EMAILS_IN_JSON}', (1 if paid else 0, emails_json))
+    action = 'payment_marked_paid' if paid else 'payment_marked_unpaid'
+    audit = [{'action': action, 'details': f'{counts.get(email, 0)} squares updated{details_suffix}', 'target_email': email}
+             for email in emails]
+    return cursor.rowcount, audit
+
+def apply_clear_squares(cursor, squares):
+    """Clear the given [grid_id, row, col] squares. Returns (affected, audit entries)."""
+    squares_json = json.dumps(squares)
+    cursor.execute(f'SELECT grid_id, row, col, owner_name, owner_email FROM squares WHERE {SQUARES_IN_JSON} AND owner_name IS NOT NULL',
+                   (squares_json,))
+    previous = cursor.fetchall()
+    cursor.execute(f'DELETE FROM squares WHERE {SQUARES_IN_JSON}', (squares_json,))
+    audit = [{'action': 'square_cleared', 'details': f'Cleared square previously owned by {sq["owner_name"]} (bulk)',
+              'target_email': sq['owner_email'], 'grid_id': sq['grid_id'], 'row': sq['row'], 'col': sq['col']}
+             for sq in previous]
+    return len(previous), audit
+
+def apply_reassign_owner(cursor, name, email, squares=None, from_email=None):
+    """Move squares (explicit list, or everything owned by from_email) to a new owner"""
+    if squares is not None:
+        where, param = SQUARES_IN_JSON, json.dumps(squares)
+    else:
+        where, param = 'owner_email = ?', from_email
+    cursor.execute(f'SELECT grid_id, row, col, owner_email FROM squares WHERE {where} AND owner_name IS NOT NULL', (param,))
+    previous = cursor.fetchall()
+    cursor.execute(f'UPDATE squares SET owner_name = ?, owner_email = ? WHERE {where} AND owner_name IS NOT NULL',
+                   (name, email, param))
+    audit = [{'action': 'square_reassigned', 'details': f'Reassigned from {sq["owner_email"]} to {name}',
+              'target_email': email, 'grid_id': sq['grid_id'], 'row': sq['row'], 'col': sq['col']}
+             for sq in previous]
+    return len(previous), audit
+
+def apply_set_player_name(cursor, emails, player_name):
+    """Set the supported player for every square owned by the given emails"""
+    cursor.execute(f'UPDATE squares SET player_name = ? WHERE {EMAILS_IN_JSON}', (player_name or None, json.dumps(emails)))
+    audit = [{'action': 'config_changed', 'details': f'Player name updated to "{player_name}" for {email} (bulk)', 'target_email': email}
+             for email in emails]
+    return cursor.rowcount, audit
+
+def normalize_emails(emails):
+    """Lowercase, strip and de-duplicate a list of emails, preserving order"""
+    return list(dict.fromkeys(e.strip().lower() for e in emails if isinstance(e, str) and e.strip()))
+
+def parse_square_list(squares):
+    """Validate [{grid_id, row, col}] into [[grid_id, row, col]], or None if malformed"""
+    if not isinstance(squares, list) or not squares:
+        return None
+    parsed = []
+    for sq in squares:
+        if not isinstance(sq, dict):
+            return None
+        values = [sq.get('grid_id', 1), sq.get('row'), sq.get('col')]
+        if not all(isinstance(v, int) for v in values):
+            return None
+        parsed.append(values)
+    return parsed
+
+def parse_bulk_action(action):
+    """Validate one bulk action, returning (normalized action, error message)"""
+    if not isinstance(action, dict):
+        return None, 'Action must be an object'
+    kind = action.get('type')
+
+    if kind in ('mark_paid', 'mark_unpaid'):
+        emails = normalize_emails(action.get('emails') or [])
+        if not emails:
+            return None, 'No emails provided'
+        paid = False if kind == 'mark_unpaid' else bool(action.get('paid', True))
+        return {'type': 'mark_paid', 'emails': emails, 'paid': paid}, None
+
+    if kind == 'clear_squares':
+        squares = parse_square_list(action.get('squares'))
+        if squares is None:
+            return None, 'A list of squares with grid_id, row and col is required'
+        return {'type': kind, 'squares': squares}, None
+
+    if kind == 'reassign_owner':
+        name = (action.get('name') or '').strip()
+        email = (action.get('email') or '').strip().lower()
+        if not name or not email or '@' not in email or '.' not in email:
+            return None, 'A new owner name and valid email are required'
+        if 'squares' in action:
+            squares = parse_square_list(action.get('squares'))
+            if squares is None:
+                return None, 'A list of squares with grid_id, row and col is required'
+            return {'type': kind, 'name': name, 'email': email, 'squares': squares}, None
+        from_email = (action.get('from_email') or '').strip().lower()
+        if not from_email:
+            return None, 'Either squares or from_email is required'
+        return {'type': kind, 'name': name, 'email': email, 'from_email': from_email}, None
+
+    if kind == 'set_player_name':
+        emails = normalize_emails(action.get('emails') or [])
+        if not emails:
+            return None, 'No emails provided'
+        return {'type': kind, 'emails': emails, 'player_name': (action.get('player_name') or '').strip()}, None
+
+    return None, f'Unknown action type: {kind}'
+
 # Admin: Bulk mark paid/unpaid for multiple participants
 @app.route('/api/admin/participants/bulk-mark-paid', methods=['POST'])
 @admin_required
 def bulk_mark_paid():
     data = request.get_json()
-    emails = data.get('emails', [])
+    emails = normalize_emails(data.get('emails', []))
     paid = data.get('paid', True)
 
     if not emails:
@@ -1489,25 +3758,62 @@ def bulk_mark_paid():
     conn = get_db()
     cursor = conn.cursor()
 
-    total_affected = 0
-    audit_entries = []
-    for email in emails:
-        email = email.strip().lower()
-        cursor.execute('UPDATE squares SET paid = ? WHERE owner_email = ?', (1 if paid else 0, email))
-        affected = cursor.rowcount
-        total_affected += affected
-        audit_entries.append((email, affected))
+    total_affected, audit_entries = apply_mark_paid(cursor, emails, paid, ' (bulk)')
+    log_audit_many(cursor, audit_entries)
 
     conn.commit()
     conn.close()
 
-    # Log after commit to avoid database lock
-    action = 'payment_marked_paid' if paid else 'payment_marked_unpaid'
-    for email, affected in audit_entries:
-        log_audit(action, f'{affected} squares updated (bulk)', target_email=email)
-
     return jsonify({'success': True, 'affected_squares': total_affected, 'emails_processed': len(emails)})
 
+# Admin: Apply a list of heterogeneous admin actions in a single transaction
+@app.route('/api/admin/bulk', methods=['POST'])
+@admin_required
+def bulk_operations():
+    data = request.get_json() or {}
+    raw_actions = data.get('actions')
+
+    if not isinstance(raw_actions, list) or not raw_actions:
+        return jsonify({'error': 'No actions provided'}), 400
+
+    # Validate everything up front so a bad action can't leave a half-applied batch
+    actions = []
+    for index, raw in enumerate(raw_actions):
+        action, error = parse_bulk_action(raw)
+        if error:
+            return jsonify({'error': error, 'action_index': index}), 400
+        actions.append(action)
+
+    conn = get_db()
+    cursor = conn.cursor()
+
+    results = []
+    audit_entries = []
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        for action in actions:
+            if action['type'] == 'mark_paid':
+                affected, audit = apply_mark_paid(cursor, action['emails'], action['paid'], ' (bulk)')
+            elif action['type'] == 'clear_squares':
+                affected, audit = apply_clear_squares(cursor, action['squares'])
+            elif action['type'] == 'reassign_owner':
+                affected, audit = apply_reassign_owner(cursor, action['name'], action['email'],
+                                                       action.get('squares'), action.get('from_email'))
+            else:
+                affected, audit = apply_set_player_name(cursor, action['emails'], action['player_name'])
+            results.append({'type': action['type'], 'affected_squares': affected})
+            audit_entries.extend(audit)
+
+        log_audit_many(cursor, audit_entries)
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        conn.close()
+        return jsonify({'error': f'Bulk operation failed: {e}'}), 500
+
+    conn.close()
+    return jsonify({'success': True, 'results': results, 'audit_entries': len(audit_entries)})
+
 # Admin: Update player name for a participant
 @app.route('/api/admin/participants/update-player', methods=['POST'])
 @admin_required
@@ -1534,24 +3840,17 @@ def update_participant_player():
 @app.route('/api/admin/player-totals', methods=['GET'])
 @admin_required
 def get_player_totals():
+    price = get_config().price_per_square
+
     conn = get_db()
     cursor = conn.cursor()
 
-    # Get price per square
-    cursor.execute('SELECT price_per_square FROM game_config WHERE id = 1')
-    config = cursor.fetchone()
-    price = config['price_per_square'] if config and config['price_per_square'] else 10
-
     # Get totals grouped by player_name
     cursor.execute('''
-        SELECT
-            COALESCE(player_name, 'Not specified') as player,
-            COUNT(*) as square_count,
-            SUM(CASE WHEN paid = 1 THEN 1 ELSE 0 END) as paid_count
-        FROM squares
-        WHERE owner_name IS NOT NULL
-        GROUP BY COALESCE(player_name, 'Not specified')
-        ORDER BY COUNT(*) DESC
+        SELECT player, squares as square_count, paid_squares as paid_count
+        FROM player_counts
+        WHERE squares > 0
+        ORDER BY squares DESC, player
     ''')
 
     totals = []
@@ -1569,6 +3868,7 @@ def get_player_totals():
 
 # Public: Get squares for a specific email (for "Find Your Squares" feature)
 @app.route('/api/my-squares', methods=['GET'])
+@rate_limited('my_squares')
 def get_my_squares():
     email = request.args.get('email', '').strip().lower()
     grid_id = request.args.get('grid_id', 1, type=int)
@@ -1576,22 +3876,13 @@ def get_my_squares():
     if not email:
         return jsonify({'error': 'Email is required'}), 400
 
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Get squares owned by this email on the specified grid
-    cursor.execute('''
-        SELECT row, col FROM squares
-        WHERE grid_id = ? AND owner_email = ?
-    ''', (grid_id, email))
+    snapshot = get_grid_snapshot(grid_id)
+    if snapshot is None:
+        return jsonify({'error': 'Grid not found'}), 404
 
-    squares = [{'row': row['row'], 'col': row['col']} for row in cursor.fetchall()]
-
-    # Also get total count across all grids for this email
-    cursor.execute('SELECT COUNT(*) FROM squares WHERE owner_email = ?', (email,))
-    total_count = cursor.fetchone()[0]
-
-    conn.close()
+    # Squares owned by this email on the specified grid, plus the total across all grids
+    squares = snapshot['squares_by_email'].get(email, [])
+    total_count = get_snapshot('email_counts', build_email_counts_snapshot).get(email, 0)
 
     return jsonify({
         'squares': squares,
@@ -1599,71 +3890,217 @@ def get_my_squares():
         'total_across_grids': total_count
     })
 
+# Public: One email's squares on every grid, with quarters won and what is owed
+@app.route('/api/me', methods=['GET'])
+@rate_limited('me')
+def get_me():
+    email = request.args.get('email', '').strip().lower()
+
+    if not email:
+        return jsonify({'error': 'Email is required'}), 400
+
+    config = get_config()
+    owned = get_person_squares(email)
+    grids = []
+    for grid in get_snapshot('grids', build_grids_snapshot):
+        squares = [square for square in owned if square['grid_id'] == grid['id']]
+        if not squares:
+            continue
+        grid_config = get_grid_snapshot(grid['id'])['payload']['config']
+        row_numbers = grid_config.get('row_numbers')
+        col_numbers = grid_config.get('col_numbers')
+        winners = {q: winning_square(config, q, row_numbers, col_numbers) for q in range(1, 5)}
+        grids.append({
+            'grid_id': grid['id'],
+            'name': grid['name'],
+            'numbers_locked': bool(grid['numbers_locked']),
+            'squares': [{
+                'row': square['row'],
+                'col': square['col'],
+                'paid': square['paid'],
+                # The digits this square plays, once numbers are drawn
+                'team1_number': col_numbers[square['col']] if col_numbers else None,
+                'team2_number': row_numbers[square['row']] if row_numbers else None,
+                'won': [f'q{q}' for q, position in winners.items() if position == (square['row'], square['col'])],
+            } for square in squares],
+        })
+
+    # Totals count squares on every grid, including deactivated ones still owed for
+    total = len(owned)
+    paid = sum(1 for square in owned if square['paid'])
+    return jsonify({
+        'email': email,
+        'name': owned[0]['owner_name'] if owned else None,
+        'player_name': next((square['player_name'] for square in owned if square['player_name']), None),
+        'grids': grids,
+        'total_squares': total,
+        'paid_squares': paid,
+        'all_paid': total > 0 and paid == total,
+        'price_per_square': config.price_per_square,
+        'amount_owed': (total - paid) * config.price_per_square,
+        # First quarter whose score isn't locked in yet; None once the game is final
+        'current_quarter': next((f'q{q}' for q in range(1, 5) if not config.locked[q]), None),
+    })
+
+# ==========================================
+# CSV Exports
+# ==========================================
+
+CSV_CHUNK_ROWS = 500
+
+def format_csv_date(value):
+    """Format an ISO timestamp as MM/DD/YYYY, passing anything unparseable through"""
+    if not value:
+        return ''
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%m/%d/%Y')
+    except ValueError:
+        return value
+
+def stream_csv(filename, header, query, params=(), format_row=None):
+    """Stream a query result as a CSV download.
+
+    Rows are pulled from the cursor CSV_CHUNK_ROWS at a time and written through
+    the csv module, so memory use is constant regardless of table size.
+    """
+    def generate():
+        conn = get_db()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(header)
+            while True:
+                rows = cursor.fetchmany(CSV_CHUNK_ROWS)
+                if not rows:
+                    break
+                writer.writerows(format_row(row) if format_row else tuple(row) for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+
+            # Header-only exports still need to send something
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            conn.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 # Admin: Export unpaid participants as CSV
 @app.route('/api/admin/participants/export-unpaid', methods=['GET'])
 @admin_required
 def export_unpaid_participants():
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Get price per square
-    cursor.execute('SELECT price_per_square FROM game_config WHERE id = 1')
-    config = cursor.fetchone()
-    price_per_square = config['price_per_square'] if config else 10.0
+    price_per_square = get_config().price_per_square
+
+    def format_row(row):
+        return (
+            row['owner_name'],
+            row['owner_email'],
+            row['player_name'] or '',
+            row['unpaid_squares'],
+            f"${row['unpaid_squares'] * price_per_square:.2f}",
+            format_csv_date(row['first_claimed'])
+        )
 
-    # Get all unpaid squares grouped by email with earliest claimed date
-    cursor.execute('''
-        SELECT owner_email, owner_name, player_name, COUNT(*) as unpaid_squares, MIN(claimed_at) as first_claimed
-        FROM squares
-        WHERE owner_email IS NOT NULL AND (paid = 0 OR paid IS NULL)
-        GROUP BY owner_email
-        ORDER BY owner_name
-    ''')
+    # All unpaid squares grouped by email with earliest claimed date
+    return stream_csv(
+        'unpaid_participants.csv',
+        ['Name', 'Email', 'Supporting Player', 'Unpaid Squares', 'Amount Owed', 'First Claimed'],
+        '''
+            SELECT owner_email, MIN(owner_name) as owner_name, MIN(player_name) as player_name,
+                   COUNT(*) as unpaid_squares, MIN(claimed_at) as first_claimed
+            FROM squares
+            WHERE owner_email IS NOT NULL AND (paid = 0 OR paid IS NULL)
+            GROUP BY owner_email
+            ORDER BY owner_name
+        ''',
+        format_row=format_row
+    )
 
-    rows = cursor.fetchall()
-    conn.close()
+# Admin: Export every claimed square as CSV
+@app.route('/api/admin/export/squares', methods=['GET'])
+@admin_required
+def export_squares():
+    def format_row(row):
+        return (
+            row['grid_name'], row['row'], row['col'],
+            row['owner_name'], row['owner_email'], row['player_name'] or '',
+            'Yes' if row['paid'] else 'No',
+            row['claimed_at'] or ''
+        )
 
-    # Build CSV
-    csv_lines = ['Name,Email,Supporting Player,Unpaid Squares,Amount Owed,First Claimed']
-    for row in rows:
-        amount = row['unpaid_squares'] * price_per_square
-        player_name = row['player_name'] if row['player_name'] else ''
-        first_claimed = row['first_claimed'] if row['first_claimed'] else ''
-        # Format the date if present (convert ISO to readable format)
-        if first_claimed:
-            try:
-                from datetime import datetime
-                dt = datetime.fromisoformat(first_claimed.replace('Z', '+00:00'))
-                first_claimed = dt.strftime('%m/%d/%Y')
-            except:
-                pass
-        csv_lines.append(f"{row['owner_name']},{row['owner_email']},{player_name},{row['unpaid_squares']},${amount:.2f},{first_claimed}")
+    return stream_csv(
+        'squares.csv',
+        ['Grid', 'Row', 'Column', 'Name', 'Email', 'Supporting Player', 'Paid', 'Claimed At'],
+        '''
+            SELECT g.name AS grid_name, s.row, s.col, s.owner_name, s.owner_email, s.player_name, s.paid, s.claimed_at
+            FROM squares s
+            JOIN grids g ON s.grid_id = g.id
+            WHERE s.owner_name IS NOT NULL
+            ORDER BY s.grid_id, s.row, s.col
+        ''',
+        format_row=format_row
+    )
 
-    csv_content = '\n'.join(csv_lines)
+# Admin: Export the full audit log as CSV
+@app.route('/api/admin/export/audit-log', methods=['GET'])
+@admin_required
+def export_audit_log():
+    return stream_csv(
+        'audit_log.csv',
+        ['Timestamp', 'Action', 'Details', 'Actor Email', 'Target Email', 'Grid', 'Row', 'Column'],
+        '''
+            SELECT timestamp, action, details, actor_email, target_email, grid_id, row, col
+            FROM audit_log
+            ORDER BY id
+        '''
+    )
 
-    from flask import Response
-    return Response(
-        csv_content,
-        mimetype='text/csv',
-        headers={'Content-Disposition': 'attachment; filename=unpaid_participants.csv'}
+# Admin: Export email send history as CSV
+@app.route('/api/admin/export/email-sends', methods=['GET'])
+@admin_required
+def export_email_sends():
+    return stream_csv(
+        'email_sends.csv',
+        ['Quarter', 'Grid', 'Type', 'Recipient Email', 'Recipient Name', 'Status', 'Error', 'Created At', 'Sent At'],
+        '''
+            SELECT quarter, grid_id, email_type, recipient_email, recipient_name, status, error_message, created_at, sent_at
+            FROM email_sends
+            ORDER BY id
+        '''
     )
 
 # ==========================================
 # Email Notification Functions
 # ==========================================
 
+def winning_square(config, quarter, row_numbers, col_numbers):
+    """(row, col) that a quarter's saved score lands on for a grid's numbers, or None"""
+    if config.scores[quarter] is None or not row_numbers or not col_numbers:
+        return None
+    team1_score, team2_score = config.scores[quarter]
+    # Team 1's last digit picks the column, team 2's the row
+    if team1_score % 10 not in col_numbers or team2_score % 10 not in row_numbers:
+        return None
+    return row_numbers.index(team2_score % 10), col_numbers.index(team1_score % 10)
+
 def calculate_quarter_winner(quarter, grid_id, conn):
     """Calculate who won a given quarter on a given grid"""
     cursor = conn.cursor()
 
     # Get scores for this quarter
-    cursor.execute(f'SELECT q{quarter}_team1, q{quarter}_team2, team1_name, team2_name FROM game_config WHERE id = 1')
-    config = cursor.fetchone()
-    if not config or config[f'q{quarter}_team1'] is None or config[f'q{quarter}_team2'] is None:
+    config = get_config()
+    if config.scores[quarter] is None:
         return None
 
-    team1_score = int(config[f'q{quarter}_team1'])
-    team2_score = int(config[f'q{quarter}_team2'])
+    team1_score, team2_score = config.scores[quarter]
 
     # Get grid numbers
     cursor.execute('SELECT row_numbers, col_numbers FROM grids WHERE id = ?', (grid_id,))
@@ -1671,18 +4108,10 @@ def calculate_quarter_winner(quarter, grid_id, conn):
     if not grid or not grid['row_numbers'] or not grid['col_numbers']:
         return None
 
-    col_numbers = json.loads(grid['col_numbers'])
-    row_numbers = json.loads(grid['row_numbers'])
-
-    # Find winning position
-    team1_last_digit = team1_score % 10
-    team2_last_digit = team2_score % 10
-
-    if team1_last_digit not in col_numbers or team2_last_digit not in row_numbers:
+    position = winning_square(config, quarter, json.loads(grid['row_numbers']), json.loads(grid['col_numbers']))
+    if position is None:
         return None
-
-    col = col_numbers.index(team1_last_digit)
-    row = row_numbers.index(team2_last_digit)
+    row, col = position
 
     # Find square owner
     cursor.execute('SELECT owner_name, owner_email FROM squares WHERE grid_id = ? AND row = ? AND col = ?', (grid_id, row, col))
@@ -1695,8 +4124,8 @@ def calculate_quarter_winner(quarter, grid_id, conn):
         'col': col,
         'team1_score': team1_score,
         'team2_score': team2_score,
-        'team1_name': config['team1_name'] or 'Team 1',
-        'team2_name': config['team2_name'] or 'Team 2',
+        'team1_name': config.team1_name,
+        'team2_name': config.team2_name,
         'grid_id': grid_id
     }
 
@@ -1706,20 +4135,12 @@ def calculate_prize_amount(quarter, conn):
     cursor = conn.cursor()
 
     # Count all claimed squares across all grids
-    cursor.execute('SELECT COUNT(*) FROM squares WHERE owner_name IS NOT NULL')
+    cursor.execute('SELECT COALESCE(SUM(squares), 0) FROM grid_counts')
     total_claimed = cursor.fetchone()[0]
 
-    cursor.execute('SELECT price_per_square, prize_q1, prize_q2, prize_q3, prize_q4 FROM game_config WHERE id = 1')
-    config = cursor.fetchone()
-    if not config:
-        return 0
-
-    price = config['price_per_square'] or 10
-    total_pot = total_claimed * price
-
-    pct_field = f'prize_q{quarter}'
-    pct = config[pct_field] or 10
-    return total_pot * (pct / 100)
+    config = get_config()
+    total_pot = total_claimed * config.price_per_square
+    return total_pot * (config.prizes[quarter] / 100)
 
 
 def get_gmail_credentials():
@@ -1736,6 +4157,11 @@ def send_email(to_email, subject, html_body, text_body):
     if not gmail_address or not gmail_password:
         return False, 'Gmail credentials not configured'
 
+    # Imported on first send rather than at startup; most workers never send mail
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     msg = MIMEMultipart('alternative')
     msg['From'] = gmail_address
     msg['To'] = to_email
@@ -1744,8 +4170,9 @@ def send_email(to_email, subject, html_body, text_body):
     msg.attach(MIMEText(text_body, 'plain'))
     msg.attach(MIMEText(html_body, 'html'))
 
+    smtp_class = smtplib.SMTP_SSL if SMTP_USE_SSL else smtplib.SMTP
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
+        with smtp_class(SMTP_HOST, SMTP_PORT) as server:
             server.login(gmail_address, gmail_password)
             server.sendmail(gmail_address, to_email, msg.as_string())
         return True, None
@@ -1840,39 +4267,38 @@ Check the board and winners at: https://www.peglegsfundraiser.org/
 
 def send_quarter_emails(quarter):
     """Orchestrate sending winner + participant emails for a quarter"""
+    queued = 0
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-
         # Check if emails are enabled
-        cursor.execute('SELECT emails_enabled FROM game_config WHERE id = 1')
-        config = cursor.fetchone()
-        if not config or not config['emails_enabled']:
-            conn.close()
+        config = get_config()
+        if not config.emails_enabled:
             return
 
         # Check Gmail credentials
         gmail_address, gmail_password = get_gmail_credentials()
         if not gmail_address or not gmail_password:
-            conn.close()
             return
 
         # Get scores and team names
-        cursor.execute(f'SELECT q{quarter}_team1, q{quarter}_team2, team1_name, team2_name FROM game_config WHERE id = 1')
-        score_config = cursor.fetchone()
-        if not score_config or score_config[f'q{quarter}_team1'] is None:
-            conn.close()
+        if config.scores[quarter] is None:
             return
 
-        team1_score = int(score_config[f'q{quarter}_team1'])
-        team2_score = int(score_config[f'q{quarter}_team2'])
-        team1_name = score_config['team1_name'] or 'Team 1'
-        team2_name = score_config['team2_name'] or 'Team 2'
+        team1_score, team2_score = config.scores[quarter]
+        team1_name = config.team1_name
+        team2_name = config.team2_name
         is_final = (quarter == 4)
 
-        # Get all active grids
+        conn = get_db()
+        cursor = conn.cursor()
+
+        # Get all active grids and every participant up front so the queue depth is known
         cursor.execute('SELECT id, name FROM grids WHERE is_active = 1')
         grids = cursor.fetchall()
+        cursor.execute('SELECT DISTINCT owner_email, owner_name FROM squares WHERE owner_email IS NOT NULL')
+        all_participants = cursor.fetchall()
+
+        queued = len(grids) + len(all_participants)
+        add_gauge('squares_email_queue_depth', queued)
 
         winner_emails_set = set()
         sent_count = 0
@@ -1880,6 +4306,8 @@ def send_quarter_emails(quarter):
 
         # Process each grid — send winner emails
         for grid in grids:
+            queued -= 1
+            add_gauge('squares_email_queue_depth', -1)
             grid_id = grid['id']
             grid_name = grid['name']
 
@@ -1920,14 +4348,14 @@ def send_quarter_emails(quarter):
                 cursor.execute('UPDATE email_sends SET status = ?, error_message = ? WHERE id = ?', ('failed', error, send_id))
                 failed_count += 1
             conn.commit()
+            inc_counter('squares_emails_total', {'type': 'winner', 'status': 'sent' if success else 'failed'})
 
             winner_emails_set.add(winner['owner_email'])
 
-        # Collect all unique participant emails (excluding winners)
-        cursor.execute('SELECT DISTINCT owner_email, owner_name FROM squares WHERE owner_email IS NOT NULL')
-        all_participants = cursor.fetchall()
-
+        # Participant emails (excluding winners)
         for participant in all_participants:
+            queued -= 1
+            add_gauge('squares_email_queue_depth', -1)
             email = participant['owner_email']
             name = participant['owner_name']
 
@@ -1962,25 +4390,840 @@ def send_quarter_emails(quarter):
                 cursor.execute('UPDATE email_sends SET status = ?, error_message = ? WHERE id = ?', ('failed', error, send_id))
                 failed_count += 1
             conn.commit()
+            inc_counter('squares_emails_total', {'type': 'participant', 'status': 'sent' if success else 'failed'})
 
         conn.close()
 
         # Log audit
         log_audit('emails_sent', f'Q{quarter}: {sent_count} sent, {failed_count} failed')
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        app.logger.exception('Error sending Q%s emails', quarter)
+    finally:
+        # Drop whatever was still queued if the run stopped early
+        if queued:
+            add_gauge('squares_email_queue_depth', -queued)
+        flush_metrics()
 
 
 def send_quarter_emails_async(quarter):
     """Run email sending in a background thread so the sync response isn't delayed"""
-    thread = threading.Thread(target=send_quarter_emails, args=(quarter,), daemon=True)
+    pool = current_pool()
+
+    def run():
+        with app.app_context():
+            g.pool = pool
+            send_quarter_emails(quarter)
+
+    thread = threading.Thread(target=run, daemon=True)
     thread.start()
 
 
-# Initialize database on module load (works with gunicorn)
-init_db()
+# ==========================================
+# Static Board Publisher
+# ==========================================
+
+# With PUBLISH_DIR set, each committed write republishes the public board as
+# static JSON, so nginx or a CDN can serve viewers without touching a worker.
+# Write requests queue a publish right away; every PUBLISH_POLL_SECONDS the
+# publisher also compares the data version of each pool it has published (and
+# the default pool) with the one it published, which catches writes from
+# background jobs, other processes and CLI commands. CLI commands that change
+# the board also publish before they exit.
+# A pool publishes under PUBLISH_DIR/p/<pool>/, mirroring its URL prefix:
+#
+#   board.json                       manifest naming the current documents (revalidate)
+#   grids.<hash>.json                same body as /api/grids
+#   grid-<id>.<hash>.json            same body as /api/grid?grid_id=<id>
+#   grid-<id>.compact.<hash>.json    same body as /api/grid?grid_id=<id>&format=compact
+#   winners.<hash>.json              saved quarter winners for every active grid
+#
+# Documents are content-addressed like the asset build, so they are immutable
+# and unchanged ones are never rewritten. board.json is renamed into place last,
+# so it never names a document that hasn't been written yet.
+#
+# Every worker runs its own publisher, so a publish holds a flock on the
+# directory from reading the board to pruning. A publish that reads later
+# therefore also writes later, and a slow worker can't rename a stale
+# manifest over a newer one (SQLite's data_version is per connection, so
+# there is no cross-process version to compare instead). A manifest whose
+# documents match board.json's leaves it alone; otherwise the new one gets
+# the next sequence number.
+publish_lock = threading.Lock()
+# versions: pool -> data version it was last published at, by this process
+publish_state = {'pid': None, 'pending': set(), 'wakeup': None, 'versions': {}}
+
+def publish_directory(pool):
+    return PUBLISH_DIR if pool is None else os.path.join(PUBLISH_DIR, 'p', pool)
+
+def write_atomic(path, body):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+def write_published(directory, stem, body):
+    """Write a JSON body under a content-hashed name and return that name"""
+    body = body.encode('utf-8')
+    name = f'{stem}.{hashlib.sha256(body).hexdigest()[:12]}.json'
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        write_atomic(path, body)
+    return name
+
+def build_winners_snapshot():
+    """Saved quarter winners per active grid, without owner emails"""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id FROM grids WHERE is_active = 1 ORDER BY id')
+    grid_ids = [row['id'] for row in cursor.fetchall()]
+    winners = {}
+    for grid_id in grid_ids:
+        quarters = {}
+        for quarter in range(1, 5):
+            winner = calculate_quarter_winner(quarter, grid_id, conn)
+            if winner:
+                del winner['owner_email']
+            quarters[f'q{quarter}'] = winner
+        winners[str(grid_id)] = quarters
+    conn.close()
+    return winners
+
+def prune_published(directory, current):
+    """Remove documents board.json no longer names once they are PUBLISH_RETAIN_SECONDS old"""
+    cutoff = time.time() - PUBLISH_RETAIN_SECONDS
+    for entry in os.scandir(directory):
+        if not entry.is_file() or entry.name == 'board.json' or entry.name in current:
+            continue
+        if entry.name.endswith(('.json', '.tmp')) and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # Another worker pruned it first
+
+def read_published_manifest(directory):
+    try:
+        with open(os.path.join(directory, 'board.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def publish_board():
+    """Publish the current pool's board documents, then its manifest. Returns the manifest on disk."""
+    directory = publish_directory(current_pool())
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.lock'), 'w') as lock_file:
+        # Waiting for another worker's publish can take a while; keep it off the gevent hub
+        run_db_call(fcntl.flock, lock_file, fcntl.LOCK_EX)
+        return publish_board_locked(directory)
+
+def publish_board_locked(directory):
+    """Body of publish_board(); the caller holds the directory's flock"""
+    grids = get_snapshot('grids', build_grids_snapshot)
+    winners = get_snapshot('winners', build_winners_snapshot)
+    documents = {
+        'grids': write_published(directory, 'grids', json.dumps({'grids': grids})),
+        'winners': write_published(directory, 'winners', json.dumps(winners)),
+        'grid': {},
+    }
+    for grid in grids:
+        snapshot = get_grid_snapshot(grid['id'])
+        documents['grid'][str(grid['id'])] = {
+            'full': write_published(directory, f'grid-{grid["id"]}', json.dumps(snapshot['payload'])),
+            'compact': write_published(directory, f'grid-{grid["id"]}.compact', snapshot['compact_body']),
+        }
+
+    # The version only changes when some document does, so clients can skip refetching
+    names = [documents['grids'], documents['winners']]
+    for files in documents['grid'].values():
+        names += [files['full'], files['compact']]
+    version = hashlib.sha256(' '.join(names).encode('utf-8')).hexdigest()[:12]
+    current = read_published_manifest(directory)
+    if current is not None and current.get('version') == version:
+        return current
+    manifest = dict(documents, version=version, sequence=(current or {}).get('sequence', 0) + 1,
+                    published_at=datetime.now().isoformat())
+    write_atomic(os.path.join(directory, 'board.json'), json.dumps(manifest).encode('utf-8'))
+    prune_published(directory, set(names))
+    return manifest
+
+def run_publisher(wakeup):
+    """Background loop: republish every pool queued since the last run or changed since its last publish"""
+    versions = publish_state['versions']
+    while True:
+        wakeup.wait(PUBLISH_POLL_SECONDS)
+        with publish_lock:
+            wakeup.clear()
+            pools = publish_state['pending']
+            publish_state['pending'] = set()
+        for pool in pools | set(versions) | {None}:
+            with app.app_context():
+                g.pool = pool
+                try:
+                    # Read first: a write landing during the publish shows up on the next check
+                    with locked_pool_handle() as handle:
+                        version = handle['version']
+                    if pool not in pools and versions.get(pool) == version:
+                        continue
+                    publish_board()
+                    versions[pool] = version
+                except Exception:
+                    app.logger.exception('Publishing the board for pool %s failed', pool or 'default')
+
+def start_publisher():
+    """Start this process's publisher thread if it isn't running. The caller holds publish_lock."""
+    if publish_state['pid'] != os.getpid():
+        # One publisher thread per process, started on first use (after any fork)
+        publish_state['pid'] = os.getpid()
+        publish_state['pending'] = set()
+        publish_state['versions'] = {}
+        publish_state['wakeup'] = threading.Event()
+        threading.Thread(target=run_publisher, args=(publish_state['wakeup'],), daemon=True).start()
+
+def request_publish(pool):
+    """Queue a republish of a pool; a burst of writes coalesces into one run"""
+    with publish_lock:
+        start_publisher()
+        publish_state['pending'].add(pool)
+        publish_state['wakeup'].set()
+
+@app.before_request
+def start_board_publisher():
+    if not PUBLISH_DIR:
+        return
+    with publish_lock:
+        start_publisher()
+
+@app.after_request
+def publish_after_write(response):
+    # Handlers commit before returning, so a successful write is already visible here
+    if PUBLISH_DIR and request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+        request_publish(current_pool())
+    return response
+
+@app.cli.command('publish')
+@click.option('--pool', default=None, help='Pool to publish (default pool if omitted)')
+def publish_command(pool):
+    """Publish the public board into PUBLISH_DIR now (flask publish --pool acme)"""
+    if not PUBLISH_DIR:
+        raise click.ClickException('Set PUBLISH_DIR to publish the board')
+    if not pool_exists(pool):
+        raise click.ClickException(f'Pool {pool} not found')
+    g.pool = pool
+    publish_from_cli(pool)
+
+def publish_from_cli(pool):
+    """Republish a pool's board after a CLI command changed it; its process exits before any publisher runs"""
+    if not PUBLISH_DIR:
+        return
+    g.pool = pool
+    manifest = publish_board()
+    click.echo(f'Published version {manifest["version"]} to {publish_directory(pool)}')
+
+
+# ==========================================
+# Online Backups
+# ==========================================
+
+# Each pool's SQLite file is copied with the online backup API a few pages at
+# a time, all inside one read transaction: under WAL a reader never blocks
+# writers, so claims keep committing while the copy runs, and the copy is the
+# database as of the moment it started. Every copy is integrity-checked,
+# gzipped and kept under BACKUP_DIR (BACKUP_DIR/p/<pool> for a pool):
+#
+#   squares-20260208-183000.db.gz    gunzip it and point DATABASE_PATH at the file to restore
+#   last-backup.json                 report of the latest attempt, successful or not
+#
+# Workers share one schedule: whichever finds the last attempt older than
+# BACKUP_INTERVAL_SECONDS takes BACKUP_DIR/.lock and backs up every pool.
+backup_lock = threading.Lock()
+backup_state = {'pid': None}
+
+def backup_directory(pool):
+    return BACKUP_DIR if pool is None else os.path.join(BACKUP_DIR, 'p', pool)
+
+def list_backups(pool):
+    """A pool's backups, newest first"""
+    directory = backup_directory(pool)
+    if not os.path.isdir(directory):
+        return []
+    backups = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith('.db.gz'):
+            stat = entry.stat()
+            backups.append({'name': entry.name, 'bytes': stat.st_size,
+                            'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat()})
+    backups.sort(key=lambda backup: backup['name'], reverse=True)
+    return backups
+
+def read_backup_report(pool):
+    try:
+        with open(os.path.join(backup_directory(pool), 'last-backup.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def copy_database(source_path, target_path):
+    """Copy a live SQLite database in BACKUP_PAGES_PER_STEP steps. Returns the page count."""
+    source = sqlite3.connect(source_path, isolation_level=None, check_same_thread=False)
+    target = sqlite3.connect(target_path, check_same_thread=False)
+    pages = {'total': 0}
+
+    def pause(status, remaining, total):
+        pages['total'] = total
+        time.sleep(BACKUP_STEP_PAUSE)
+
+    try:
+        # Pin one snapshot: otherwise every commit by another connection restarts the copy
+        source.execute('BEGIN')
+        source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=pause)
+        source.execute('COMMIT')
+        # The copy is a standalone file; the restored database switches itself back to WAL
+        target.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        source.close()
+        target.close()
+    return pages['total']
+
+def check_database(path):
+    """PRAGMA integrity_check messages for a database file; ['ok'] when it is sound"""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    try:
+        return [row[0] for row in conn.execute('PRAGMA integrity_check')]
+    finally:
+        conn.close()
+
+def compress_file(source_path, target_path):
+    tmp_path = f'{target_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(source_path, 'rb') as source, gzip.open(tmp_path, 'wb') as target:
+        shutil.copyfileobj(source, target)
+    os.replace(tmp_path, target_path)
+
+def prune_backups(directory):
+    """Keep the newest BACKUP_KEEP backups in a directory"""
+    names = sorted((name for name in os.listdir(directory) if name.endswith('.db.gz')), reverse=True)
+    for name in names[BACKUP_KEEP:]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+def backup_pool(pool):
+    """Back up one pool's database now and rotate old copies. Returns the report (also saved as last-backup.json)."""
+    directory = backup_directory(pool)
+    os.makedirs(directory, exist_ok=True)
+    started = time.perf_counter()
+    name = f'squares-{datetime.now().strftime("%Y%m%d-%H%M%S")}.db.gz'
+    copy_path = os.path.join(directory, f'{name}.{os.getpid()}.copy')
+    report = {'pool': pool, 'name': name, 'started_at': datetime.now().isoformat(), 'ok': False}
+    try:
+        # On the DB thread pool under gevent, so the steps never stall the event loop
+        report['pages'] = run_db_call(copy_database, pool_database(pool), copy_path)
+        problems = run_db_call(check_database, copy_path)
+        if problems != ['ok']:
+            raise sqlite3.DatabaseError(f'integrity_check failed: {"; ".join(problems[:5])}')
+        compress_file(copy_path, os.path.join(directory, name))
+        report['bytes'] = os.path.getsize(os.path.join(directory, name))
+        report['ok'] = True
+    except (OSError, sqlite3.Error) as e:
+        report['error'] = str(e)
+    finally:
+        if os.path.exists(copy_path):
+            os.remove(copy_path)
+    report['seconds'] = round(time.perf_counter() - started, 3)
+
+    observe('squares_backup_seconds', report['seconds'])
+    inc_counter('squares_backups_total', {'result': 'ok' if report['ok'] else 'failed'})
+    write_atomic(os.path.join(directory, 'last-backup.json'), json.dumps(report).encode('utf-8'))
+    if report['ok']:
+        prune_backups(directory)
+    return report
+
+def try_backup_lock():
+    """Take BACKUP_DIR/.lock without waiting. Returns the open lock file, or None while another backup runs."""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    lock_file = open(os.path.join(BACKUP_DIR, '.lock'), 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def all_pools():
+    pools = [None]
+    if os.path.isdir(POOLS_DIR):
+        pools += sorted(name[:-3] for name in os.listdir(POOLS_DIR)
+                        if name.endswith('.db') and POOL_ID_PATTERN.match(name[:-3]))
+    return pools
+
+def seconds_until_backup():
+    """Time left before the next scheduled backup, going by the default pool's last attempt"""
+    try:
+        last_attempt = os.path.getmtime(os.path.join(BACKUP_DIR, 'last-backup.json'))
+    except OSError:
+        return 0
+    return last_attempt + BACKUP_INTERVAL_SECONDS - time.time()
+
+def run_backup_schedule():
+    """Background loop: back up every pool each BACKUP_INTERVAL_SECONDS, in one worker at a time"""
+    while True:
+        wait = seconds_until_backup()
+        if wait > 0:
+            time.sleep(min(wait, 60))
+            continue
+        lock_file = try_backup_lock()
+        if lock_file is None:
+            time.sleep(60)
+            continue
+        try:
+            # Another worker may have finished a run while this one was waiting
+            if seconds_until_backup() <= 0:
+                for pool in all_pools():
+                    report = backup_pool(pool)
+                    if not report['ok']:
+                        app.logger.error('Backup of pool %s failed: %s', pool or 'default', report['error'])
+        except Exception:
+            app.logger.exception('Scheduled backup failed')
+            time.sleep(60)
+        finally:
+            lock_file.close()
+
+@app.before_request
+def start_backup_schedule():
+    if not BACKUP_INTERVAL_SECONDS or storage.name != 'sqlite':
+        return
+    with backup_lock:
+        if backup_state['pid'] != os.getpid():
+            # One scheduler thread per process, started on first use (after any fork)
+            backup_state['pid'] = os.getpid()
+            threading.Thread(target=run_backup_schedule, daemon=True).start()
+
+# Admin: Back up this pool's database now
+@app.route('/api/admin/backups', methods=['POST'])
+@admin_required
+def create_backup():
+    if storage.name != 'sqlite':
+        return jsonify({'error': 'Back up PostgreSQL with pg_dump'}), 400
+    lock_file = try_backup_lock()
+    if lock_file is None:
+        return jsonify({'error': 'A backup is already running'}), 409
+    try:
+        report = backup_pool(current_pool())
+    finally:
+        lock_file.close()
+    return jsonify(report), 200 if report['ok'] else 500
+
+# Admin: List this pool's backups and the latest attempt
+@app.route('/api/admin/backups', methods=['GET'])
+@admin_required
+def get_backups():
+    if storage.name != 'sqlite':
+        return jsonify({'error': 'Back up PostgreSQL with pg_dump'}), 400
+    pool = current_pool()
+    return jsonify({
+        'backups': list_backups(pool),
+        'last': read_backup_report(pool),
+        'interval_seconds': BACKUP_INTERVAL_SECONDS,
+        'keep': BACKUP_KEEP,
+        # Where continuous WAL shipping has reached, when REPLICA_DIR is set
+        'replica': read_replica_position(pool) if REPLICA_DIR else None,
+    })
+
+@app.cli.command('backup')
+@click.option('--pool', default=None, help='Pool to back up (default pool if omitted)')
+@click.option('--all', 'all_pools_option', is_flag=True, help='Back up every pool')
+def backup_command(pool, all_pools_option):
+    """Take an online backup now (flask backup --pool acme, or --all)"""
+    if storage.name != 'sqlite':
+        raise click.ClickException('Back up PostgreSQL with pg_dump')
+    if not pool_exists(pool):
+        raise click.ClickException(f'Pool {pool} not found')
+    lock_file = try_backup_lock()
+    if lock_file is None:
+        raise click.ClickException('A backup is already running')
+    try:
+        for target in all_pools() if all_pools_option else [pool]:
+            report = backup_pool(target)
+            if not report['ok']:
+                raise click.ClickException(f'Backup of pool {target or "default"} failed: {report["error"]}')
+            click.echo(f'{os.path.join(backup_directory(target), report["name"])}: '
+                       f'{report["pages"]} pages, {report["bytes"]} bytes in {report["seconds"]}s')
+    finally:
+        lock_file.close()
+
+
+# ==========================================
+# WAL Shipping
+# ==========================================
+
+# With REPLICA_DIR set, one worker ships every committed WAL frame of every
+# pool to REPLICA_DIR (REPLICA_DIR/p/<pool> for a pool) about once a second:
+#
+#   <generation>/snapshot.db.gz      online copy taken when the generation started
+#   <generation>/wal/00000001.wal    raw WAL frames, in order, each ending on a commit
+#   <generation>/position.json       where in the live WAL shipping has reached
+#
+# Frames are read straight from the -wal file, so writers never wait on the
+# shipper; a frame counts once its salts and checksum chain validate, the
+# same test SQLite's own recovery uses. App connections don't auto-checkpoint
+# while replication is on. The shipper checkpoints under a brief write lock
+# after copying the last frame, so the WAL only ever restarts once everything
+# in it has been shipped. Any other break in the chain (an external
+# checkpoint, a replaced database file) starts a new generation from a fresh
+# snapshot. `flask restore-replica` replays the newest generation.
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+replica_lock = threading.Lock()
+# 'failed' holds pools whose last pass failed; they start a new generation instead of resuming
+replica_state = {'pid': None, 'pools': {}, 'failed': set()}
+
+def replica_directory(pool):
+    return REPLICA_DIR if pool is None else os.path.join(REPLICA_DIR, 'p', pool)
+
+def wal_checksum(data, checksum, big_endian):
+    """Continue SQLite's WAL checksum over data (a multiple of 8 bytes)"""
+    words = struct.unpack(f'{">" if big_endian else "<"}{len(data) // 4}I', data)
+    s0, s1 = checksum
+    for i in range(0, len(words), 2):
+        s0 = (s0 + words[i] + s1) & 0xffffffff
+        s1 = (s1 + words[i + 1] + s0) & 0xffffffff
+    return s0, s1
+
+def read_wal_header(wal_path):
+    """The live WAL's header fields, or None when there is no valid WAL"""
+    try:
+        with open(wal_path, 'rb') as f:
+            header = f.read(WAL_HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(header) < WAL_HEADER_SIZE:
+        return None
+    magic, _, page_size, _, salt1, salt2, check1, check2 = struct.unpack('>8I', header)
+    if magic not in (0x377f0682, 0x377f0683):
+        return None
+    big_endian = bool(magic & 1)
+    if wal_checksum(header[:24], (0, 0), big_endian) != (check1, check2):
+        return None
+    return {'page_size': page_size, 'salts': [salt1, salt2], 'checksum': [check1, check2], 'big_endian': big_endian}
+
+def read_committed_frames(wal_path, header, offset, checksum):
+    """Valid frames from offset through the last commit frame.
+
+    Returns (frames bytes, new offset, checksum after the last commit frame).
+    """
+    frame_size = WAL_FRAME_HEADER_SIZE + header['page_size']
+    with open(wal_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    position = committed = 0
+    running = committed_checksum = tuple(checksum)
+    while position + frame_size <= len(data):
+        frame_header = data[position:position + WAL_FRAME_HEADER_SIZE]
+        _, commit_size, salt1, salt2, check1, check2 = struct.unpack('>6I', frame_header)
+        if [salt1, salt2] != header['salts']:
+            break
+        running = wal_checksum(frame_header[:8], running, header['big_endian'])
+        running = wal_checksum(data[position + WAL_FRAME_HEADER_SIZE:position + frame_size], running, header['big_endian'])
+        if running != (check1, check2):
+            break
+        position += frame_size
+        if commit_size:
+            committed, committed_checksum = position, running
+    return data[:committed], offset + committed, list(committed_checksum)
+
+def save_replica_position(pool, state):
+    position = {key: state[key] for key in ('generation', 'page_size', 'salts', 'offset', 'checksum', 'segment', 'checkpointed')}
+    position['shipped_at'] = datetime.now().isoformat()
+    write_atomic(os.path.join(replica_directory(pool), state['generation'], 'position.json'),
+                 json.dumps(position).encode('utf-8'))
+
+def read_replica_position(pool, generation=None):
+    directory = replica_directory(pool)
+    if generation is None:
+        generations = list_replica_generations(pool)
+        if not generations:
+            return None
+        generation = generations[0]
+    try:
+        with open(os.path.join(directory, generation, 'position.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def list_replica_generations(pool):
+    """A pool's replica generations, newest first"""
+    directory = replica_directory(pool)
+    if not os.path.isdir(directory):
+        return []
+    return sorted((entry.name for entry in os.scandir(directory)
+                   if entry.is_dir() and os.path.exists(os.path.join(entry.path, 'snapshot.db.gz'))), reverse=True)
+
+def start_replica_generation(pool, state):
+    """Snapshot the pool and ship its WAL from the start from now on"""
+    database = pool_database(pool)
+    generation = f'{datetime.now().strftime("%Y%m%d-%H%M%S")}-{os.urandom(3).hex()}'
+    directory = os.path.join(replica_directory(pool), generation)
+    os.makedirs(os.path.join(directory, 'wal'))
+    copy_path = os.path.join(directory, 'snapshot.db.copy')
+    # The snapshot includes every frame of the WAL it was taken under, so
+    # shipping restarts at that WAL's first frame; replaying frames the
+    # snapshot already has just rewrites pages with the same contents
+    while True:
+        before = read_wal_header(f'{database}-wal')
+        copy_database(database, copy_path)
+        header = read_wal_header(f'{database}-wal')
+        if (before and before['salts']) == (header and header['salts']):
+            break
+    compress_file(copy_path, os.path.join(directory, 'snapshot.db.gz'))
+    os.remove(copy_path)
+
+    state.update(generation=generation, segment=0, checkpointed=False,
+                 page_size=header['page_size'] if header else None,
+                 salts=header['salts'] if header else None,
+                 offset=WAL_HEADER_SIZE, checksum=header['checksum'] if header else None)
+    save_replica_position(pool, state)
+    for old in list_replica_generations(pool)[REPLICA_KEEP_GENERATIONS:]:
+        shutil.rmtree(os.path.join(replica_directory(pool), old), ignore_errors=True)
+
+def resume_replica_generation(pool, state):
+    """Pick up the newest generation after a restart if the live WAL still continues it"""
+    position = read_replica_position(pool)
+    header = read_wal_header(f'{pool_database(pool)}-wal')
+    if position is None or header is None or position['salts'] != header['salts']:
+        return False
+    if position['offset'] > WAL_HEADER_SIZE:
+        # The last shipped frame must still be in place, with the checksum we recorded
+        frame_size = WAL_FRAME_HEADER_SIZE + header['page_size']
+        with open(f'{pool_database(pool)}-wal', 'rb') as f:
+            f.seek(position['offset'] - frame_size)
+            frame_header = f.read(WAL_FRAME_HEADER_SIZE)
+        if len(frame_header) < WAL_FRAME_HEADER_SIZE or list(struct.unpack('>6I', frame_header)[4:]) != position['checksum']:
+            return False
+    state.update(position)
+    return True
+
+def ship_frames(pool, state, header):
+    """Write the frames committed since the last run as the next segment. Returns the frame count."""
+    wal_path = f'{pool_database(pool)}-wal'
+    frames, offset, checksum = read_committed_frames(wal_path, header, state['offset'], state['checksum'])
+    if not frames:
+        return 0
+    state['segment'] += 1
+    write_atomic(os.path.join(replica_directory(pool), state['generation'], 'wal', f'{state["segment"]:08d}.wal'), frames)
+    state.update(offset=offset, checksum=checksum, checkpointed=False)
+    return len(frames) // (WAL_FRAME_HEADER_SIZE + header['page_size'])
+
+def checkpoint_shipped_wal(pool, state):
+    """Checkpoint with writers held off, so the WAL can only restart after its last frame is shipped"""
+    database = pool_database(pool)
+    state['conn'].execute('BEGIN IMMEDIATE')
+    try:
+        header = read_wal_header(f'{database}-wal')
+        if header is None or header['salts'] != state['salts']:
+            return
+        ship_frames(pool, state, header)
+        checkpointer = sqlite3.connect(database, check_same_thread=False)
+        try:
+            _, wal_frames, checkpointed = checkpointer.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+        finally:
+            checkpointer.close()
+        state['checkpointed'] = checkpointed == wal_frames
+    finally:
+        state['conn'].execute('COMMIT')
+
+def ship_pool(pool):
+    """One shipping pass for a pool: start or resume a generation, copy new frames, checkpoint when due"""
+    state = replica_state['pools'].get(pool)
+    if state is None:
+        state = replica_state['pools'][pool] = {}
+        # Held open so the WAL is never checkpointed and deleted when the app's last connection closes
+        state['conn'] = sqlite3.connect(pool_database(pool), timeout=DB_BUSY_TIMEOUT, isolation_level=None,
+                                        check_same_thread=False)
+        state['conn'].execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        if pool in replica_state['failed'] or not resume_replica_generation(pool, state):
+            start_replica_generation(pool, state)
+            replica_state['failed'].discard(pool)
+
+    header = read_wal_header(f'{pool_database(pool)}-wal')
+    if header is None:
+        return 0
+    if state['salts'] is None:
+        # No WAL when the snapshot was taken: every frame of this one is newer
+        state.update(page_size=header['page_size'], salts=header['salts'], offset=WAL_HEADER_SIZE,
+                     checksum=header['checksum'])
+    elif header['salts'] != state['salts']:
+        # A restart after our own checkpoint bumps salt1 by one; anything else may have skipped frames
+        if state['checkpointed'] and header['salts'][0] == (state['salts'][0] + 1) & 0xffffffff:
+            state.update(salts=header['salts'], offset=WAL_HEADER_SIZE, checksum=header['checksum'], checkpointed=False)
+        else:
+            start_replica_generation(pool, state)
+            return 0
+
+    shipped = ship_frames(pool, state, header)
+    if (state['offset'] - WAL_HEADER_SIZE) // (WAL_FRAME_HEADER_SIZE + header['page_size']) >= REPLICA_CHECKPOINT_FRAMES:
+        checkpoint_shipped_wal(pool, state)
+    if state['segment'] >= REPLICA_MAX_SEGMENTS:
+        start_replica_generation(pool, state)
+    elif shipped or state['checkpointed']:
+        save_replica_position(pool, state)
+    return shipped
+
+def run_wal_shipper():
+    """Background loop: the worker holding REPLICA_DIR/.lock ships every pool each REPLICA_SYNC_SECONDS"""
+    os.makedirs(REPLICA_DIR, exist_ok=True)
+    lock_file = open(os.path.join(REPLICA_DIR, '.lock'), 'w')
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            # Another worker is shipping; take over if it exits
+            time.sleep(5)
+    while True:
+        started = time.time()
+        for pool in all_pools():
+            try:
+                run_db_call(ship_pool, pool)
+            except Exception:
+                # Anything else (a damaged position.json, a bug) would end the thread for
+                # good, and with autocheckpoints off the WAL would then grow without limit
+                app.logger.exception('Shipping the WAL of pool %s failed', pool or 'default')
+                # Start over from a fresh snapshot on the next pass
+                replica_state['failed'].add(pool)
+                state = replica_state['pools'].pop(pool, None)
+                if state and state.get('conn'):
+                    state['conn'].close()
+        time.sleep(max(0.0, REPLICA_SYNC_SECONDS - (time.time() - started)))
+
+@app.before_request
+def start_wal_shipper():
+    if not REPLICA_DIR or storage.name != 'sqlite':
+        return
+    with replica_lock:
+        if replica_state['pid'] != os.getpid():
+            # One shipper thread per process, started on first use (after any fork)
+            replica_state['pid'] = os.getpid()
+            replica_state['pools'] = {}
+            replica_state['failed'] = set()
+            threading.Thread(target=run_wal_shipper, daemon=True).start()
+
+def restore_replica(pool, output, generation=None):
+    """Rebuild a pool's database at output from a replica generation. Returns (generation, frames applied)."""
+    generation = generation or (list_replica_generations(pool) or [None])[0]
+    if generation is None:
+        raise FileNotFoundError(f'No replica generations in {replica_directory(pool)}')
+    directory = os.path.join(replica_directory(pool), generation)
+    segments = sorted(name for name in os.listdir(os.path.join(directory, 'wal')) if name.endswith('.wal'))
+    page_size = (read_replica_position(pool, generation) or {}).get('page_size')
+    if segments and not page_size:
+        raise click.ClickException(f'{os.path.join(directory, "position.json")} is missing or unreadable, '
+                                   f'so the page size of its {len(segments)} WAL segments is unknown')
+
+    tmp_path = f'{output}.{os.getpid()}.restore'
+    with gzip.open(os.path.join(directory, 'snapshot.db.gz'), 'rb') as source, open(tmp_path, 'wb') as target:
+        shutil.copyfileobj(source, target)
+
+    applied = 0
+    with open(tmp_path, 'r+b') as target:
+        for name in segments:
+            with open(os.path.join(directory, 'wal', name), 'rb') as f:
+                data = f.read()
+            frame_size = WAL_FRAME_HEADER_SIZE + page_size
+            for start in range(0, len(data) - frame_size + 1, frame_size):
+                page_number, commit_size = struct.unpack('>2I', data[start:start + 8])
+                target.seek((page_number - 1) * page_size)
+                target.write(data[start + WAL_FRAME_HEADER_SIZE:start + frame_size])
+                if commit_size:
+                    target.truncate(commit_size * page_size)
+                applied += 1
+
+    problems = check_database(tmp_path)
+    if problems != ['ok']:
+        os.remove(tmp_path)
+        raise sqlite3.DatabaseError(f'integrity_check failed: {"; ".join(problems[:5])}')
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(output + suffix):
+            os.remove(output + suffix)
+    os.replace(tmp_path, output)
+    return generation, applied
+
+@app.cli.command('restore-replica')
+@click.option('--pool', default=None, help='Pool to restore (default pool if omitted)')
+@click.option('--output', default=None, help="Where to write the database (the pool's own file if omitted)")
+@click.option('--generation', default=None, help='Replica generation to restore (newest if omitted)')
+@click.option('--force', is_flag=True, help='Replace an existing database file; stop the app first')
+def restore_replica_command(pool, output, generation, force):
+    """Rebuild a database from REPLICA_DIR to the last shipped commit (flask restore-replica --pool acme)"""
+    if not REPLICA_DIR:
+        raise click.ClickException('Set REPLICA_DIR to the replica to restore from')
+    if pool is not None and not POOL_ID_PATTERN.match(pool):
+        raise click.BadParameter('use lowercase letters, digits and dashes', param_hint='pool')
+    output = output or pool_database(pool)
+    if os.path.exists(output) and not force:
+        raise click.ClickException(f'{output} exists; stop the app and pass --force to replace it')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    try:
+        generation, applied = restore_replica(pool, output, generation)
+    except (OSError, sqlite3.Error) as e:
+        raise click.ClickException(f'Restore failed: {e}')
+    position = read_replica_position(pool, generation) or {}
+    click.echo(f'Restored {output} from generation {generation}: snapshot + {applied} frames '
+               f'(last shipped {position.get("shipped_at", "at snapshot")})')
+    if os.path.abspath(output) == os.path.abspath(pool_database(pool)):
+        # A handle opened at startup still watches the replaced file
+        with pool_lock:
+            handle = pool_state['handles'].pop(pool, None)
+        if handle is not None and handle['watch'] is not None:
+            storage.close_watch(handle['watch'])
+        publish_from_cli(pool)
+
+
+# ==========================================
+# Startup
+# ==========================================
+
+# Phase -> seconds for this process's startup. Under gunicorn's preload_app
+# (see gunicorn.conf.py) all of it happens once in the master, and forked
+# workers start with the schema checked, assets built and templates compiled.
+startup_timings = OrderedDict()
+STARTUP_TEMPLATES = ['index.html', 'admin_login.html']
+
+def timed_startup(phase, operation):
+    started = time.perf_counter()
+    operation()
+    startup_timings[phase] = time.perf_counter() - started
+
+def warm_templates():
+    """Compile the page templates now instead of on each worker's first page view"""
+    for name in STARTUP_TEMPLATES:
+        app.jinja_env.get_template(name)
+
+def release_startup_connections():
+    """Close what startup opened, so nothing is shared with forked workers"""
+    with pool_lock:
+        for handle in pool_state['handles'].values():
+            storage.close_watch(handle['watch'])
+        pool_state['handles'] = OrderedDict()
+        pool_state['pid'] = None
+    storage.close()
+
+def startup_report():
+    phases = ', '.join(f'{phase} {seconds * 1000:.1f}ms' for phase, seconds in startup_timings.items())
+    return f'{phases}; total {sum(startup_timings.values()) * 1000:.1f}ms (pid {os.getpid()})'
+
+@app.cli.command('startup-report')
+def startup_report_command():
+    """Show how long importing and initializing the app took"""
+    click.echo(startup_report())
+
+# Initialize database and static assets on module load (works with gunicorn)
+startup_timings['import'] = time.perf_counter() - STARTUP_BEGAN
+timed_startup('init_db', init_db)
+timed_startup('build_assets', build_assets)
+timed_startup('templates', warm_templates)
+release_startup_connections()
 
 if __name__ == '__main__':
     app.run(debug=True, port=3000)
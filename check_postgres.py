@@ -0,0 +1,187 @@
+"""Check the PostgreSQL backend end to end against a real server.
+
+The SQLite-flavoured SQL the app writes is rewritten for PostgreSQL, and the
+counters, upserts and claim locking use PostgreSQL-only triggers and advisory
+locks, so this runs them against the database in DATABASE_URL:
+
+    DATABASE_URL=postgresql://localhost/squares_check python check_postgres.py
+
+Every run creates a fresh pool (its own schema) so reruns start clean, and
+drops it afterwards unless --keep is given. Importing the app also brings the
+default pool's schema up to date, so point DATABASE_URL at a scratch
+database. Exits with status 1 if any check fails.
+"""
+import argparse
+import os
+import sys
+import threading
+import uuid
+
+if not os.environ.get('DATABASE_URL', '').startswith(('postgres://', 'postgresql://')):
+    sys.exit('Set DATABASE_URL to a PostgreSQL database to run these checks')
+
+# Each client sends its own X-Forwarded-For address, as if behind one proxy
+os.environ.setdefault('PROXY_HOPS', '1')
+
+from app import app, pool_schema, storage  # noqa: E402  (importing runs init_db)
+
+failures = []
+
+
+def check(label, condition, detail=''):
+    print(f"{'ok  ' if condition else 'FAIL'} {label}" + (f' ({detail})' if detail and not condition else ''))
+    if not condition:
+        failures.append(label)
+
+
+class Client:
+    """Test client for one pool, with its own X-Forwarded-For address"""
+
+    def __init__(self, pool, address):
+        self.client = app.test_client()
+        self.prefix = f'/p/{pool}'
+        self.headers = {'X-Forwarded-For': address}
+
+    def get(self, path, **kwargs):
+        return self.client.get(self.prefix + path, headers=self.headers, **kwargs)
+
+    def post(self, path, body):
+        return self.client.post(self.prefix + path, json=body, headers=self.headers)
+
+
+def claim(pool, address, grid_id, row, col, name, email):
+    return Client(pool, address).post('/api/claim', {
+        'grid_id': grid_id, 'row': row, 'col': col, 'name': name, 'email': email,
+    })
+
+
+def run_concurrently(calls):
+    """Run (function, args) pairs on their own threads, returning their results in order"""
+    results = [None] * len(calls)
+
+    def run(index, function, args):
+        results[index] = function(*args)
+
+    threads = [threading.Thread(target=run, args=(index, function, args)) for index, (function, args) in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def rebuild_counters_check(pool):
+    result = app.test_cli_runner().invoke(args=['rebuild-counters', '--pool', pool, '--check'])
+    return result.exit_code, result.output.strip()
+
+
+def run_checks(pool):
+    result = app.test_cli_runner().invoke(args=['create-pool', pool])
+    check('create-pool creates and initializes a schema', result.exit_code == 0, result.output.strip())
+    if result.exit_code:
+        return
+
+    admin = Client(pool, '10.0.0.1')
+    response = admin.post('/api/admin/login', {'email': 'admin@example.com', 'password': 'admin123'})
+    check('admin login', response.status_code == 200, response.status_code)
+
+    config = admin.get('/api/grid?grid_id=1').get_json()
+    limit = config['squares_limit']
+
+    # Ten claimants race for one square: exactly one wins
+    results = run_concurrently([
+        (claim, (pool, f'10.1.0.{n}', 1, 0, 0, f'Racer {n}', f'racer{n}@example.com')) for n in range(10)
+    ])
+    winners = [response for response in results if response.status_code == 200]
+    check('one winner when claims race for a square', len(winners) == 1, [r.status_code for r in results])
+
+    # One email claims more squares than its limit at once: the limit holds
+    results = run_concurrently([
+        (claim, (pool, f'10.2.0.{n}', 1, 1, n, 'Greedy', 'greedy@example.com')) for n in range(limit + 3)
+    ])
+    claimed = sum(1 for response in results if response.status_code == 200)
+    check('per-email limit holds under concurrent claims', claimed == limit, f'{claimed} claimed, limit {limit}')
+
+    for n, (name, email) in enumerate([('Alice', 'alice@example.com'), ('Bob', 'bob@example.com')]):
+        for col in range(3):
+            response = claim(pool, f'10.3.{n}.{col}', 1, 2 + n, col, name, email)
+            check(f'claim by {name}', response.status_code == 200, response.get_data(as_text=True))
+
+    board = admin.get('/api/grid?grid_id=1').get_json()
+    owners = {(square['row'], square['col']): square['owner_name'] for square in board['squares']}
+    check('board snapshot sees the claims', owners[(2, 0)] == 'Alice' and owners[(3, 2)] == 'Bob')
+
+    response = admin.post('/api/admin/bulk', {'actions': [
+        {'type': 'mark_paid', 'emails': ['alice@example.com']},
+        {'type': 'set_player_name', 'emails': ['bob@example.com'], 'player_name': 'Carol'},
+        {'type': 'clear_squares', 'squares': [{'grid_id': 1, 'row': 3, 'col': 2}]},
+        {'type': 'reassign_owner', 'name': 'Dana', 'email': 'dana@example.com',
+         'squares': [{'grid_id': 1, 'row': 2, 'col': 2}]},
+    ]})
+    affected = [result['affected_squares'] for result in (response.get_json() or {}).get('results', [])]
+    check('bulk actions apply', response.status_code == 200 and affected == [3, 3, 1, 1],
+          f'{response.status_code} {affected}')
+
+    # A batch with an invalid action changes nothing
+    response = admin.post('/api/admin/bulk', {'actions': [
+        {'type': 'mark_paid', 'emails': ['bob@example.com']},
+        {'type': 'reassign_owner', 'name': 'Nobody', 'email': 'not-an-email'},
+    ]})
+    check('invalid bulk batch is rejected', response.status_code == 400, response.status_code)
+
+    response = admin.post('/api/admin/participants/bulk-mark-paid', {'emails': ['dana@example.com'], 'paid': True})
+    check('bulk-mark-paid', response.status_code == 200 and response.get_json()['affected_squares'] == 1,
+          response.get_data(as_text=True))
+
+    alice = admin.get('/api/me?email=alice@example.com').get_json()
+    check('/api/me totals', alice['total_squares'] == 2 and alice['paid_squares'] == 2 and alice['all_paid'],
+          alice)
+    bob = admin.get('/api/me?email=bob@example.com').get_json()
+    check('/api/me reflects set_player_name and clear_squares',
+          bob['player_name'] == 'Carol' and bob['total_squares'] == 2, bob)
+
+    participants = admin.get('/api/admin/participants?search=dana').get_json()
+    emails = [participant['email'] for participant in participants.get('participants', [])]
+    check('participants search', emails == ['dana@example.com'], emails)
+
+    response = admin.post('/api/admin/clear-square', {'grid_id': 1, 'row': 2, 'col': 0})
+    check('clear-square', response.status_code == 200, response.status_code)
+
+    exit_code, output = rebuild_counters_check(pool)
+    check('rebuild-counters --check finds no mismatches', exit_code == 0, output)
+
+    # Break a counter behind the triggers' back and make sure the check notices
+    conn = storage.connect(pool)
+    conn.execute("UPDATE email_counts SET squares = squares + 1 WHERE owner_email = 'bob@example.com'")
+    conn.commit()
+    conn.close()
+    exit_code, output = rebuild_counters_check(pool)
+    check('rebuild-counters --check reports a broken counter', exit_code == 1, output)
+    result = app.test_cli_runner().invoke(args=['rebuild-counters', '--pool', pool])
+    check('rebuild-counters repairs it', result.exit_code == 0 and rebuild_counters_check(pool)[0] == 0,
+          result.output.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keep', action='store_true', help='Keep the check pool instead of dropping it')
+    args = parser.parse_args()
+
+    pool = f'check-{uuid.uuid4().hex[:8]}'
+    try:
+        run_checks(pool)
+    finally:
+        if args.keep:
+            print(f'Kept pool {pool}')
+        else:
+            conn = storage.connect(None)
+            conn.execute(f'DROP SCHEMA IF EXISTS "{pool_schema(pool)}" CASCADE')
+            conn.commit()
+            conn.close()
+
+    print(f'{len(failures)} failed' if failures else 'All checks passed')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,46 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
 bind = "0.0.0.0:10000"
 workers = 2
+
+# WORKER_CLASS=gevent serves each worker's requests from greenlets, so idle
+# keep-alive connections and slow ESPN fetches don't hold a whole worker.
+# SQLite calls are handed to a thread pool (DB_THREADS) in that mode.
+worker_class = os.environ.get('WORKER_CLASS', 'sync')
+if worker_class == 'gevent':
+    worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 2000))
+    keepalive = 75
+
+# Import the app once in the master: schema setup, the asset build and
+# template compilation run before forking, so a worker (re)start is just a
+# fork. PRELOAD_APP=0 goes back to every worker importing the app itself.
+# Code changes then need a full restart; HUP alone won't reload them.
+# gevent workers always import their own copy: the app's locks, thread pool
+# and connections have to be created after the worker monkey-patches.
+preload_app = worker_class != 'gevent' and os.environ.get('PRELOAD_APP', '1') == '1'
+
+def on_starting(server):
+    # Per-worker metrics files from a previous run would be summed into /metrics
+    metrics_dir = os.environ.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'squares-metrics')
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def when_ready(server):
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        server.log.info('App startup (preloaded): %s', app_module.startup_report())
+
+
+def pre_fork(server, worker):
+    worker.fork_started = time.perf_counter()
+
+
+def post_worker_init(worker):
+    app_module = sys.modules.get('app')
+    if app_module is not None and not preload_app:
+        worker.log.info('App startup: %s', app_module.startup_report())
+    worker.log.info('Worker %s ready %.1fms after fork', worker.pid, (time.perf_counter() - worker.fork_started) * 1000)
@@ -0,0 +1,280 @@
+"""Load test the app under gunicorn against local stand-ins.
+
+Starts gunicorn (using gunicorn.conf.py) on a temporary database with a fake
+ESPN scoreboard and a sink SMTP server, then runs a mix of simulated users
+and reports throughput and latency percentiles per endpoint:
+
+    python loadtest.py --duration 60 --pollers 200 --claimers 20 --finders 20 --admins 1
+
+Pollers refresh the board like an open browser tab, claimers claim random
+squares, finders use "Find Your Squares", and admins work the participant
+and email panels. Every simulated user gets its own X-Forwarded-For address,
+so the per-IP rate limits apply to each user the way they would in production.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from standins import FakeESPN, SinkSMTP, build_scoreboard
+
+TEAM1 = 'Kansas City Chiefs'
+TEAM2 = 'Philadelphia Eagles'
+
+
+class Stats:
+    """Thread-safe latency and status collection keyed by endpoint label"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, label, status, elapsed):
+        with self._lock:
+            self.latencies[label].append(elapsed)
+            self.statuses[label][status] += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Client:
+    """One simulated browser: a keep-alive connection, a fake client IP and a cookie jar"""
+
+    def __init__(self, host, port, ip, stats):
+        self.host = host
+        self.port = port
+        self.ip = ip
+        self.stats = stats
+        self.cookie = None
+        self.conn = None
+
+    def request(self, label, method, path, body=None):
+        headers = {'X-Forwarded-For': self.ip}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+            set_cookie = response.getheader('Set-Cookie')
+            if set_cookie:
+                self.cookie = set_cookie.split(';', 1)[0]
+            if response.getheader('Connection', '').lower() == 'close':
+                self.conn.close()
+                self.conn = None
+        except (OSError, http.client.HTTPException):
+            if self.conn:
+                self.conn.close()
+            self.conn = None
+            status, data = 'error', b''
+        self.stats.record(label, status, time.perf_counter() - start)
+        return status, data
+
+
+def pause(deadline, interval):
+    """Think time between a simulated user's actions, cut short at the deadline so the run ends on time"""
+    time.sleep(max(0, min(interval * random.uniform(0.5, 1.5), deadline - time.time())))
+
+
+def run_poller(client, deadline, grid_ids, interval):
+    grid_id = random.choice(grid_ids)
+    while time.time() < deadline:
+        client.request('GET /api/grid', 'GET', f'/api/grid?grid_id={grid_id}&format=compact')
+        client.request('GET /api/grids', 'GET', '/api/grids')
+        if random.random() < 0.5:
+            client.request('GET /api/live-scores', 'GET', '/api/live-scores')
+        if random.random() < 0.5:
+            client.request('GET /api/live-leaders', 'GET', '/api/live-leaders')
+        pause(deadline, interval)
+
+
+def run_claimer(client, deadline, grid_ids, interval, user_id):
+    email = f'claimer{user_id}@loadtest.example'
+    while time.time() < deadline:
+        body = {
+            'grid_id': random.choice(grid_ids),
+            'row': random.randrange(10),
+            'col': random.randrange(10),
+            'name': f'Claimer {user_id}',
+            'email': email,
+        }
+        client.request('POST /api/claim', 'POST', '/api/claim', body)
+        pause(deadline, interval)
+
+
+def run_finder(client, deadline, grid_ids, interval, claimers):
+    while time.time() < deadline:
+        email = f'claimer{random.randrange(max(1, claimers))}@loadtest.example'
+        client.request('GET /api/my-squares', 'GET', f'/api/my-squares?email={email}&grid_id={random.choice(grid_ids)}')
+        pause(deadline, interval)
+
+
+def run_admin(client, deadline, interval):
+    client.request('POST /api/admin/login', 'POST', '/api/admin/login',
+                   {'email': 'admin@example.com', 'password': 'admin123'})
+    while time.time() < deadline:
+        client.request('GET /api/admin/participants', 'GET', '/api/admin/participants?filter=unpaid')
+        client.request('GET /api/admin/email-status', 'GET', '/api/admin/email-status')
+        client.request('POST /api/admin/participants/toggle-paid', 'POST', '/api/admin/participants/toggle-paid',
+                       {'email': f'claimer{random.randrange(50)}@loadtest.example', 'paid': random.random() < 0.5})
+        if random.random() < 0.2:
+            client.request('POST /api/admin/sync-live-scores', 'POST', '/api/admin/sync-live-scores', {})
+        pause(deadline, interval)
+
+
+def wait_for_server(host, port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request('GET', '/api/admin/status')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_app(host, port, workdir, espn, smtp, workers=None, worker_class=None, database_url=None):
+    """Launch gunicorn on a database in workdir (or database_url), wired to the stand-ins. Returns (process, command)."""
+    env = dict(os.environ,
+               DATABASE_PATH=os.path.join(workdir, 'squares.db'),
+               ESPN_SCOREBOARD_URL=espn.url,
+               SMTP_HOST=host, SMTP_PORT=str(smtp.port), SMTP_USE_SSL='0',
+               GMAIL_ADDRESS='loadtest@example.com', GMAIL_APP_PASSWORD='loadtest',
+               SECRET_KEY='loadtest',
+               # Every simulated user sends its own X-Forwarded-For address
+               PROXY_HOPS='1')
+    if database_url:
+        env['DATABASE_URL'] = database_url
+    if worker_class:
+        # Through the environment, so gunicorn.conf.py sees it when deciding whether to preload
+        env['WORKER_CLASS'] = worker_class
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'{host}:{port}']
+    if workers:
+        command += ['--workers', str(workers)]
+    command.append('app:app')
+    return subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__))), command
+
+
+def setup_game(host, port, grids):
+    """Configure teams, limits and extra grids through the admin API"""
+    admin = Client(host, port, '10.255.255.254', Stats())
+    admin.request('login', 'POST', '/api/admin/login', {'email': 'admin@example.com', 'password': 'admin123'})
+    admin.request('config', 'POST', '/api/config', {'team1_name': TEAM1, 'team2_name': TEAM2, 'squares_limit': 1000})
+    grid_ids = [1]
+    for _ in range(grids - 1):
+        _, data = admin.request('grid', 'POST', '/api/admin/grids', {'name': ''})
+        grid_ids.append(json.loads(data)['grid_id'])
+    return grid_ids
+
+
+def print_report(stats, elapsed):
+    print()
+    print(f'{"endpoint":<42} {"count":>7} {"rps":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"max ms":>8}  statuses')
+    total = 0
+    for label in sorted(stats.latencies):
+        values = sorted(stats.latencies[label])
+        total += len(values)
+        statuses = ', '.join(f'{k}:{v}' for k, v in sorted(stats.statuses[label].items(), key=lambda kv: str(kv[0])))
+        print(f'{label:<42} {len(values):>7} {len(values) / elapsed:>8.1f} '
+              f'{percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} '
+              f'{percentile(values, 99) * 1000:>8.1f} {values[-1] * 1000:>8.1f}  {statuses}')
+    print(f'\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the squares app against local stand-ins')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run the mix')
+    parser.add_argument('--pollers', type=int, default=50, help='board viewers refreshing the grid')
+    parser.add_argument('--claimers', type=int, default=10, help='users claiming squares')
+    parser.add_argument('--finders', type=int, default=10, help='users looking up their squares')
+    parser.add_argument('--admins', type=int, default=1, help='admins working the dashboard')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='mean seconds between board refreshes')
+    parser.add_argument('--action-interval', type=float, default=2.0, help='mean seconds between claimer/finder/admin actions')
+    parser.add_argument('--grids', type=int, default=2, help='number of grids to create')
+    parser.add_argument('--workers', type=int, help='override gunicorn worker count')
+    parser.add_argument('--worker-class', help='override gunicorn worker class')
+    parser.add_argument('--port', type=int, default=10100)
+    parser.add_argument('--database-url', help='run against this (empty) PostgreSQL database instead of a temporary SQLite file')
+    parser.add_argument('--espn-latency', type=float, default=0.05, help='seconds the fake ESPN waits per request')
+    parser.add_argument('--smtp-latency', type=float, default=0.02, help='seconds the sink SMTP waits per message')
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    workdir = tempfile.mkdtemp(prefix='squares-loadtest-')
+    espn = FakeESPN(host=host, latency=args.espn_latency).start()
+    espn.set_scoreboard(build_scoreboard(TEAM1, TEAM2, period=2, clock='7:30', status='STATUS_IN_PROGRESS',
+                                         linescores1=[7, 3], linescores2=[0, 7]))
+    smtp = SinkSMTP(host=host, latency=args.smtp_latency).start()
+
+    server, command = start_app(host, args.port, workdir, espn, smtp, args.workers, args.worker_class, args.database_url)
+    try:
+        if not wait_for_server(host, args.port):
+            print('Server did not start', file=sys.stderr)
+            return 1
+
+        grid_ids = setup_game(host, args.port, args.grids)
+        stats = Stats()
+        deadline = time.time() + args.duration
+        threads = []
+        ip_counter = iter(range(1, 1 << 24))
+
+        def spawn(target, *target_args):
+            n = next(ip_counter)
+            client = Client(host, args.port, f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}', stats)
+            thread = threading.Thread(target=target, args=(client, deadline) + target_args, daemon=True)
+            threads.append(thread)
+
+        for _ in range(args.pollers):
+            spawn(run_poller, grid_ids, args.poll_interval)
+        for i in range(args.claimers):
+            spawn(run_claimer, grid_ids, args.action_interval, i)
+        for i in range(args.finders):
+            spawn(run_finder, grid_ids, args.action_interval, args.claimers)
+        for _ in range(args.admins):
+            spawn(run_admin, args.action_interval)
+
+        print(f'Running {len(threads)} simulated users for {args.duration:.0f}s against {" ".join(command)}')
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start
+
+        print_report(stats, elapsed)
+        print(f'Fake ESPN requests: {espn.requests}, sink SMTP messages: {smtp.count}')
+        return 0
+    finally:
+        server.terminate()
+        server.wait()
+        espn.stop()
+        smtp.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Replay a full game through the live score sync and email pipeline at N x speed.
+
+A recorded or synthetic sequence of ESPN scoreboard snapshots is published
+through the fake ESPN server on a compressed clock, while a simulated admin
+tab polls /api/live-scores and calls /api/admin/sync-live-scores exactly as
+checkAndSyncLiveScores() does in app.js. For every quarter the report shows
+how long it took from the snapshot that ended the quarter to the quarter
+lock, the winner computation (first winner email recorded) and the last
+email sent:
+
+    python replay.py --speed 120 --grids 3 --participants 60
+    python replay.py --game recorded_game.json --speed 30 --viewers 200
+
+A recorded game is a JSON list of {"t": seconds since kickoff, "scoreboard":
+{...ESPN scoreboard...}}. --save writes the synthetic game in that format.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from loadtest import TEAM1, TEAM2, Client, Stats, print_report, run_poller, start_app, wait_for_server
+from standins import FakeESPN, SinkSMTP, build_scoreboard
+
+QUARTER_SECONDS = 45 * 60
+HALFTIME_SECONDS = 30 * 60
+BREAK_SECONDS = 2 * 60
+
+
+def synthetic_game(seed=None):
+    """Build a plausible game as a list of timed scoreboard snapshots"""
+    rng = random.Random(seed)
+    snapshots = []
+    lines = [[], []]
+
+    def snap(t, period, status, clock='0:00', completed=False):
+        snapshots.append({'t': t, 'scoreboard': build_scoreboard(
+            TEAM1, TEAM2, period=period, clock=clock, status=status, completed=completed,
+            linescores1=list(lines[0]), linescores2=list(lines[1]))})
+
+    t = 0
+    for period in range(1, 5):
+        lines[0].append(0)
+        lines[1].append(0)
+        snap(t, period, 'STATUS_IN_PROGRESS', '15:00')
+        for offset in sorted(rng.uniform(60, QUARTER_SECONDS - 60) for _ in range(rng.randint(1, 4))):
+            team = rng.randrange(2)
+            lines[team][-1] += rng.choice([3, 7, 7, 6, 2])
+            remaining = int(15 * 60 * (1 - offset / QUARTER_SECONDS))
+            snap(t + offset, period, 'STATUS_IN_PROGRESS', f'{remaining // 60}:{remaining % 60:02d}')
+        t += QUARTER_SECONDS
+        if period == 2:
+            snap(t, period, 'STATUS_HALFTIME')
+            t += HALFTIME_SECONDS
+        elif period == 4:
+            snap(t, period, 'STATUS_FINAL', completed=True)
+        else:
+            snap(t, period, 'STATUS_END_PERIOD')
+            t += BREAK_SECONDS
+    return snapshots
+
+
+def ended_quarters(scoreboard):
+    """Quarters sync_live_scores() would lock for this snapshot"""
+    status = scoreboard['events'][0]['competitions'][0]['status']
+    period = status.get('period', 0)
+    is_final = status['type'].get('completed', False)
+    is_halftime = status['type'].get('name') == 'STATUS_HALFTIME'
+    ended = set()
+    if period > 1 or is_halftime or is_final:
+        ended.add(1)
+    if period > 2 or is_halftime or is_final:
+        ended.add(2)
+    if period > 3 or is_final:
+        ended.add(3)
+    if is_final:
+        ended.add(4)
+    return ended
+
+
+def prepare_game(admin, grids, participants):
+    """Enable emails and live sync, fill every square and lock numbers on each grid"""
+    admin.request('login', 'POST', '/api/admin/login', {'email': 'admin@example.com', 'password': 'admin123'})
+    admin.request('config', 'POST', '/api/config', {'team1_name': TEAM1, 'team2_name': TEAM2, 'squares_limit': 100000})
+    admin.request('emails', 'POST', '/api/admin/email-toggle', {'enabled': True})
+    admin.request('live sync', 'POST', '/api/admin/live-sync-toggle', {'enabled': True})
+
+    grid_ids = [1]
+    for _ in range(grids - 1):
+        _, data = admin.request('grid', 'POST', '/api/admin/grids', {'name': ''})
+        grid_ids.append(json.loads(data)['grid_id'])
+
+    # Admin claims are exempt from rate limits, so the board fills quickly
+    for grid_id in grid_ids:
+        for position in range(100):
+            p = random.randrange(participants)
+            admin.request('claim', 'POST', '/api/claim', {
+                'grid_id': grid_id, 'row': position // 10, 'col': position % 10,
+                'name': f'Participant {p}', 'email': f'participant{p}@replay.example'})
+        admin.request('randomize', 'POST', '/api/randomize', {'grid_id': grid_id})
+        admin.request('lock', 'POST', '/api/lock-numbers', {'grid_id': grid_id})
+    return grid_ids
+
+
+def run_admin_tab(admin, stop, interval, lock_times):
+    """Mirror checkAndSyncLiveScores(): poll live scores, sync when a quarter should lock"""
+    locked = set()
+    while not stop.is_set():
+        _, data = admin.request('GET /api/live-scores', 'GET', '/api/live-scores')
+        try:
+            game = json.loads(data).get('game')
+        except ValueError:
+            game = None
+        if game:
+            should_sync = (
+                (game['period'] > 1 and 1 not in locked) or
+                ((game['period'] > 2 or game['is_halftime']) and 2 not in locked) or
+                ((game['period'] > 3 or game['is_final']) and 3 not in locked) or
+                (game['is_final'] and 4 not in locked)
+            )
+            if should_sync:
+                _, data = admin.request('POST /api/admin/sync-live-scores', 'POST', '/api/admin/sync-live-scores', {})
+                now = time.time()
+                for label in json.loads(data).get('updated_quarters', []):
+                    quarter = 4 if 'Final' in label else int(label[1])
+                    if quarter not in locked:
+                        locked.add(quarter)
+                        lock_times[quarter] = now
+        stop.wait(interval)
+
+
+def email_timings(database):
+    """Per quarter: (first winner email created, last email sent, sent count, failed count, pending count)"""
+    conn = sqlite3.connect(database)
+    rows = conn.execute('''
+        SELECT quarter,
+               MIN(CASE WHEN email_type = 'winner' THEN created_at END),
+               MAX(sent_at),
+               SUM(status = 'sent'), SUM(status = 'failed'), SUM(status = 'pending')
+        FROM email_sends GROUP BY quarter
+    ''').fetchall()
+    conn.close()
+
+    def to_epoch(value):
+        return datetime.fromisoformat(value).timestamp() if value else None
+
+    return {q: (to_epoch(first), to_epoch(last), sent, failed, pending) for q, first, last, sent, failed, pending in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a game through score sync and email at N x speed')
+    parser.add_argument('--game', help='recorded game JSON (default: synthetic game)')
+    parser.add_argument('--save', help='write the replayed snapshot sequence to this file')
+    parser.add_argument('--seed', type=int, help='random seed for the synthetic game')
+    parser.add_argument('--speed', type=float, default=120, help='replay speed multiplier')
+    parser.add_argument('--sync-interval', type=float, default=30, help='admin tab poll interval in game seconds (app.js uses 30)')
+    parser.add_argument('--grids', type=int, default=2)
+    parser.add_argument('--participants', type=int, default=40, help='distinct emails spread across the squares')
+    parser.add_argument('--viewers', type=int, default=0, help='background board pollers during the replay')
+    parser.add_argument('--email-timeout', type=float, default=120, help='seconds to wait for emails after the final snapshot')
+    parser.add_argument('--smtp-latency', type=float, default=0.05, help='seconds the sink SMTP waits per message')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--worker-class')
+    parser.add_argument('--port', type=int, default=10200)
+    args = parser.parse_args()
+
+    if args.game:
+        with open(args.game) as f:
+            snapshots = json.load(f)
+    else:
+        snapshots = synthetic_game(args.seed)
+    snapshots.sort(key=lambda s: s['t'])
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(snapshots, f)
+
+    host = '127.0.0.1'
+    workdir = tempfile.mkdtemp(prefix='squares-replay-')
+    espn = FakeESPN(TEAM1, TEAM2, host=host).start()
+    espn.set_scoreboard(build_scoreboard(TEAM1, TEAM2))
+    smtp = SinkSMTP(host=host, latency=args.smtp_latency).start()
+    server, command = start_app(host, args.port, workdir, espn, smtp, args.workers, args.worker_class)
+
+    try:
+        if not wait_for_server(host, args.port):
+            print('Server did not start', file=sys.stderr)
+            return 1
+
+        admin = Client(host, args.port, '10.255.255.254', Stats())
+        grid_ids = prepare_game(admin, args.grids, args.participants)
+
+        stop = threading.Event()
+        lock_times = {}
+        tab_stats = Stats()
+        tab = Client(host, args.port, '10.255.255.253', tab_stats)
+        tab.cookie = admin.cookie
+        threads = [threading.Thread(target=run_admin_tab, args=(tab, stop, args.sync_interval / args.speed, lock_times), daemon=True)]
+
+        # Background viewers run until well past the last snapshot
+        game_length = snapshots[-1]['t'] / args.speed
+        viewer_stats = Stats()
+        viewer_deadline = time.time() + game_length + args.email_timeout
+        for n in range(args.viewers):
+            viewer = Client(host, args.port, f'10.1.{n >> 8 & 255}.{n & 255}', viewer_stats)
+            threads.append(threading.Thread(target=run_poller, args=(viewer, viewer_deadline, grid_ids, 5.0), daemon=True))
+
+        print(f'Replaying {len(snapshots)} snapshots ({snapshots[-1]["t"] / 60:.0f} game minutes) at {args.speed:g}x '
+              f'= {game_length:.0f}s, {len(grid_ids)} grids')
+        for thread in threads:
+            thread.start()
+
+        # Publish snapshots on the compressed clock, noting when each quarter ended
+        quarter_end = {}
+        start = time.time()
+        for snapshot in snapshots:
+            delay = start + snapshot['t'] / args.speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            espn.set_scoreboard(snapshot['scoreboard'])
+            published = time.time()
+            for quarter in ended_quarters(snapshot['scoreboard']):
+                quarter_end.setdefault(quarter, published)
+
+        # Wait for every ended quarter to lock and its emails to settle
+        database = os.path.join(workdir, 'squares.db')
+        deadline = time.time() + args.email_timeout
+        while time.time() < deadline:
+            timings = email_timings(database)
+            done = all(q in lock_times and q in timings and not timings[q][4] for q in quarter_end)
+            if done:
+                # Give the sender a moment to prove nothing else is queued
+                time.sleep(1)
+                if email_timings(database) == timings:
+                    break
+            time.sleep(0.5)
+        stop.set()
+
+        timings = email_timings(database)
+        print()
+        print(f'{"quarter":<8} {"lock s":>8} {"winner s":>9} {"last email s":>13} {"game-time lock":>15} {"sent":>6} {"failed":>7} {"pending":>8}')
+        for quarter in sorted(quarter_end):
+            ended = quarter_end[quarter]
+            first_winner, last_sent, sent, failed, pending = timings.get(quarter, (None, None, 0, 0, 0))
+
+            def since(moment):
+                return f'{moment - ended:.2f}' if moment else '-'
+
+            game_lock = f'{(lock_times[quarter] - ended) * args.speed:.0f}s' if quarter in lock_times else '-'
+            print(f'Q{quarter:<7} {since(lock_times.get(quarter)):>8} {since(first_winner):>9} {since(last_sent):>13} '
+                  f'{game_lock:>15} {sent or 0:>6} {failed or 0:>7} {pending or 0:>8}')
+        print(f'\nSink SMTP received {smtp.count} messages')
+
+        print('\nAdmin tab requests:')
+        print_report(tab_stats, time.time() - start)
+        if args.viewers:
+            print('\nBackground viewers:')
+            print_report(viewer_stats, time.time() - start)
+        return 0
+    finally:
+        server.terminate()
+        server.wait()
+        espn.stop()
+        smtp.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Local stand-ins for the external services the app talks to.
+
+FakeESPN serves an ESPN-shaped NFL scoreboard whose game state can be changed
+while it runs, and SinkSMTP accepts and counts mail without delivering it.
+Both run on background threads and are used by loadtest.py and replay.py;
+point the app at them with ESPN_SCOREBOARD_URL, SMTP_HOST, SMTP_PORT and
+SMTP_USE_SSL=0.
+"""
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def build_scoreboard(team1, team2, period=0, clock='15:00', status='STATUS_SCHEDULED',
+                     completed=False, linescores1=None, linescores2=None, game_id='401000001'):
+    """Build a scoreboard document in the shape fetch_espn_nfl_scores() returns"""
+    linescores1 = linescores1 or []
+    linescores2 = linescores2 or []
+    descriptions = {
+        'STATUS_SCHEDULED': 'Scheduled',
+        'STATUS_IN_PROGRESS': 'In Progress',
+        'STATUS_END_PERIOD': 'End of Period',
+        'STATUS_HALFTIME': 'Halftime',
+        'STATUS_FINAL': 'Final',
+    }
+
+    def competitor(name, linescores, home_away):
+        return {
+            'homeAway': home_away,
+            'team': {'displayName': name, 'name': name.split()[-1], 'abbreviation': name[:3].upper()},
+            'score': str(sum(linescores)),
+            'linescores': [{'value': v} for v in linescores],
+        }
+
+    return {
+        'events': [{
+            'id': game_id,
+            'name': f'{team2} at {team1}',
+            'shortName': 'Super Bowl',
+            'competitions': [{
+                'status': {
+                    'period': period,
+                    'displayClock': clock,
+                    'type': {
+                        'name': status,
+                        'description': descriptions.get(status, status),
+                        'completed': completed,
+                    },
+                },
+                'competitors': [
+                    competitor(team1, linescores1, 'home'),
+                    competitor(team2, linescores2, 'away'),
+                ],
+            }],
+        }]
+    }
+
+
+class FakeESPN:
+    """Threaded HTTP server that returns the current scoreboard for any GET"""
+
+    def __init__(self, team1='Team 1', team2='Team 2', host='127.0.0.1', port=0, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._scoreboard = build_scoreboard(team1, team2)
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                    body = json.dumps(fake._scoreboard).encode('utf-8')
+                if fake.latency:
+                    time.sleep(fake.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://{host}:{self.server.server_address[1]}/scoreboard'
+
+    def set_scoreboard(self, scoreboard):
+        with self._lock:
+            self._scoreboard = scoreboard
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SinkSMTP:
+    """Minimal plaintext SMTP server that accepts any login and records each message.
+
+    Only the commands smtplib uses for login + sendmail are implemented.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        self.latency = latency
+        self.messages = []
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                self.reply('220 sink ESMTP')
+                recipients = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('utf-8', 'replace').strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if verb == 'EHLO':
+                        self.reply('250-sink')
+                        self.reply('250 AUTH PLAIN LOGIN')
+                    elif verb == 'HELO':
+                        self.reply('250 sink')
+                    elif verb == 'AUTH':
+                        self.reply('235 Authentication successful')
+                    elif verb == 'MAIL':
+                        recipients = []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        recipients.append(command.split(':', 1)[-1].strip(' <>'))
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        size = 0
+                        while True:
+                            data_line = self.rfile.readline()
+                            if not data_line or data_line in (b'.\r\n', b'.\n'):
+                                break
+                            size += len(data_line)
+                        if sink.latency:
+                            time.sleep(sink.latency)
+                        with sink._lock:
+                            sink.messages.append({'to': recipients, 'size': size, 'received_at': time.time()})
+                        self.reply('250 OK queued')
+                    elif verb == 'RSET':
+                        recipients = []
+                        self.reply('250 OK')
+                    elif verb == 'NOOP':
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host = host
+        self.port = self.server.server_address[1]
+
+    @property
+    def count(self):
+        with self._lock:
+            return len(self.messages)
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
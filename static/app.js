@@ -9,6 +9,10 @@ let participantsFilter = 'all';
 let participantsSort = 'name';
 let participantsSearch = '';
 let allParticipants = [];
+let participantsCursor = null;
+let participantsMatching = 0;
+let participantsPrice = 10;
+let participantsSearchTimer = null;
 let claimDeadline = null;
 let deadlineInterval = null;
 let selectedParticipants = new Set();
@@ -18,6 +22,8 @@ let auditLogSearch = '';
 let liveScoresInterval = null;
 let liveSyncEnabled = false;
 let lockedQuarters = { q1: false, q2: false, q3: false, q4: false };
+let liveLeaders = null;
+let liveLeadersInterval = null;
 
 // Body scroll lock for modals (prevents iOS viewport issues)
 function lockBodyScroll() {
@@ -30,42 +36,75 @@ function unlockBodyScroll() {
 
 // Initialize the app
 document.addEventListener('DOMContentLoaded', async () => {
+    if (applyInitialState()) return;
     await checkAdminStatus();
     await loadGrids();
     await loadGrid();
     await loadLogos();
 });
 
+// index.html inlines the admin flag, grid list, first grid and logos, so the
+// first paint needs no API calls. Returns false (and the page loads them the
+// usual way) if the state is missing or can't be applied.
+function applyInitialState() {
+    const element = document.getElementById('initialState');
+    if (!element) return false;
+    const admin = element.dataset.admin === 'true';
+    try {
+        const state = JSON.parse(element.textContent);
+        if (!state.grid || !Array.isArray(state.grids)) throw new Error('incomplete initial state');
+        // The board renders for admins differently, but the admin panels start
+        // loading only once everything else applied (see below)
+        isAdmin = admin;
+        gridsData = state.grids;
+        renderGridTabs();
+        currentGridId = state.grid.grid_id;
+        showGrid(decodeCompactGrid(state.grid));
+        applyLogos(state.logos);
+    } catch (error) {
+        console.error('Error applying initial state:', error);
+        isAdmin = false;
+        return false;
+    }
+    // Last, so a failure above can't make the fallback start the admin pollers twice
+    applyAdminStatus(admin);
+    return true;
+}
+
 async function checkAdminStatus() {
     try {
-        const response = await fetch('/api/admin/status');
+        const response = await fetch(BASE_PATH + '/api/admin/status');
         const data = await response.json();
-        isAdmin = data.is_admin;
-
-        if (isAdmin) {
-            const adminLink = document.getElementById('adminLink');
-            if (adminLink) adminLink.style.display = 'none';
-            document.getElementById('logoutBtn').style.display = 'inline-block';
-            document.querySelectorAll('.admin-only').forEach(el => {
-                el.classList.add('visible');
-            });
-            // Hide elements that should be hidden for admin
-            document.querySelectorAll('.hide-for-admin').forEach(el => {
-                el.classList.add('hidden');
-            });
-            // Load participant data for admin
-            loadParticipants();
-            loadPlayerTotals();
-            // Initialize live scores
-            initLiveScores();
-        }
-        // Re-render tabs to show/hide add button
-        renderGridTabs();
+        applyAdminStatus(data.is_admin);
     } catch (error) {
         console.error('Error checking admin status:', error);
     }
 }
 
+function applyAdminStatus(admin) {
+    isAdmin = admin;
+
+    if (isAdmin) {
+        const adminLink = document.getElementById('adminLink');
+        if (adminLink) adminLink.style.display = 'none';
+        document.getElementById('logoutBtn').style.display = 'inline-block';
+        document.querySelectorAll('.admin-only').forEach(el => {
+            el.classList.add('visible');
+        });
+        // Hide elements that should be hidden for admin
+        document.querySelectorAll('.hide-for-admin').forEach(el => {
+            el.classList.add('hidden');
+        });
+        // Load participant data for admin
+        loadParticipants();
+        loadPlayerTotals();
+        // Initialize live scores
+        initLiveScores();
+    }
+    // Re-render tabs to show/hide add button
+    renderGridTabs();
+}
+
 // Accordion toggle function
 function toggleAccordion(sectionId) {
     const section = document.getElementById(sectionId);
@@ -86,7 +125,7 @@ function toggleAccordion(sectionId) {
 
 async function adminLogout() {
     try {
-        await fetch('/api/admin/logout', { method: 'POST' });
+        await fetch(BASE_PATH + '/api/admin/logout', { method: 'POST' });
         window.location.reload();
     } catch (error) {
         console.error('Error logging out:', error);
@@ -95,7 +134,7 @@ async function adminLogout() {
 
 async function loadGrids() {
     try {
-        const response = await fetch('/api/grids');
+        const response = await fetch(BASE_PATH + '/api/grids');
         const data = await response.json();
         gridsData = data.grids || [];
         renderGridTabs();
@@ -170,7 +209,7 @@ async function deleteGrid(gridId, gridName) {
     }
 
     try {
-        const response = await fetch(`/api/admin/grids/${gridId}`, {
+        const response = await fetch(`${BASE_PATH}/api/admin/grids/${gridId}`, {
             method: 'DELETE'
         });
         const result = await response.json();
@@ -195,7 +234,7 @@ async function createNewGrid() {
     if (name === null) return; // cancelled
 
     try {
-        const response = await fetch('/api/admin/grids', {
+        const response = await fetch(BASE_PATH + '/api/admin/grids', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ name: name.trim() })
@@ -214,107 +253,178 @@ async function createNewGrid() {
 
 async function loadGrid() {
     try {
-        const response = await fetch(`/api/grid?grid_id=${currentGridId}`);
-        const data = await response.json();
-        gameData = data;
-        squaresLimit = data.squares_limit || 5;
-        claimDeadline = data.claim_deadline ? new Date(data.claim_deadline) : null;
+        const response = await fetch(`${BASE_PATH}/api/grid?grid_id=${currentGridId}&format=compact`);
+        showGrid(decodeCompactGrid(await response.json()));
+    } catch (error) {
+        console.error('Error loading grid:', error);
+    }
+}
 
-        // Update both admin and public limit displays
-        const limitPublic = document.getElementById('squaresLimitPublic');
-        if (limitPublic) limitPublic.textContent = squaresLimit;
-        const limitInput = document.getElementById('squaresLimitInput');
-        if (limitInput) limitInput.value = squaresLimit;
+function showGrid(data) {
+    gameData = data;
+    squaresLimit = data.squares_limit || 5;
+    claimDeadline = data.claim_deadline ? new Date(data.claim_deadline) : null;
 
-        // Update deadline input for admin
-        const deadlineInput = document.getElementById('claimDeadlineInput');
-        if (deadlineInput && data.claim_deadline) {
-            // Format for datetime-local input (YYYY-MM-DDTHH:MM)
-            deadlineInput.value = data.claim_deadline.slice(0, 16);
-        }
+    // Update both admin and public limit displays
+    const limitPublic = document.getElementById('squaresLimitPublic');
+    if (limitPublic) limitPublic.textContent = squaresLimit;
+    const limitInput = document.getElementById('squaresLimitInput');
+    if (limitInput) limitInput.value = squaresLimit;
 
-        // Update locked quarters state from grid data
-        if (data.locked_quarters) {
-            lockedQuarters = {
-                q1: data.locked_quarters.q1,
-                q2: data.locked_quarters.q2,
-                q3: data.locked_quarters.q3,
-                q4: data.locked_quarters.q4
-            };
-        }
+    // Update deadline input for admin
+    const deadlineInput = document.getElementById('claimDeadlineInput');
+    if (deadlineInput && data.claim_deadline) {
+        // Format for datetime-local input (YYYY-MM-DDTHH:MM)
+        deadlineInput.value = data.claim_deadline.slice(0, 16);
+    }
 
-        // Update live sync state
-        if (typeof data.live_sync_enabled !== 'undefined') {
-            liveSyncEnabled = data.live_sync_enabled;
-            const liveSyncToggle = document.getElementById('liveSyncToggle');
-            if (liveSyncToggle) liveSyncToggle.checked = liveSyncEnabled;
-        }
+    // Update locked quarters state from grid data
+    if (data.locked_quarters) {
+        lockedQuarters = {
+            q1: data.locked_quarters.q1,
+            q2: data.locked_quarters.q2,
+            q3: data.locked_quarters.q3,
+            q4: data.locked_quarters.q4
+        };
+    }
 
-        renderGrid();
-        renderNumbers();
-        loadConfig();
-        updateStats();
-        highlightWinners();
-        restoreHighlightedSquares();
-        updateDeadlineBanner();
+    // Update live sync state
+    if (typeof data.live_sync_enabled !== 'undefined') {
+        liveSyncEnabled = data.live_sync_enabled;
+        const liveSyncToggle = document.getElementById('liveSyncToggle');
+        if (liveSyncToggle) liveSyncToggle.checked = liveSyncEnabled;
+    }
 
-        // Update quarter lock UI if admin
-        if (isAdmin) {
-            updateQuarterLockUI();
-        }
-    } catch (error) {
-        console.error('Error loading grid:', error);
+    const gridSwitched = boardGridId !== currentGridId;
+    const changedCells = renderGrid();
+    renderNumbers();
+    loadConfig();
+    updateStats();
+    highlightWinners();
+    renderLiveLeader();
+    // "Find Your Squares" highlights survive a patch; re-check only when owners may have moved
+    if (gridSwitched || changedCells > 0) {
+        restoreHighlightedSquares(!gridSwitched);
+    }
+    updateDeadlineBanner();
+
+    // Update quarter lock UI if admin
+    if (isAdmin) {
+        updateQuarterLockUI();
+    }
+}
+
+// Expand the compact /api/grid format (owner dictionary + 100 row-major
+// indexes + claim time deltas) back into the square list the board uses
+function decodeCompactGrid(data) {
+    if (data.format !== 'compact') return data;
+
+    const squares = new Array(100);
+    for (let i = 0; i < 100; i++) {
+        const ownerIndex = data.cells[i];
+        const delta = data.claimed[i];
+        squares[i] = {
+            row: Math.floor(i / 10),
+            col: i % 10,
+            owner_name: ownerIndex ? data.owners[ownerIndex - 1] : null,
+            claimed_at: delta !== null ? new Date((data.claimed_base + delta) * 1000).toISOString() : null
+        };
     }
+    data.squares = squares;
+    return data;
 }
 
+// The board keeps one element per cell, keyed by row * 10 + col, plus a model
+// of what each one shows. A refresh compares the new data with the model and
+// writes only to cells that changed, so a poll where nothing moved touches no
+// DOM at all. Layout is read once (the mobile check) before any write, so a
+// patch never forces a synchronous reflow.
+const boardCells = [];
+let boardGridId = null;
+
+function buildBoardCells(grid) {
+    grid.innerHTML = '';
+    boardCells.length = 0;
+    for (let index = 0; index < 100; index++) {
+        const row = Math.floor(index / 10);
+        const col = index % 10;
+        const div = document.createElement('div');
+        div.className = 'square';
+        div.dataset.row = row;
+        div.dataset.col = col;
+        const cell = { div, square: null, key: null, label: '', claimable: false, wins: 0 };
+
+        // Listeners are attached once and read the cell's current model
+        div.addEventListener('mouseenter', () => {
+            if (cell.claimable) div.innerHTML = 'Click to<br>claim';
+        });
+        div.addEventListener('mouseleave', () => {
+            if (cell.claimable) writeCellContent(cell);
+        });
+        div.addEventListener('click', () => handleSquareClick(row, col, cell.square));
+
+        boardCells.push(cell);
+        grid.appendChild(div);
+    }
+}
+
+function writeCellContent(cell) {
+    if (cell.square && cell.square.owner_name) {
+        cell.div.innerHTML = cell.label;
+    } else {
+        cell.div.textContent = cell.label;
+    }
+    // Rewriting the content drops the multi-win badge; put it back
+    if (cell.wins > 1) {
+        const badge = document.createElement('span');
+        badge.className = 'win-count';
+        badge.textContent = `${cell.wins}x`;
+        cell.div.appendChild(badge);
+    }
+}
+
+// Patch the board to match gameData; returns how many cells changed
 function renderGrid() {
     const grid = document.getElementById('grid');
-    grid.innerHTML = '';
     const price = parseFloat(gameData.config.price_per_square) || 10;
-
     const isMobile = window.innerWidth <= 480;
+    // Check if claiming is allowed (numbers not locked AND deadline not passed)
+    const claimingOpen = (!gameData.config.numbers_locked && (!claimDeadline || new Date() < claimDeadline)) || isAdmin;
 
-    for (let row = 0; row < 10; row++) {
-        for (let col = 0; col < 10; col++) {
-            const square = gameData.squares.find(s => s.row === row && s.col === col);
-            const div = document.createElement('div');
-            div.className = 'square';
-            div.dataset.row = row;
-            div.dataset.col = col;
-
-            if (square && square.owner_name) {
-                // On mobile, show initials only
-                if (isMobile) {
-                    div.textContent = getInitials(square.owner_name);
-                } else {
-                    // Split name to put first/last on separate lines
-                    div.innerHTML = formatNameForSquare(square.owner_name);
-                }
-                div.classList.add('claimed');
-            } else {
-                // On mobile, show just $ instead of $20
-                const priceDisplay = isMobile ? '$' : `$${price.toFixed(0)}`;
-                div.textContent = priceDisplay;
-                div.classList.add('available');
-                div.dataset.price = priceDisplay;
-                // Check if claiming is allowed (numbers not locked AND deadline not passed)
-                const claimingOpen = (!gameData.config.numbers_locked && (!claimDeadline || new Date() < claimDeadline)) || isAdmin;
-                if (claimingOpen) {
-                    div.addEventListener('mouseenter', () => {
-                        div.innerHTML = 'Click to<br>claim';
-                    });
-                    div.addEventListener('mouseleave', () => {
-                        div.textContent = div.dataset.price;
-                    });
-                } else {
-                    div.classList.add('locked');
-                }
-            }
+    if (boardCells.length !== 100 || grid.children.length !== 100) {
+        buildBoardCells(grid);
+    }
+    const gridSwitched = boardGridId !== currentGridId;
+    boardGridId = currentGridId;
 
-            div.addEventListener('click', () => handleSquareClick(row, col, square));
-            grid.appendChild(div);
-        }
+    const squares = new Array(100);
+    gameData.squares.forEach(s => { squares[s.row * 10 + s.col] = s; });
+
+    let changed = 0;
+    for (let index = 0; index < 100; index++) {
+        const cell = boardCells[index];
+        const square = squares[index] || null;
+        cell.square = square;
+        if (gridSwitched) cell.div.classList.remove('my-square');
+
+        const owner = square && square.owner_name;
+        // On mobile, show initials on claimed squares and just $ instead of $20 on open ones
+        const label = owner
+            ? (isMobile ? escapeHtml(getInitials(owner)) : formatNameForSquare(owner))
+            : (isMobile ? '$' : `$${price.toFixed(0)}`);
+        const key = `${owner ? 'c' : 'a'}|${label}|${claimingOpen}`;
+        if (key === cell.key) continue;
+
+        cell.key = key;
+        cell.label = label;
+        cell.claimable = !owner && claimingOpen;
+        cell.div.classList.toggle('claimed', !!owner);
+        cell.div.classList.toggle('available', !owner);
+        cell.div.classList.toggle('locked', !owner && !claimingOpen);
+        writeCellContent(cell);
+        changed++;
     }
+    return changed;
 }
 
 // Get first and last initials from a name
@@ -526,7 +636,7 @@ async function submitClaim() {
 
     for (const square of selectedSquares) {
         try {
-            const response = await fetch('/api/claim', {
+            const response = await fetch(BASE_PATH + '/api/claim', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
@@ -593,7 +703,7 @@ function closeAdminModal() {
 
 async function adminClearSquare() {
     try {
-        const response = await fetch('/api/admin/clear-square', {
+        const response = await fetch(BASE_PATH + '/api/admin/clear-square', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -617,28 +727,10 @@ async function adminClearSquare() {
 }
 
 function renderNumbers() {
-    const colNumbers = document.getElementById('colNumbers');
-    const rowNumbers = document.getElementById('rowNumbers');
-
-    colNumbers.innerHTML = '';
-    rowNumbers.innerHTML = '';
-
     const colNums = gameData.config.col_numbers || Array(10).fill('?');
     const rowNums = gameData.config.row_numbers || Array(10).fill('?');
-
-    colNums.forEach(num => {
-        const div = document.createElement('div');
-        div.className = 'number-cell';
-        div.textContent = num !== null ? num : '?';
-        colNumbers.appendChild(div);
-    });
-
-    rowNums.forEach(num => {
-        const div = document.createElement('div');
-        div.className = 'number-cell';
-        div.textContent = num !== null ? num : '?';
-        rowNumbers.appendChild(div);
-    });
+    patchNumberCells(document.getElementById('colNumbers'), colNums);
+    patchNumberCells(document.getElementById('rowNumbers'), rowNums);
 
     const randomizeBtn = document.getElementById('randomizeBtn');
     const clearBtn = document.getElementById('clearBtn');
@@ -654,6 +746,20 @@ function renderNumbers() {
     }
 }
 
+// Header digits are created once and only rewritten when a number changes
+function patchNumberCells(container, numbers) {
+    while (container.children.length < numbers.length) {
+        const div = document.createElement('div');
+        div.className = 'number-cell';
+        container.appendChild(div);
+    }
+    numbers.forEach((num, i) => {
+        const text = String(num !== null ? num : '?');
+        const div = container.children[i];
+        if (div.textContent !== text) div.textContent = text;
+    });
+}
+
 function loadConfig() {
     const config = gameData.config;
 
@@ -722,6 +828,65 @@ function updateWinnersVisibility() {
     if (winnersSection) {
         winnersSection.style.display = gameData.config.show_winners === 1 ? 'block' : 'none';
     }
+    updateLiveLeadersPolling();
+}
+
+// The live leader follows the winners toggle: /api/live-leaders is polled
+// only while winners are shown, and not from hidden tabs
+function updateLiveLeadersPolling() {
+    const enabled = gameData.config.show_winners === 1;
+    if (enabled && !liveLeadersInterval) {
+        loadLiveLeaders();
+        liveLeadersInterval = setInterval(() => {
+            if (!document.hidden) loadLiveLeaders();
+        }, 30000);
+    } else if (!enabled && liveLeadersInterval) {
+        clearInterval(liveLeadersInterval);
+        liveLeadersInterval = null;
+        liveLeaders = null;
+        renderLiveLeader();
+    }
+}
+
+async function loadLiveLeaders() {
+    try {
+        const response = await fetch(BASE_PATH + '/api/live-leaders');
+        liveLeaders = response.ok ? await response.json() : null;
+    } catch (error) {
+        liveLeaders = null;
+    }
+    renderLiveLeader();
+}
+
+// Outline the square that would win the quarter in progress on this grid
+function renderLiveLeader() {
+    const leader = liveLeaders && liveLeaders.leaders.find(l => l.grid_id === currentGridId);
+    const leaderIndex = leader ? leader.row * 10 + leader.col : -1;
+    boardCells.forEach((cell, index) => {
+        const leading = index === leaderIndex;
+        if (cell.leading === leading) return;
+        cell.leading = leading;
+        cell.div.classList.toggle('leading', leading);
+    });
+
+    const card = document.getElementById('liveLeader');
+    if (!card) return;
+    if (!leader) {
+        card.style.display = 'none';
+        return;
+    }
+    const game = liveLeaders.game;
+    const config = gameData.config;
+    const score = `${config.team1_name || 'Team 1'}: ${game.team1_score} - ${config.team2_name || 'Team 2'}: ${game.team2_score}`;
+    const cardHtml = `
+        <div class="quarter-label">Leading Q${game.quarter}${game.clock ? ` (${escapeHtml(game.clock)})` : ''}</div>
+        <div class="winner-name">${escapeHtml(leader.owner_name || 'Unclaimed')}</div>
+        <div class="score">${escapeHtml(score)}</div>`;
+    if (card.dataset.rendered !== cardHtml) {
+        card.innerHTML = cardHtml;
+        card.dataset.rendered = cardHtml;
+    }
+    card.style.display = 'block';
 }
 
 async function toggleShowWinners() {
@@ -729,7 +894,7 @@ async function toggleShowWinners() {
     const showWinners = showWinnersToggle.checked;
 
     try {
-        const response = await fetch('/api/config', {
+        const response = await fetch(BASE_PATH + '/api/config', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ show_winners: showWinners })
@@ -808,7 +973,7 @@ async function savePrice() {
     const price = parseFloat(input.value) || 0;
 
     try {
-        const response = await fetch('/api/config', {
+        const response = await fetch(BASE_PATH + '/api/config', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ price_per_square: price })
@@ -841,7 +1006,7 @@ async function savePrizePercentages() {
     document.getElementById('charityPct').textContent = (100 - total).toFixed(0);
 
     try {
-        const response = await fetch('/api/config', {
+        const response = await fetch(BASE_PATH + '/api/config', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ prize_q1, prize_q2, prize_q3, prize_q4 })
@@ -871,7 +1036,7 @@ async function saveSquaresLimit() {
     }
 
     try {
-        const response = await fetch('/api/config', {
+        const response = await fetch(BASE_PATH + '/api/config', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ squares_limit: limit })
@@ -893,7 +1058,7 @@ async function saveTeamName(team) {
     const name = input.value.trim();
 
     try {
-        const response = await fetch('/api/config', {
+        const response = await fetch(BASE_PATH + '/api/config', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ [`team${team}_name`]: name })
@@ -915,7 +1080,7 @@ async function randomizeNumbers() {
     }
 
     try {
-        const response = await fetch('/api/randomize', {
+        const response = await fetch(BASE_PATH + '/api/randomize', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ grid_id: currentGridId })
@@ -941,7 +1106,7 @@ async function clearNumbers() {
     }
 
     try {
-        const response = await fetch('/api/clear-numbers', {
+        const response = await fetch(BASE_PATH + '/api/clear-numbers', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ grid_id: currentGridId })
@@ -967,7 +1132,7 @@ async function lockNumbers() {
     }
 
     try {
-        const response = await fetch('/api/lock-numbers', {
+        const response = await fetch(BASE_PATH + '/api/lock-numbers', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ grid_id: currentGridId })
@@ -994,7 +1159,7 @@ async function saveScores() {
     });
 
     try {
-        const response = await fetch('/api/scores', {
+        const response = await fetch(BASE_PATH + '/api/scores', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(scores)
@@ -1013,21 +1178,10 @@ async function saveScores() {
 }
 
 function highlightWinners() {
-    document.querySelectorAll('.square.winner').forEach(el => {
-        el.classList.remove('winner');
-        const badge = el.querySelector('.win-count');
-        if (badge) badge.remove();
-    });
-
     const config = gameData.config;
     const rowNums = config.row_numbers;
     const colNums = config.col_numbers;
 
-    if (!rowNums || !colNums) return;
-
-    const winnersList = document.getElementById('winnersList');
-    winnersList.innerHTML = '';
-
     const quarters = [
         { label: 'Q1', team1: config.q1_team1, team2: config.q1_team2 },
         { label: 'Q2', team1: config.q2_team1, team2: config.q2_team2 },
@@ -1040,7 +1194,8 @@ function highlightWinners() {
     const winnerCards = [];
 
     quarters.forEach(quarter => {
-        if (quarter.team1 === null || quarter.team1 === undefined ||
+        if (!rowNums || !colNums ||
+            quarter.team1 === null || quarter.team1 === undefined ||
             quarter.team2 === null || quarter.team2 === undefined ||
             quarter.team1 === '' || quarter.team2 === '') {
             return;
@@ -1056,7 +1211,7 @@ function highlightWinners() {
             const index = row * 10 + col;
             winCounts.set(index, (winCounts.get(index) || 0) + 1);
 
-            const square = gameData.squares.find(s => s.row === row && s.col === col);
+            const square = boardCells[index] && boardCells[index].square;
             winnerCards.push({
                 index,
                 label: quarter.label,
@@ -1066,31 +1221,37 @@ function highlightWinners() {
         }
     });
 
-    // Second pass: highlight squares and add multi-win badges
-    const squares = document.querySelectorAll('.square');
-    winCounts.forEach((count, index) => {
-        if (squares[index]) {
-            squares[index].classList.add('winner');
-            if (count > 1) {
-                const badge = document.createElement('span');
-                badge.className = 'win-count';
-                badge.textContent = `${count}x`;
-                squares[index].appendChild(badge);
+    // Second pass: patch the winner class and multi-win badge where they changed
+    boardCells.forEach((cell, index) => {
+        const wins = winCounts.get(index) || 0;
+        if (wins === cell.wins) return;
+        const hadBadge = cell.wins > 1;
+        cell.wins = wins;
+        cell.div.classList.toggle('winner', wins > 0);
+        if (hadBadge || wins > 1) {
+            const badge = cell.div.querySelector('.win-count');
+            if (badge) badge.remove();
+            if (wins > 1) {
+                const newBadge = document.createElement('span');
+                newBadge.className = 'win-count';
+                newBadge.textContent = `${wins}x`;
+                cell.div.appendChild(newBadge);
             }
         }
     });
 
-    // Render winner cards
-    winnerCards.forEach(wc => {
-        const card = document.createElement('div');
-        card.className = 'winner-card';
-        card.innerHTML = `
-            <div class="quarter-label">${wc.label}</div>
-            <div class="winner-name">${wc.winnerName}</div>
-            <div class="score">${wc.score}</div>
-        `;
-        winnersList.appendChild(card);
-    });
+    // Winner cards are only rebuilt when their content changes
+    const winnersList = document.getElementById('winnersList');
+    const cardsHtml = winnerCards.map(wc => `
+            <div class="winner-card">
+                <div class="quarter-label">${wc.label}</div>
+                <div class="winner-name">${escapeHtml(wc.winnerName)}</div>
+                <div class="score">${escapeHtml(wc.score)}</div>
+            </div>`).join('');
+    if (winnersList.dataset.rendered !== cardsHtml) {
+        winnersList.innerHTML = cardsHtml;
+        winnersList.dataset.rendered = cardsHtml;
+    }
 }
 
 async function resetGame() {
@@ -1099,7 +1260,7 @@ async function resetGame() {
     }
 
     try {
-        const response = await fetch('/api/reset', { method: 'POST' });
+        const response = await fetch(BASE_PATH + '/api/reset', { method: 'POST' });
         const result = await response.json();
         if (result.error) {
             alert(result.error);
@@ -1130,14 +1291,21 @@ document.getElementById('claimEmail')?.addEventListener('keypress', (e) => {
 // Participant Management Functions
 // ==========================================
 
-async function loadParticipants() {
+async function loadParticipants(append = false) {
     if (!isAdmin) return;
 
     const container = document.getElementById('participantsList');
     if (!container) return;
 
+    const params = new URLSearchParams({
+        filter: participantsFilter,
+        sort: participantsSort
+    });
+    if (participantsSearch) params.set('search', participantsSearch);
+    if (append && participantsCursor) params.set('cursor', participantsCursor);
+
     try {
-        const response = await fetch('/api/admin/participants');
+        const response = await fetch(`${BASE_PATH}/api/admin/participants?${params}`);
         const data = await response.json();
 
         if (data.error) {
@@ -1145,18 +1313,19 @@ async function loadParticipants() {
             return;
         }
 
-        allParticipants = data.participants || [];
-        const pricePerSquare = data.price_per_square || 10;
+        const page = data.participants || [];
+        allParticipants = append ? allParticipants.concat(page) : page;
+        participantsCursor = data.next_cursor || null;
+        participantsMatching = data.matching || 0;
+        participantsPrice = data.price_per_square || 10;
 
-        // Update stats
-        const unpaidParticipants = allParticipants.filter(p => !p.all_paid);
-        const totalOwed = allParticipants.reduce((sum, p) => sum + p.amount_owed, 0);
+        // Update stats (computed server-side across all participants)
+        const total = data.total_participants || 0;
+        document.getElementById('participantsCount').textContent = `${total} participant${total !== 1 ? 's' : ''}`;
+        document.getElementById('unpaidCount').textContent = `${data.unpaid_participants || 0} unpaid`;
+        document.getElementById('totalOwed').textContent = `$${(data.total_owed || 0).toFixed(2)} outstanding`;
 
-        document.getElementById('participantsCount').textContent = `${allParticipants.length} participant${allParticipants.length !== 1 ? 's' : ''}`;
-        document.getElementById('unpaidCount').textContent = `${unpaidParticipants.length} unpaid`;
-        document.getElementById('totalOwed').textContent = `$${totalOwed.toFixed(2)} outstanding`;
-
-        renderParticipants(pricePerSquare);
+        renderParticipants(participantsPrice);
 
     } catch (error) {
         console.error('Error loading participants:', error);
@@ -1164,57 +1333,26 @@ async function loadParticipants() {
     }
 }
 
-function renderParticipants(pricePerSquare = 10) {
+function loadMoreParticipants() {
+    if (participantsCursor) loadParticipants(true);
+}
+
+function renderParticipants(pricePerSquare = participantsPrice) {
     const container = document.getElementById('participantsList');
     if (!container) return;
 
+    // Filtering, search and sorting are applied server-side
     if (allParticipants.length === 0) {
-        container.innerHTML = '<p class="empty-text">No participants yet</p>';
-        updateBulkActionsBar();
-        return;
-    }
-
-    // Filter participants based on current filter
-    let filteredParticipants = allParticipants;
-    if (participantsFilter === 'paid') {
-        filteredParticipants = allParticipants.filter(p => p.all_paid);
-    } else if (participantsFilter === 'unpaid') {
-        filteredParticipants = allParticipants.filter(p => !p.all_paid);
-    }
-
-    // Apply search filter
-    if (participantsSearch) {
-        const searchLower = participantsSearch.toLowerCase();
-        filteredParticipants = filteredParticipants.filter(p =>
-            p.name.toLowerCase().includes(searchLower) ||
-            p.email.toLowerCase().includes(searchLower)
-        );
-    }
-
-    // Apply sorting
-    filteredParticipants = [...filteredParticipants].sort((a, b) => {
-        if (participantsSort === 'name') {
-            // Sort by last name (assume last word in name is last name)
-            const aLastName = a.name.trim().split(/\s+/).pop().toLowerCase();
-            const bLastName = b.name.trim().split(/\s+/).pop().toLowerCase();
-            return aLastName.localeCompare(bLastName);
-        } else if (participantsSort === 'claimed') {
-            // Sort by claimed date (newest first)
-            const aDate = a.first_claimed_at ? new Date(a.first_claimed_at) : new Date(0);
-            const bDate = b.first_claimed_at ? new Date(b.first_claimed_at) : new Date(0);
-            return bDate - aDate;
-        }
-        return 0;
-    });
-
-    if (filteredParticipants.length === 0) {
-        container.innerHTML = `<p class="empty-text">No matching participants</p>`;
+        const filtered = participantsFilter !== 'all' || participantsSearch;
+        container.innerHTML = filtered
+            ? '<p class="empty-text">No matching participants</p>'
+            : '<p class="empty-text">No participants yet</p>';
         updateBulkActionsBar();
         return;
     }
 
     // Render participants with checkboxes
-    container.innerHTML = filteredParticipants.map(p => {
+    container.innerHTML = allParticipants.map(p => {
         let claimedDateStr = '';
         if (p.first_claimed_at) {
             try {
@@ -1255,7 +1393,9 @@ function renderParticipants(pricePerSquare = 10) {
                 </button>
             </div>
         </div>
-    `}).join('');
+    `}).join('') + (participantsCursor
+        ? '<button class="load-more-btn" onclick="loadMoreParticipants()">Load more</button>'
+        : '');
 
     updateSelectAllCheckbox();
     updateBulkActionsBar();
@@ -1270,8 +1410,8 @@ function filterParticipants(filter) {
     });
     event.target.classList.add('active');
 
-    // Re-render with new filter
-    renderParticipants();
+    // Reload with new filter
+    loadParticipants();
 }
 
 function sortParticipants(sortBy) {
@@ -1283,18 +1423,21 @@ function sortParticipants(sortBy) {
     });
     event.target.classList.add('active');
 
-    // Re-render with new sort
-    renderParticipants();
+    // Reload with new sort
+    loadParticipants();
 }
 
 function searchParticipants(query) {
     participantsSearch = query.trim();
-    renderParticipants();
+
+    // Debounce so typing doesn't fire a request per keystroke
+    clearTimeout(participantsSearchTimer);
+    participantsSearchTimer = setTimeout(() => loadParticipants(), 250);
 }
 
 async function togglePaid(email, markAsPaid) {
     try {
-        const response = await fetch('/api/admin/participants/toggle-paid', {
+        const response = await fetch(BASE_PATH + '/api/admin/participants/toggle-paid', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ email: email, paid: markAsPaid })
@@ -1313,7 +1456,11 @@ async function togglePaid(email, markAsPaid) {
 }
 
 function exportUnpaid() {
-    window.location.href = '/api/admin/participants/export-unpaid';
+    window.location.href = BASE_PATH + '/api/admin/participants/export-unpaid';
+}
+
+function exportCsv(kind) {
+    window.location.href = `${BASE_PATH}/api/admin/export/${kind}`;
 }
 
 function escapeHtml(text) {
@@ -1350,7 +1497,7 @@ async function uploadLogo(team) {
     formData.append('logo', input.files[0]);
 
     try {
-        const response = await fetch('/api/admin/upload-logo', {
+        const response = await fetch(BASE_PATH + '/api/admin/upload-logo', {
             method: 'POST',
             body: formData
         });
@@ -1372,52 +1519,54 @@ async function uploadLogo(team) {
 // Load and display team logos and colors
 async function loadLogos() {
     try {
-        const response = await fetch('/api/logos');
-        const data = await response.json();
+        const response = await fetch(BASE_PATH + '/api/logos');
+        applyLogos(await response.json());
+    } catch (error) {
+        console.error('Error loading logos:', error);
+    }
+}
 
-        // Update grid labels with logos
-        const team1Label = document.getElementById('team1Label');
-        const team2Label = document.getElementById('team2Label');
-        const team1Name = window.team1Name || team1Label.textContent || 'Team 1';
-        const team2Name = window.team2Name || team2Label.textContent || 'Team 2';
-
-        if (data.team1_logo) {
-            team1Label.innerHTML = `<img src="${data.team1_logo}" class="team-logo" alt=""><span>${team1Name}</span>`;
-            // Update admin preview
-            const preview1 = document.getElementById('team1LogoPreview');
-            if (preview1) {
-                preview1.src = data.team1_logo;
-                preview1.style.display = 'block';
-            }
-        }
+// Logos are data URLs from /api/logos, or image URLs in the inlined initial state
+function applyLogos(data) {
+    // Update grid labels with logos
+    const team1Label = document.getElementById('team1Label');
+    const team2Label = document.getElementById('team2Label');
+    const team1Name = window.team1Name || team1Label.textContent || 'Team 1';
+    const team2Name = window.team2Name || team2Label.textContent || 'Team 2';
 
-        if (data.team2_logo) {
-            team2Label.innerHTML = `<img src="${data.team2_logo}" class="team-logo" alt=""><span>${team2Name}</span>`;
-            // Update admin preview
-            const preview2 = document.getElementById('team2LogoPreview');
-            if (preview2) {
-                preview2.src = data.team2_logo;
-                preview2.style.display = 'block';
-            }
+    if (data.team1_logo) {
+        team1Label.innerHTML = `<img src="${data.team1_logo}" class="team-logo" alt=""><span>${team1Name}</span>`;
+        // Update admin preview
+        const preview1 = document.getElementById('team1LogoPreview');
+        if (preview1) {
+            preview1.src = data.team1_logo;
+            preview1.style.display = 'block';
         }
+    }
 
-        // Apply team colors
-        applyTeamColors(data.team1_color || '#0060aa', data.team2_color || '#cc0000');
+    if (data.team2_logo) {
+        team2Label.innerHTML = `<img src="${data.team2_logo}" class="team-logo" alt=""><span>${team2Name}</span>`;
+        // Update admin preview
+        const preview2 = document.getElementById('team2LogoPreview');
+        if (preview2) {
+            preview2.src = data.team2_logo;
+            preview2.style.display = 'block';
+        }
+    }
 
-        // Update color pickers in admin
-        const color1Input = document.getElementById('team1Color');
-        const color2Input = document.getElementById('team2Color');
-        const color1Label = document.getElementById('team1ColorLabel');
-        const color2Label = document.getElementById('team2ColorLabel');
+    // Apply team colors
+    applyTeamColors(data.team1_color || '#0060aa', data.team2_color || '#cc0000');
 
-        if (color1Input) color1Input.value = data.team1_color || '#0060aa';
-        if (color2Input) color2Input.value = data.team2_color || '#cc0000';
-        if (color1Label) color1Label.textContent = data.team1_color || '#0060aa';
-        if (color2Label) color2Label.textContent = data.team2_color || '#cc0000';
+    // Update color pickers in admin
+    const color1Input = document.getElementById('team1Color');
+    const color2Input = document.getElementById('team2Color');
+    const color1Label = document.getElementById('team1ColorLabel');
+    const color2Label = document.getElementById('team2ColorLabel');
 
-    } catch (error) {
-        console.error('Error loading logos:', error);
-    }
+    if (color1Input) color1Input.value = data.team1_color || '#0060aa';
+    if (color2Input) color2Input.value = data.team2_color || '#cc0000';
+    if (color1Label) color1Label.textContent = data.team1_color || '#0060aa';
+    if (color2Label) color2Label.textContent = data.team2_color || '#cc0000';
 }
 
 // Apply team colors to the grid
@@ -1442,7 +1591,7 @@ async function saveTeamColor(team) {
     if (colorLabel) colorLabel.textContent = color;
 
     try {
-        const response = await fetch('/api/admin/team-color', {
+        const response = await fetch(BASE_PATH + '/api/admin/team-color', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ team: String(team), color: color })
@@ -1580,6 +1729,8 @@ document.addEventListener('click', (e) => {
 // ==========================================
 
 let highlightedEmail = null;
+// Last /api/me response ({email, data}); it covers every grid, so switching grids reuses it
+let myInfo = null;
 
 function toggleFindSquares() {
     const banner = document.getElementById('findSquaresBanner');
@@ -1597,7 +1748,15 @@ function handleFindSquaresKeypress(event) {
     }
 }
 
-async function findMySquares() {
+async function fetchMyInfo(email, refresh) {
+    if (!refresh && myInfo && myInfo.email === email) return myInfo.data;
+    const response = await fetch(`${BASE_PATH}/api/me?email=${encodeURIComponent(email)}`);
+    const data = await response.json();
+    myInfo = data.error ? null : { email, data };
+    return data;
+}
+
+async function findMySquares(refresh = true) {
     const emailInput = document.getElementById('findSquaresEmail');
     const email = emailInput.value.trim().toLowerCase();
 
@@ -1607,13 +1766,16 @@ async function findMySquares() {
     }
 
     try {
-        const response = await fetch(`/api/my-squares?email=${encodeURIComponent(email)}&grid_id=${currentGridId}`);
-        const data = await response.json();
+        // One lookup covers every grid; this grid's squares are picked out of it
+        const data = await fetchMyInfo(email, refresh);
 
         if (data.error) {
             alert(data.error);
             return;
         }
+        const gridEntry = data.grids.find(g => g.grid_id === currentGridId);
+        const squares = gridEntry ? gridEntry.squares : [];
+        const count = squares.length;
 
         // Clear any existing highlights
         document.querySelectorAll('.square.my-square').forEach(el => {
@@ -1623,7 +1785,15 @@ async function findMySquares() {
         const resultDiv = document.getElementById('findSquaresResult');
         const resultText = document.getElementById('findSquaresResultText');
 
-        if (data.squares.length === 0) {
+        if (count === 0 && data.total_squares > 0) {
+            // Keep the email remembered: the other grids' tabs will highlight its squares
+            resultDiv.style.display = 'flex';
+            resultDiv.classList.add('no-squares');
+            const otherGrids = data.grids.map(g => `${escapeHtml(g.name)} (${g.squares.length})`).join(', ');
+            resultText.innerHTML = `No squares for <strong>${escapeHtml(email)}</strong> on this grid &middot; on ${otherGrids}`;
+            highlightedEmail = email;
+            localStorage.setItem('findSquaresEmail', email);
+        } else if (count === 0) {
             resultDiv.style.display = 'flex';
             resultDiv.classList.add('no-squares');
             resultText.innerHTML = `No squares found for <strong>${escapeHtml(email)}</strong> on this grid`;
@@ -1631,7 +1801,7 @@ async function findMySquares() {
             localStorage.removeItem('findSquaresEmail');
         } else {
             // Highlight the squares
-            data.squares.forEach(sq => {
+            squares.forEach(sq => {
                 const squareEl = document.querySelector(`.square[data-row="${sq.row}"][data-col="${sq.col}"]`);
                 if (squareEl) {
                     squareEl.classList.add('my-square');
@@ -1641,9 +1811,12 @@ async function findMySquares() {
             resultDiv.style.display = 'flex';
             resultDiv.classList.remove('no-squares');
 
-            let message = `Highlighting <span class="highlight-count">${data.count}</span> square${data.count !== 1 ? 's' : ''}`;
-            if (data.total_across_grids > data.count) {
-                message += ` (${data.total_across_grids} total across all grids)`;
+            let message = `Highlighting <span class="highlight-count">${count}</span> square${count !== 1 ? 's' : ''}`;
+            if (data.total_squares > count) {
+                message += ` (${data.total_squares} total across all grids)`;
+            }
+            if (data.amount_owed > 0) {
+                message += ` &middot; $${data.amount_owed.toFixed(0)} owed`;
             }
             resultText.innerHTML = message;
 
@@ -1674,11 +1847,13 @@ function clearHighlightedSquares() {
     document.getElementById('findSquaresResult').style.display = 'none';
     document.getElementById('findSquaresEmail').value = '';
     highlightedEmail = null;
+    myInfo = null;
     localStorage.removeItem('findSquaresEmail');
 }
 
-// Restore highlighted squares after grid reload
-function restoreHighlightedSquares() {
+// Restore highlighted squares after grid reload. A grid switch reuses the
+// cached /api/me response; refresh when this grid's owners may have changed.
+function restoreHighlightedSquares(refresh = false) {
     const savedEmail = localStorage.getItem('findSquaresEmail');
     if (savedEmail && !isAdmin) {
         const emailInput = document.getElementById('findSquaresEmail');
@@ -1686,7 +1861,7 @@ function restoreHighlightedSquares() {
             emailInput.value = savedEmail;
             // Auto-find squares after a short delay to ensure grid is loaded
             setTimeout(() => {
-                findMySquares();
+                findMySquares(refresh);
                 // Open the banner to show results
                 const banner = document.getElementById('findSquaresBanner');
                 if (banner) banner.classList.add('open');
@@ -1747,7 +1922,7 @@ async function saveClaimDeadline() {
     const deadline = input.value;
 
     try {
-        const response = await fetch('/api/config', {
+        const response = await fetch(BASE_PATH + '/api/config', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ claim_deadline: deadline || null })
@@ -1797,20 +1972,7 @@ function toggleSelectAll() {
 }
 
 function getVisibleParticipantEmails() {
-    let filtered = allParticipants;
-    if (participantsFilter === 'paid') {
-        filtered = allParticipants.filter(p => p.all_paid);
-    } else if (participantsFilter === 'unpaid') {
-        filtered = allParticipants.filter(p => !p.all_paid);
-    }
-    if (participantsSearch) {
-        const searchLower = participantsSearch.toLowerCase();
-        filtered = filtered.filter(p =>
-            p.name.toLowerCase().includes(searchLower) ||
-            p.email.toLowerCase().includes(searchLower)
-        );
-    }
-    return filtered.map(p => p.email);
+    return allParticipants.map(p => p.email);
 }
 
 function updateSelectAllCheckbox() {
@@ -1823,6 +1985,14 @@ function updateSelectAllCheckbox() {
 
     checkbox.checked = allSelected;
     checkbox.indeterminate = someSelected && !allSelected;
+
+    // Select All only covers the pages loaded so far
+    const label = document.getElementById('selectAllLabel');
+    if (label) {
+        label.textContent = participantsMatching > visibleEmails.length
+            ? `Select All Loaded (${visibleEmails.length} of ${participantsMatching})`
+            : 'Select All';
+    }
 }
 
 function updateBulkActionsBar() {
@@ -1848,7 +2018,7 @@ async function bulkMarkPaid(paid) {
     }
 
     try {
-        const response = await fetch('/api/admin/participants/bulk-mark-paid', {
+        const response = await fetch(BASE_PATH + '/api/admin/participants/bulk-mark-paid', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -1882,7 +2052,7 @@ async function loadAuditLog() {
     container.innerHTML = '<p class="loading-text">Loading audit log...</p>';
 
     try {
-        let url = `/api/admin/audit-log?page=${auditLogPage}&per_page=25`;
+        let url = `${BASE_PATH}/api/admin/audit-log?page=${auditLogPage}&per_page=25`;
         if (auditLogFilter) url += `&action=${encodeURIComponent(auditLogFilter)}`;
         if (auditLogSearch) url += `&email=${encodeURIComponent(auditLogSearch)}`;
 
@@ -1936,6 +2106,7 @@ function formatActionName(action) {
     const names = {
         'square_claimed': 'Square Claimed',
         'square_cleared': 'Square Cleared',
+        'square_reassigned': 'Square Reassigned',
         'payment_marked_paid': 'Marked Paid',
         'payment_marked_unpaid': 'Marked Unpaid',
         'numbers_randomized': 'Numbers Randomized',
@@ -2009,7 +2180,7 @@ async function savePlayerName() {
     const playerName = document.getElementById('editPlayerName').value.trim();
 
     try {
-        const response = await fetch('/api/admin/participants/update-player', {
+        const response = await fetch(BASE_PATH + '/api/admin/participants/update-player', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ email, player_name: playerName })
@@ -2038,7 +2209,7 @@ async function loadPlayerTotals() {
     if (!container) return;
 
     try {
-        const response = await fetch('/api/admin/player-totals');
+        const response = await fetch(BASE_PATH + '/api/admin/player-totals');
         const data = await response.json();
 
         if (data.error) {
@@ -2084,7 +2255,7 @@ async function fetchLiveScores() {
     if (errorDiv) errorDiv.style.display = 'none';
 
     try {
-        const response = await fetch('/api/live-scores');
+        const response = await fetch(BASE_PATH + '/api/live-scores');
         const data = await response.json();
 
         if (data.error && !data.cached_scores) {
@@ -2215,7 +2386,7 @@ async function syncLiveScores() {
     }
 
     try {
-        const response = await fetch('/api/admin/sync-live-scores', {
+        const response = await fetch(BASE_PATH + '/api/admin/sync-live-scores', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' }
         });
@@ -2255,7 +2426,7 @@ async function toggleLiveSync() {
     const enabled = toggle ? toggle.checked : false;
 
     try {
-        const response = await fetch('/api/admin/live-sync-toggle', {
+        const response = await fetch(BASE_PATH + '/api/admin/live-sync-toggle', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ enabled })
@@ -2335,7 +2506,7 @@ async function toggleQuarterLock(quarter) {
     const isLocked = lockedQuarters[`q${quarter}`];
 
     try {
-        const endpoint = isLocked ? '/api/admin/unlock-quarter' : '/api/admin/lock-quarter';
+        const endpoint = isLocked ? BASE_PATH + '/api/admin/unlock-quarter' : BASE_PATH + '/api/admin/lock-quarter';
         const response = await fetch(endpoint, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
@@ -2412,7 +2583,7 @@ async function toggleBanner() {
     const enabled = toggle ? toggle.checked : false;
 
     try {
-        const response = await fetch('/api/admin/banner', {
+        const response = await fetch(BASE_PATH + '/api/admin/banner', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ enabled })
@@ -2433,7 +2604,7 @@ async function saveBannerText() {
     const text = textarea ? textarea.value.trim() : '';
 
     try {
-        const response = await fetch('/api/admin/banner', {
+        const response = await fetch(BASE_PATH + '/api/admin/banner', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ text })
@@ -2467,7 +2638,7 @@ async function toggleEmails() {
     const enabled = toggle ? toggle.checked : false;
 
     try {
-        const response = await fetch('/api/admin/email-toggle', {
+        const response = await fetch(BASE_PATH + '/api/admin/email-toggle', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ enabled })
@@ -2489,7 +2660,7 @@ async function loadEmailStatus() {
     if (!isAdmin) return;
 
     try {
-        const response = await fetch('/api/admin/email-status');
+        const response = await fetch(BASE_PATH + '/api/admin/email-status');
         const data = await response.json();
 
         // Update toggle
@@ -2545,7 +2716,7 @@ async function resendEmails(quarter) {
     }
 
     try {
-        const response = await fetch('/api/admin/resend-emails', {
+        const response = await fetch(BASE_PATH + '/api/admin/resend-emails', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ quarter })